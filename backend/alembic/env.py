@@ -25,7 +25,8 @@ database_url = os.getenv("DATABASE_URL")
 if not database_url:
     raise ValueError("DATABASE_URL is not set in environment variables")
 
-config.set_main_option("sqlalchemy.url", database_url)
+# Escaped, as `%` starts an interpolation in the .ini config (URL encoded passwords or socket paths).
+config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
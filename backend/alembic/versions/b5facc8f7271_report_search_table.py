@@ -0,0 +1,113 @@
+"""Report search table
+
+Revision ID: b5facc8f7271
+Revises: c564d473db47
+Create Date: 2026-10-19 11:02:17.804412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5facc8f7271'
+down_revision: Union[str, Sequence[str], None] = 'c564d473db47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _pg_trgm_available() -> bool:
+    """Whether the `pg_trgm` extension is installed or can be installed on this server."""
+    bind = op.get_bind()
+    return bool(
+        bind.execute(
+            sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        ).scalar()
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('report_search',
+    sa.Column('report_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='reportstateenum', create_type=False), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('reporter_id', sa.Integer(), nullable=True),
+    sa.Column('hospital_name', sa.String(length=200), nullable=True),
+    sa.Column('disease_name', sa.String(length=100), nullable=True),
+    sa.Column('disease_category', postgresql.ENUM(name='diseasecategoryenum', create_type=False), nullable=True),
+    sa.Column('severity_level', postgresql.ENUM(name='severitylevelenum', create_type=False), nullable=True),
+    sa.Column('treatment_status', postgresql.ENUM(name='treatmentstatusenum', create_type=False), nullable=True),
+    sa.Column('date_detected', sa.Date(), nullable=True),
+    sa.Column('patient_count', sa.Integer(), nullable=False),
+    sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True),
+    sa.ForeignKeyConstraint(['report_id'], ['reports.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('report_id')
+    )
+    op.create_index('ix_report_search_status_created_at', 'report_search', ['status', 'created_at'], unique=False)
+    op.create_index('ix_report_search_search_vector', 'report_search', ['search_vector'], unique=False, postgresql_using='gin')
+
+    # The search document and trigram indexes move from the source tables to `report_search`.
+    op.execute('DROP INDEX IF EXISTS ix_reporters_hospital_name_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_diseases_disease_name_trgm')
+    op.drop_index('ix_reports_search_vector', table_name='reports', postgresql_using='gin')
+    op.drop_column('reports', 'search_vector')
+    if _pg_trgm_available():
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_report_search_disease_name_trgm', 'report_search', ['disease_name'], unique=False, postgresql_using='gin', postgresql_ops={'disease_name': 'gin_trgm_ops'})
+        op.create_index('ix_report_search_hospital_name_trgm', 'report_search', ['hospital_name'], unique=False, postgresql_using='gin', postgresql_ops={'hospital_name': 'gin_trgm_ops'})
+
+    # Backfill one row per existing report. Must match `api.search_index.report_search_select`.
+    op.execute(
+        """
+        INSERT INTO report_search (report_id, status, created_at, updated_at, created_by, reporter_id,
+            hospital_name, disease_name, disease_category, severity_level, treatment_status, date_detected,
+            patient_count, search_vector)
+        SELECT r.id, r.status, r.created_at, r.updated_at, r.created_by, r.reporter_id,
+            rp.hospital_name, d.disease_name, d.disease_category, d.severity_level, d.treatment_status,
+            d.date_detected,
+            (SELECT count(*) FROM patient_reports pr WHERE pr.report_id = r.id),
+            setweight(to_tsvector('simple', coalesce(d.disease_name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(rp.hospital_name, '')), 'B')
+            || setweight(to_tsvector('simple', coalesce(CAST(d.symptoms AS TEXT), '')), 'C')
+            || setweight(to_tsvector('simple', coalesce(d.lab_results, '')), 'D')
+        FROM reports r
+        LEFT OUTER JOIN diseases d ON d.report_id = r.id
+        LEFT OUTER JOIN reporters rp ON rp.id = r.reporter_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS ix_report_search_hospital_name_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_report_search_disease_name_trgm')
+    op.drop_index('ix_report_search_search_vector', table_name='report_search', postgresql_using='gin')
+    op.drop_index('ix_report_search_status_created_at', table_name='report_search')
+    op.drop_table('report_search')
+
+    op.add_column('reports', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.create_index('ix_reports_search_vector', 'reports', ['search_vector'], unique=False, postgresql_using='gin')
+    if _pg_trgm_available():
+        op.create_index('ix_diseases_disease_name_trgm', 'diseases', ['disease_name'], unique=False, postgresql_using='gin', postgresql_ops={'disease_name': 'gin_trgm_ops'})
+        op.create_index('ix_reporters_hospital_name_trgm', 'reporters', ['hospital_name'], unique=False, postgresql_using='gin', postgresql_ops={'hospital_name': 'gin_trgm_ops'})
+    op.execute(
+        """
+        UPDATE reports SET search_vector = src.document
+        FROM (
+            SELECT r.id AS report_id,
+                setweight(to_tsvector('simple', coalesce(d.disease_name, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(rp.hospital_name, '')), 'B')
+                || setweight(to_tsvector('simple', coalesce(CAST(d.symptoms AS TEXT), '')), 'C')
+                || setweight(to_tsvector('simple', coalesce(d.lab_results, '')), 'D') AS document
+            FROM reports r
+            LEFT OUTER JOIN diseases d ON d.report_id = r.id
+            LEFT OUTER JOIN reporters rp ON rp.id = r.reporter_id
+        ) AS src
+        WHERE reports.id = src.report_id
+        """
+    )
@@ -0,0 +1,67 @@
+"""Report full text search
+
+Revision ID: c564d473db47
+Revises: e0b04aedef48
+Create Date: 2026-10-19 09:12:41.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c564d473db47'
+down_revision: Union[str, Sequence[str], None] = 'e0b04aedef48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _pg_trgm_available() -> bool:
+    """Whether the `pg_trgm` extension is installed or can be installed on this server."""
+    bind = op.get_bind()
+    return bool(
+        bind.execute(
+            sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        ).scalar()
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reports', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.create_index('ix_reports_search_vector', 'reports', ['search_vector'], unique=False, postgresql_using='gin')
+
+    # Trigram indexes need the `pg_trgm` contrib extension. It ships with the official postgres images,
+    # but some minimal builds omit contrib; substring search still works there, just without the index.
+    if _pg_trgm_available():
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_diseases_disease_name_trgm', 'diseases', ['disease_name'], unique=False, postgresql_using='gin', postgresql_ops={'disease_name': 'gin_trgm_ops'})
+        op.create_index('ix_reporters_hospital_name_trgm', 'reporters', ['hospital_name'], unique=False, postgresql_using='gin', postgresql_ops={'hospital_name': 'gin_trgm_ops'})
+
+    # Backfill the search document of existing reports. Must match `api.search_index.report_document_select`.
+    op.execute(
+        """
+        UPDATE reports SET search_vector = src.document
+        FROM (
+            SELECT r.id AS report_id,
+                setweight(to_tsvector('simple', coalesce(d.disease_name, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(rp.hospital_name, '')), 'B')
+                || setweight(to_tsvector('simple', coalesce(CAST(d.symptoms AS TEXT), '')), 'C')
+                || setweight(to_tsvector('simple', coalesce(d.lab_results, '')), 'D') AS document
+            FROM reports r
+            LEFT OUTER JOIN diseases d ON d.report_id = r.id
+            LEFT OUTER JOIN reporters rp ON rp.id = r.reporter_id
+        ) AS src
+        WHERE reports.id = src.report_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS ix_reporters_hospital_name_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_diseases_disease_name_trgm')
+    op.drop_index('ix_reports_search_vector', table_name='reports', postgresql_using='gin')
+    op.drop_column('reports', 'search_vector')
@@ -1,5 +1,7 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from api import models
+from api.metrics import timed_audit_write
 from datetime import datetime
 
 
@@ -19,5 +21,38 @@ def log_audit_event(
         changes=changes,
         timestamp=datetime.utcnow(),
     )
-    db.add(log_entry)
-    db.commit()
+    with timed_audit_write("single"):
+        db.add(log_entry)
+        db.commit()
+
+
+def log_audit_events(
+    db: Session,
+    user_id: int | None,
+    action: str,
+    entity_type: str,
+    changes_by_id: dict[int, dict | None],
+):
+    """Record the same action on many entities with one batched insert.
+
+    Unlike `log_audit_event`, does not commit: the entries are written in the caller's transaction,
+    together with the changes they record.
+    """
+    if not changes_by_id:
+        return
+    timestamp = datetime.utcnow()
+    with timed_audit_write("batch"):
+        db.execute(
+            insert(models.AuditLog),
+            [
+                {
+                    "user_id": user_id,
+                    "action": action,
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "changes": changes,
+                    "timestamp": timestamp,
+                }
+                for entity_id, changes in changes_by_id.items()
+            ],
+        )
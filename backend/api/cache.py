@@ -0,0 +1,800 @@
+"""
+Caching
+
+This module provides the caches of the API and the serialized report cache built on them.
+
+A `Cache` stores encoded values (bytes) in a `CacheBackend`:
+- `LocalCacheBackend`: a size bounded LRU in the memory of the process. The default.
+- `SharedCacheBackend`: entries stored in a `SharedStore`, so every worker on the host reads and fills
+  the same cache.
+
+A `SharedStore` is a SQLite database file, by default in `/dev/shm` (shared memory), accessed by all
+workers of the host. It exposes the subset of Redis commands the caches need (`get`, `set`, `delete`,
+`publish`), with the same semantics, and can be replaced by a Redis client where a server is available.
+
+Invalidations are broadcast: when a `Cache` is given a shared store, every invalidation is published
+on the cache's channel, and every worker applies the messages published by the others before each read
+or write. A worker therefore never serves an entry invalidated by another worker's commit, whichever
+backend holds the entries.
+
+Configuration (environment variables):
+- `CACHE_BACKEND`: `local` (default) or `shared`.
+- `CACHE_SHARED_PATH`: path of the shared store. With the `local` backend, setting it enables the
+  broadcast of invalidations between workers, which is required when running more than one worker.
+- `REPORT_CACHE_MAX_ENTRIES`, `REPORT_CACHE_MAX_BYTES`: bounds of the report cache.
+
+Every cache counts its hits, misses, writes, and invalidations, and the time spent in each operation
+(`Cache.stats`), and exports them as Prometheus metrics, by cache name (`cache_*` in `api/metrics.py`,
+served by `GET /metrics`).
+
+Report cache:
+- `report_cache` caches the serialized JSON of `GET /api/reports/{id}` responses, so that repeated reads
+  of a report skip the joined load and the Pydantic validation. Entries carry the report
+  version and validators (`ETag`, `Last-Modified`) they were built from.
+- Entries are invalidated when a transaction that changed the report commits. The IDs of changed
+  reports are collected by the `report_search` flush hooks (`api/search_index.py`), so every write
+  endpoint (report, reporter, disease, patient) invalidates the reports it affected, including other
+  reports sharing a changed reporter or patient. ORM bulk `UPDATE` / `DELETE` statements on report
+  tables, whose rows are unknown, clear the whole cache.
+- A cached report is served after checking its version against the database (a primary key lookup).
+  Approved reports are final, so when invalidations are broadcast (`Cache.is_coherent`) they are served
+  straight from the cache, without touching the database: only writes to children they share with other
+  reports can still change them, and those invalidate them in every worker. Without broadcast, another
+  worker's write would leave them stale indefinitely.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from api import conditional, models
+from api.enums import ReportStateEnum
+from api.metrics import (
+    CACHE_ENTRIES,
+    CACHE_INVALIDATIONS,
+    CACHE_OPERATION,
+    CACHE_READS,
+    CACHE_SIZE,
+    CACHE_WRITES,
+)
+from api.search_index import CHANGED_REPORTS_KEY
+
+V = TypeVar("V")
+
+# Key in `Session.info` set when the transaction ran an ORM bulk statement on a report table.
+_CLEAR_KEY = "report_cache_clear"
+
+# Entities whose bulk changes can affect any cached report.
+_REPORT_ENTITIES = (models.Report, models.Reporter, models.Disease, models.Patient)
+
+# Number of broadcast messages kept in a shared store. A worker that falls further behind clears its
+# caches instead of replaying them.
+MESSAGE_HISTORY = 10_000
+
+
+class LRUCache(Generic[V]):
+    """Thread safe least recently used cache, bounded by number of entries and total size.
+
+    Writes are guarded by a generation counter, incremented by every invalidation: a value computed
+    from data read before an invalidation is not stored after it. This prevents a slow reader from
+    caching a representation that a concurrent writer has just invalidated.
+
+    Args:
+        max_entries (int): Maximum number of entries.
+        max_size (int): Maximum total size of the entries, as measured by `size`.
+        size (Callable[[V], int]): Size of a value.
+    """
+
+    def __init__(self, max_entries: int, max_size: int, size: Callable[[V], int]):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._size = size
+        self._entries: OrderedDict[Hashable, V] = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_size(self) -> int:
+        """Total size of the cached values."""
+        return self._total_size
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the value cached for `key`, marking it as most recently used, or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V, generation: Optional[int] = None) -> bool:
+        """Cache `value` under `key`, evicting least recently used entries to stay within bounds.
+
+        Args:
+            key (Hashable): Cache key.
+            value (V): Value to cache.
+            generation (Optional[int]): `generation` read before the data `value` was built from. If the
+                cache has been invalidated since, the value is not stored.
+
+        Returns:
+            bool: Whether the value was stored. Values larger than `max_size` are never stored.
+        """
+        size = self._size(value)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            if size > self.max_size:
+                return False
+            self._pop(key)
+            self._entries[key] = value
+            self._total_size += size
+            while (
+                len(self._entries) > self.max_entries
+                or self._total_size > self.max_size
+            ):
+                self._pop(next(iter(self._entries)))
+            return True
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Remove the given keys, if cached."""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._pop(key)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._total_size = 0
+
+    def _pop(self, key: Hashable) -> None:
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self._total_size -= self._size(value)
+
+
+class SharedStore:
+    """Key-value store and message log in a SQLite file, shared by the processes of one host.
+
+    Implements the semantics of the Redis commands of the same names. Each process (and each fork of it)
+    opens its own connection, on first use.
+
+    Args:
+        path (str): Path of the database file, created if missing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @contextmanager
+    def _cursor(self, write: bool = False) -> Iterator[sqlite3.Cursor]:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._connection = self._connect()
+                self._pid = os.getpid()
+            cursor = self._connection.cursor()
+            if write:
+                cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                if write:
+                    cursor.execute("ROLLBACK")
+                raise
+            if write:
+                cursor.execute("COMMIT")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.executescript(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "  key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, written INTEGER NOT NULL"
+            ");"
+            "CREATE INDEX IF NOT EXISTS ix_entries_written ON entries (written);"
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "  id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, message TEXT NOT NULL"
+            ");"
+        )
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value of `key`, or None."""
+        with self._cursor() as cursor:
+            row = cursor.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(
+        self, key: str, value: bytes, watch: Optional[Tuple[str, int]] = None
+    ) -> bool:
+        """Set `key` to `value`.
+
+        Args:
+            key (str): Key.
+            value (bytes): Value.
+            watch (Optional[Tuple[str, int]]): `(channel, message ID)`. If given, the value is only set if no
+                message has been published on the channel after that message (as `WATCH` / `MULTI` would).
+
+        Returns:
+            bool: Whether the value was set.
+        """
+        with self._cursor(write=True) as cursor:
+            if watch is not None:
+                channel, after = watch
+                if cursor.execute(
+                    "SELECT 1 FROM messages WHERE channel = ? AND id > ? LIMIT 1",
+                    (channel, after),
+                ).fetchone():
+                    return False
+            cursor.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, written) VALUES "
+                "(?, ?, ?, (SELECT coalesce(max(written), 0) + 1 FROM entries))",
+                (key, value, len(value)),
+            )
+        return True
+
+    def delete(self, *keys: str) -> int:
+        """Delete the given keys, and return the number of keys that existed."""
+        with self._cursor(write=True) as cursor:
+            return sum(
+                cursor.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount
+                for key in keys
+            )
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete all keys starting with `prefix` (as `SCAN MATCH prefix*` followed by `DEL`)."""
+        with self._cursor(write=True) as cursor:
+            return cursor.execute(
+                "DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            ).rowcount
+
+    def evict(self, prefix: str, max_entries: int, max_size: int) -> int:
+        """Delete the oldest written keys starting with `prefix` until the rest fits in the given bounds.
+
+        Returns:
+            int: Number of keys deleted.
+        """
+        with self._cursor(write=True) as cursor:
+            rows = cursor.execute(
+                "SELECT key, size FROM entries WHERE substr(key, 1, ?) = ? ORDER BY written DESC",
+                (len(prefix), prefix),
+            ).fetchall()
+            total, evicted = 0, []
+            for index, (key, size) in enumerate(rows):
+                total += size
+                if index >= max_entries or total > max_size:
+                    evicted.append((key,))
+            cursor.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        return len(evicted)
+
+    def publish(self, channel: str, message: str) -> int:
+        """Publish `message` on `channel`, and return its ID."""
+        with self._cursor(write=True) as cursor:
+            cursor.execute(
+                "INSERT INTO messages (channel, message) VALUES (?, ?)",
+                (channel, message),
+            )
+            message_id = cursor.lastrowid
+            cursor.execute(
+                "DELETE FROM messages WHERE id <= ?", (message_id - MESSAGE_HISTORY,)
+            )
+        return message_id
+
+    def last_message_id(self) -> int:
+        """ID of the last published message, on any channel, or 0."""
+        with self._cursor() as cursor:
+            return cursor.execute(
+                "SELECT coalesce(max(id), 0) FROM messages"
+            ).fetchone()[0]
+
+    def messages(self, channel: str, after: int) -> Optional[List[Tuple[int, str]]]:
+        """Return the `(id, message)` of the messages published on `channel` after the given ID.
+
+        Returns None instead if messages after that ID have already been discarded, i.e. some were missed.
+        """
+        with self._cursor() as cursor:
+            first_id = cursor.execute("SELECT min(id) FROM messages").fetchone()[0]
+            if first_id is not None and first_id > after + 1:
+                return None
+            return cursor.execute(
+                "SELECT id, message FROM messages WHERE channel = ? AND id > ? ORDER BY id",
+                (channel, after),
+            ).fetchall()
+
+
+class CacheBackend(ABC):
+    """Storage of the encoded entries of one `Cache`."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored under `key`, or None."""
+
+    @abstractmethod
+    def set(
+        self, key: str, value: bytes, watch: Optional[Tuple[str, int]] = None
+    ) -> bool:
+        """Store `value` under `key`, evicting other entries to stay within bounds.
+
+        Args:
+            key (str): Key.
+            value (bytes): Encoded value.
+            watch (Optional[Tuple[str, int]]): Broadcast channel of the cache and ID of the last message
+                applied by the caller. Backends shared between workers do not store the value if an
+                invalidation was published since.
+
+        Returns:
+            bool: Whether the value was stored.
+        """
+
+    @abstractmethod
+    def delete(self, keys: Iterable[str]) -> None:
+        """Remove the given keys, if stored."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+    def usage(self) -> Optional[Tuple[int, int]]:
+        """Number and total size in bytes of the entries held by this process, None if not in memory."""
+        return None
+
+
+class LocalCacheBackend(CacheBackend):
+    """Entries in an `LRUCache` in the memory of the process.
+
+    Args:
+        max_entries (int): Maximum number of entries.
+        max_size (int): Maximum total size of the entries in bytes.
+    """
+
+    def __init__(self, max_entries: int, max_size: int):
+        self.entries: LRUCache[bytes] = LRUCache(max_entries, max_size, size=len)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+
+    def set(
+        self, key: str, value: bytes, watch: Optional[Tuple[str, int]] = None
+    ) -> bool:
+        return self.entries.set(key, value)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        self.entries.invalidate(keys)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def usage(self) -> Optional[Tuple[int, int]]:
+        return len(self.entries), self.entries.total_size
+
+
+class SharedCacheBackend(CacheBackend):
+    """Entries in a `SharedStore`, under keys prefixed by the cache name.
+
+    When the entries exceed their bounds, the least recently written ones are evicted. Checking the
+    bounds reads the sizes of all entries, which is acceptable for the few thousand entries of a
+    single host, on cache misses only.
+
+    Args:
+        store (SharedStore): The shared store.
+        prefix (str): Prefix of the keys of this backend.
+        max_entries (int): Maximum number of entries.
+        max_size (int): Maximum total size of the entries in bytes.
+    """
+
+    def __init__(
+        self, store: SharedStore, prefix: str, max_entries: int, max_size: int
+    ):
+        self.store = store
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self.max_size = max_size
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.store.get(self.prefix + key)
+
+    def set(
+        self, key: str, value: bytes, watch: Optional[Tuple[str, int]] = None
+    ) -> bool:
+        if len(value) > self.max_size:
+            return False
+        if not self.store.set(self.prefix + key, value, watch=watch):
+            return False
+        self.store.evict(self.prefix, self.max_entries, self.max_size)
+        return True
+
+    def delete(self, keys: Iterable[str]) -> None:
+        self.store.delete(*(self.prefix + key for key in keys))
+
+    def clear(self) -> None:
+        self.store.delete_prefix(self.prefix)
+
+
+@dataclass
+class CacheStats:
+    """Counters of one `Cache`.
+
+    Attributes:
+        hits (int): Reads that found an entry.
+        misses (int): Reads that found none.
+        sets (int): Entries stored.
+        rejected (int): Entries not stored, because they were too large or built from invalidated data.
+        invalidations (int): Keys invalidated by this process.
+        clears (int): Clears by this process.
+        remote_invalidations (int): Invalidation messages received from other processes.
+        calls (Counter): Number of calls of each operation (`get`, `set`, `invalidate`, `clear`, `sync`).
+        seconds (Counter): Total time spent in each operation, in seconds.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    rejected: int = 0
+    invalidations: int = 0
+    clears: int = 0
+    remote_invalidations: int = 0
+    calls: Counter = field(default_factory=Counter)
+    seconds: Counter = field(default_factory=Counter)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of reads that found an entry."""
+        reads = self.hits + self.misses
+        return self.hits / reads if reads else 0.0
+
+    def as_dict(self) -> dict:
+        """The counters as a JSON serializable dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "sets": self.sets,
+            "rejected": self.rejected,
+            "invalidations": self.invalidations,
+            "clears": self.clears,
+            "remote_invalidations": self.remote_invalidations,
+            "calls": dict(self.calls),
+            "seconds": {op: round(seconds, 6) for op, seconds in self.seconds.items()},
+        }
+
+
+class Cache(Generic[V]):
+    """Cache of values of type `V`, stored encoded in a `CacheBackend`.
+
+    Writes are guarded by a generation counter, incremented by every invalidation, local or received
+    from another process: a value computed from data read before an invalidation is not stored after it.
+
+    Args:
+        name (str): Name of the cache, used for its broadcast channel and as the `cache` label of its
+            metrics.
+        backend (CacheBackend): Storage of the entries.
+        encode (Callable[[V], bytes]): Encodes a value for storage.
+        decode (Callable[[bytes], V]): Decodes a stored value.
+        broadcast (Optional[SharedStore]): Store through which invalidations are exchanged with the other
+            processes of the host. None for a single process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: CacheBackend,
+        encode: Callable[[V], bytes],
+        decode: Callable[[bytes], V],
+        broadcast: Optional[SharedStore] = None,
+    ):
+        self.name = name
+        self.backend = backend
+        self.encode = encode
+        self.decode = decode
+        self.broadcast = broadcast
+        self.channel = f"invalidate:{name}"
+        self.stats = CacheStats()
+        self._hits = CACHE_READS.labels(name, "hit")
+        self._misses = CACHE_READS.labels(name, "miss")
+        self._stored = CACHE_WRITES.labels(name, "stored")
+        self._rejected = CACHE_WRITES.labels(name, "rejected")
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._last_message_id = broadcast.last_message_id() if broadcast else 0
+
+    @property
+    def is_coherent(self) -> bool:
+        """Whether invalidations reach every process of the host, so that no worker keeps an entry
+        invalidated by another worker's commit.
+
+        Only known when invalidations are broadcast: a cache without a shared store may be one of several
+        workers.
+        """
+        return self.broadcast is not None
+
+    @property
+    def _sender(self) -> str:
+        # Identifies this cache in this process (forks included) in broadcast messages.
+        return f"{os.getpid()}:{id(self)}"
+
+    @contextmanager
+    def _timed(self, operation: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.calls[operation] += 1
+            self.stats.seconds[operation] += elapsed
+            CACHE_OPERATION.labels(self.name, operation).observe(elapsed)
+
+    def _record_usage(self) -> None:
+        usage = self.backend.usage()
+        if usage is not None:
+            CACHE_ENTRIES.labels(self.name).set(usage[0])
+            CACHE_SIZE.labels(self.name).set(usage[1])
+
+    def _sync(self) -> None:
+        """Apply the invalidations broadcast by other processes since the last call."""
+        if self.broadcast is None:
+            return
+        with self._timed("sync"):
+            messages = self.broadcast.messages(self.channel, self._last_message_id)
+            with self._lock:
+                if messages is None:
+                    # Messages were missed, any entry may be stale.
+                    self.backend.clear()
+                    self.generation += 1
+                    self._last_message_id = self.broadcast.last_message_id()
+                    self._record_usage()
+                    return
+                for message_id, message in messages:
+                    self._last_message_id = message_id
+                    sender, keys = json.loads(message)
+                    if sender == self._sender:
+                        continue
+                    if keys is None:
+                        self.backend.clear()
+                    else:
+                        self.backend.delete(keys)
+                    self.generation += 1
+                    self.stats.remote_invalidations += 1
+                    CACHE_INVALIDATIONS.labels(self.name, "remote").inc()
+                if messages:
+                    self._record_usage()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the value cached for `key`, or None."""
+        self._sync()
+        with self._timed("get"):
+            data = self.backend.get(str(key))
+        if data is None:
+            self.stats.misses += 1
+            self._misses.inc()
+            return None
+        self.stats.hits += 1
+        self._hits.inc()
+        return self.decode(data)
+
+    def set(self, key: Hashable, value: V, generation: Optional[int] = None) -> bool:
+        """Cache `value` under `key`.
+
+        Args:
+            key (Hashable): Cache key.
+            value (V): Value to cache.
+            generation (Optional[int]): `generation` read before the data `value` was built from. If the
+                cache has been invalidated since, the value is not stored.
+
+        Returns:
+            bool: Whether the value was stored.
+        """
+        self._sync()
+        data = self.encode(value)
+        with self._timed("set"), self._lock:
+            if generation is not None and generation != self.generation:
+                stored = False
+            else:
+                stored = self.backend.set(
+                    str(key), data, watch=(self.channel, self._last_message_id)
+                )
+        if stored:
+            self.stats.sets += 1
+            self._stored.inc()
+            self._record_usage()
+        else:
+            self.stats.rejected += 1
+            self._rejected.inc()
+        return stored
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Remove the given keys in every process."""
+        keys = [str(key) for key in keys]
+        with self._timed("invalidate"):
+            with self._lock:
+                self.generation += 1
+                self.backend.delete(keys)
+            if self.broadcast is not None:
+                self.broadcast.publish(self.channel, json.dumps([self._sender, keys]))
+        self.stats.invalidations += len(keys)
+        CACHE_INVALIDATIONS.labels(self.name, "local").inc(len(keys))
+        self._record_usage()
+
+    def clear(self) -> None:
+        """Remove all entries in every process."""
+        with self._timed("clear"):
+            with self._lock:
+                self.generation += 1
+                self.backend.clear()
+            if self.broadcast is not None:
+                self.broadcast.publish(self.channel, json.dumps([self._sender, None]))
+        self.stats.clears += 1
+        CACHE_INVALIDATIONS.labels(self.name, "clear").inc()
+        self._record_usage()
+
+
+def shared_store_path() -> str:
+    """Path of the shared store: `CACHE_SHARED_PATH`, or a file in `/dev/shm` (or the temporary directory)."""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.getenv(
+        "CACHE_SHARED_PATH", os.path.join(directory, "disease-outbreak-cache.sqlite3")
+    )
+
+
+def build_cache(
+    name: str,
+    encode: Callable[[V], bytes],
+    decode: Callable[[bytes], V],
+    max_entries: int,
+    max_size: int,
+) -> Cache[V]:
+    """Build a cache configured by `CACHE_BACKEND` and `CACHE_SHARED_PATH`.
+
+    Args:
+        name (str): Name of the cache.
+        encode (Callable[[V], bytes]): Encodes a value for storage.
+        decode (Callable[[bytes], V]): Decodes a stored value.
+        max_entries (int): Maximum number of entries.
+        max_size (int): Maximum total size of the entries in bytes.
+
+    Raises:
+        ValueError: If `CACHE_BACKEND` is neither `local` nor `shared`.
+
+    Returns:
+        Cache[V]: The cache.
+    """
+    backend_name = os.getenv("CACHE_BACKEND", "local")
+    shared = backend_name == "shared" or "CACHE_SHARED_PATH" in os.environ
+    store = SharedStore(shared_store_path()) if shared else None
+
+    if backend_name == "local":
+        backend = LocalCacheBackend(max_entries, max_size)
+    elif backend_name == "shared":
+        backend = SharedCacheBackend(store, f"{name}:", max_entries, max_size)
+    else:
+        raise ValueError(
+            f"Unknown cache backend '{backend_name}', expected 'local' or 'shared'."
+        )
+    return Cache(name, backend, encode, decode, broadcast=store)
+
+
+@dataclass(frozen=True)
+class CachedReport:
+    """Serialized `schemas.Report` of one report, with the validators it was built from.
+
+    Attributes:
+        report_id (int): ID of the report.
+        version (int): `version` of the report when serialized.
+        modified_at (datetime): Last modification time of the report when serialized.
+        status (ReportStateEnum): Status of the report when serialized.
+        body (bytes): The JSON representation.
+    """
+
+    report_id: int
+    version: int
+    modified_at: datetime
+    status: ReportStateEnum
+    body: bytes
+
+    @property
+    def etag(self) -> str:
+        """Entity tag of the representation (see `conditional.version_etag`)."""
+        return conditional.version_etag(self.version)
+
+    @property
+    def headers(self) -> dict:
+        """Validator headers of the representation (see `conditional.validator_headers`)."""
+        return conditional.validator_headers(self.etag, self.modified_at)
+
+    @property
+    def is_read_only(self) -> bool:
+        """Whether the report is final (approved), so that only invalidations can make the entry stale.
+
+        Submitted and under review reports still change: they are claimed, transitioned, and returned to
+        draft.
+        """
+        return self.status == ReportStateEnum.approved
+
+    def encode(self) -> bytes:
+        """Encode the entry as a JSON header line followed by the body."""
+        header = [
+            self.report_id,
+            self.version,
+            self.modified_at.isoformat(),
+            self.status.name,
+        ]
+        return json.dumps(header).encode() + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CachedReport":
+        """Decode an entry encoded by `encode`."""
+        header, body = data.split(b"\n", 1)
+        report_id, version, modified_at, status = json.loads(header)
+        return cls(
+            report_id=report_id,
+            version=version,
+            modified_at=datetime.fromisoformat(modified_at),
+            status=ReportStateEnum[status],
+            body=body,
+        )
+
+
+report_cache: Cache[CachedReport] = build_cache(
+    "reports",
+    encode=CachedReport.encode,
+    decode=CachedReport.decode,
+    max_entries=int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "10000")),
+    max_size=int(os.getenv("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _detect_bulk_changes(orm_execute_state: ORMExecuteState) -> None:
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and any(
+        mapper.class_ in _REPORT_ENTITIES for mapper in orm_execute_state.all_mappers
+    ):
+        orm_execute_state.session.info[_CLEAR_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    report_ids = session.info.pop(CHANGED_REPORTS_KEY, None)
+    if session.info.pop(_CLEAR_KEY, False):
+        report_cache.clear()
+    elif report_ids:
+        report_cache.invalidate(report_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(CHANGED_REPORTS_KEY, None)
+    session.info.pop(_CLEAR_KEY, None)
@@ -0,0 +1,177 @@
+"""
+Conditional Requests
+
+This module implements HTTP conditional GET (RFC 9110, section 13) for report resources: entity tags
+(`ETag` / `If-None-Match`) and modification dates (`Last-Modified` / `If-Modified-Since`).
+
+A report's validators are its `version` and `updated_at` columns (see `Report.version` in `api/models.py`),
+which change whenever the report or one of its children (reporter, disease, patients) changes. Checking
+them is a primary key lookup, so an unchanged poll is answered with a `304 Not Modified` without loading
+or serializing the report.
+
+The entity tag of a report is its version (`"3"`, also the `version` field of its representation): the
+tag a GET returns is the one a write sends back in `If-Match`. These tags are strong, as the
+representation at a given URL is fully determined by the version. A representation restricted with
+`fields` / `include` is a different representation of the same version, so its tag also carries a digest
+of the fieldset (`"3-1a2b3c4d5e6f"`): it never validates the full representation, and never matches in
+`If-Match`. Diseases are written conditionally on
+their own version, in the same form. Tags of report lists are weak (`W/"..."`), and only used with
+`If-None-Match`.
+
+Writes to reports and diseases are made conditional with `If-Match` (optimistic concurrency): clients
+send the entity tag of the report or disease they last read (`If-Match: "3"`), and the write is refused
+with `409 Conflict` if the row has changed since. Writes to a report's reporter and patients are checked
+against the report's tag, as they advance its version. Entity tags are compared strongly, as RFC 9110
+requires for `If-Match`, so a weak tag never matches. The version columns are SQLAlchemy version counters,
+so a concurrent change landing between the check and the write is refused too (`StaleDataError`,
+answered with 409 by `api/main.py`). Without `If-Match`, writes are unconditional.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+# Sent with every validated response, so that clients revalidate instead of reusing stale copies.
+CACHE_CONTROL = "no-cache"
+
+
+def version_etag(version: int, variant: Optional[str] = None) -> str:
+    """Build the entity tag of a report or disease from its version.
+
+    Args:
+        version (int): `version` of the report or disease.
+        variant (Optional[str]): Identifies a partial representation (see `ReportFieldset.tag` in
+            `api/queries.py`). None for the full representation.
+
+    Returns:
+        str: Strong entity tag, e.g. `"3"`, or `"3-1a2b3c4d5e6f"` for a partial representation.
+    """
+    if variant is not None:
+        return f'"{version}-{variant}"'
+    return f'"{version}"'
+
+
+def collection_etag(
+    versions: Iterable[tuple[int, int]], variant: Optional[str] = None
+) -> str:
+    """Build the entity tag of a list of reports from their IDs and versions.
+
+    The tag changes when any listed report changes, and when reports are added to or removed from the list.
+
+    Args:
+        versions (Iterable[tuple[int, int]]): `(report_id, version)` of every listed report, in list order.
+        variant (Optional[str]): Identifies a list of partial representations (see `ReportFieldset.tag`
+            in `api/queries.py`). None for full representations.
+
+    Returns:
+        str: Weak entity tag, e.g. `W/"reports-3f5a..."`.
+    """
+    key = ",".join(f"{report_id}:{version}" for report_id, version in versions)
+    if variant is not None:
+        key += f";{variant}"
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return f'W/"reports-{digest[:20]}"'
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    """Build the `ETag`, `Last-Modified`, and `Cache-Control` headers of a response.
+
+    Args:
+        etag (str): Entity tag of the representation.
+        last_modified (Optional[datetime]): Time of the last modification, omitted if None.
+
+    Returns:
+        dict: The response headers.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # SQLite returns timestamps without their offset: they are stored in UTC.
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """Evaluate the `If-None-Match` and `If-Modified-Since` headers of a GET request.
+
+    As required by RFC 9110, `If-Modified-Since` is ignored when `If-None-Match` is present, entity tags
+    are compared weakly, and an unparsable date is ignored. Dates are compared at one second resolution,
+    the resolution of HTTP dates.
+
+    Args:
+        request (Request): The incoming request.
+        etag (str): Current entity tag of the resource.
+        last_modified (Optional[datetime]): Current modification time of the resource, if it has one.
+
+    Returns:
+        bool: True if the client's copy is current and a `304 Not Modified` should be returned.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        return "*" in candidates or _strip_weak(etag) in map(_strip_weak, candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def not_modified(headers: dict) -> Response:
+    """Build a `304 Not Modified` response, without a body.
+
+    Args:
+        headers (dict): The validator headers of the current representation (see `validator_headers`).
+
+    Returns:
+        Response: The empty 304 response.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def check_if_match(request: Request, version: Optional[int], resource: str) -> None:
+    """Evaluate the `If-Match` header of a write against the current version of the resource.
+
+    Entity tags are the versions (see `version_etag`), compared strongly: `"3"` matches version 3, but
+    the weak `W/"3"` does not. `*` matches any existing resource.
+
+    Args:
+        request (Request): The incoming request.
+        version (Optional[int]): Current version of the resource, None if it does not exist.
+        resource (str): Name of the resource, for the error message (e.g. "Report").
+
+    Raises:
+        HTTPException: 409 if `If-Match` is present and does not match the current version.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    candidates = [candidate.strip() for candidate in if_match.split(",")]
+    if version is not None and (
+        "*" in candidates or version_etag(version) in candidates
+    ):
+        return
+    if version is None:
+        raise HTTPException(status_code=409, detail=f"{resource} does not exist")
+    raise HTTPException(
+        status_code=409,
+        detail=f"{resource} was modified by another request (current version {version})",
+    )
@@ -1,8 +1,12 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 import os
+import threading
 
 from api.models import Base  # noqa: F401
+import api.search_index  # noqa: F401 - registers the search document flush hooks.
 
 # Always load .env file first
 try:
@@ -13,14 +17,88 @@ except ImportError:
     if os.getenv("ENV") != "prod":
         print("Warning: dotenv not installed. Environment variables may not be loaded.")
 
+# Imported once the environment is loaded, as it configures the caches from it.
+import api.cache  # noqa: E402,F401 - registers the cache invalidation hooks.
+from api.instrumentation import TimedQueuePool, instrument_engine  # noqa: E402
+from api.slow_query_log import log_slow_queries  # noqa: E402
 
-# Get DATABASE_URL
-DATABASE_URL: str | None = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL environment variable is not set.")
+# The engine is created on first use, from DATABASE_URL as set then: importing the application does not
+# need a database, and tests can choose theirs after importing it.
+_engine: Engine | None = None
+# Sync endpoints run in worker threads: the first requests must not each create an engine (and a pool).
+_engine_lock = threading.Lock()
+
+
+def create_database_engine(url: str) -> Engine:
+    """Create an instrumented engine for `url`.
+
+    An in-memory SQLite database only exists within its connection, so that engine shares a single
+    connection between threads. SQLite engines enforce foreign keys, and leave transactions to
+    SQLAlchemy, so that savepoints work (pysqlite otherwise begins and commits on its own).
+
+    Args:
+        url (str): Database URL.
+
+    Returns:
+        Engine: The engine, counting its statements in request metrics and logging the slow ones.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        if parsed.database in (None, "", ":memory:"):
+            options["poolclass"] = StaticPool
+        engine = create_engine(url, echo=False, future=True, **options)
+
+        @event.listens_for(engine, "connect")
+        def _configure_connection(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+            dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+        @event.listens_for(engine, "begin")
+        def _begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
+    else:
+        engine = create_engine(url, echo=False, future=True, poolclass=TimedQueuePool)
+    # Per-request query counts and timings, reported in `Server-Timing` headers.
+    instrument_engine(engine)
+    # Statements slower than `SLOW_QUERY_MS`, with sampled plans.
+    log_slow_queries(engine)
+    return engine
+
+
+def get_engine() -> Engine:
+    """Return the application engine, creating it from DATABASE_URL on the first call.
+
+    Raises:
+        ValueError: If DATABASE_URL is not set.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url = os.getenv("DATABASE_URL")
+                if not url:
+                    raise ValueError("DATABASE_URL environment variable is not set.")
+                _engine = create_database_engine(url)
+    return _engine
+
+
+class _LazySessionmaker(sessionmaker):
+    """Session factory bound to the application engine, created by the first session."""
+
+    def __call__(self, **local_kw) -> Session:
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
 
-# Create sync engine
-engine = create_engine(DATABASE_URL, echo=False, future=True)
 
 # Create session factory (sync)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False, future=True)
+
+
+def __getattr__(name: str):
+    # `from api.database import engine` still works, and creates the engine.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,12 @@
 from typing import Optional
 from api.database import SessionLocal
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 from api.enums import UserRoleEnum
 from api import models
+from api.queries import REPORT_FIELDS, REPORT_RELATIONSHIPS, ReportFieldset
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -21,9 +22,18 @@ def get_db():
         db.close()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> models.User:
+def decode_access_token(token: str) -> str:
+    """Verify an access token and return its subject, the user's email.
+
+    Args:
+        token (str): JWT access token, as created by `auth.create_access_token`.
+
+    Raises:
+        HTTPException: 401 if the token is invalid, expired, or has no subject.
+
+    Returns:
+        str: Email of the user the token was issued to.
+    """
     credentials_exception = HTTPException(
         status_code=401, detail="Could not validate credentials"
     )
@@ -34,11 +44,17 @@ def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    return email
+
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> models.User:
+    email = decode_access_token(token)
     user = db.query(models.User).filter(models.User.email == email).first()
 
     if user is None:
-        raise credentials_exception
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
     return user
 
 
@@ -46,3 +62,21 @@ def senior_required(user: models.User = Depends(get_current_user)):
     if user.role != UserRoleEnum.senior:
         raise HTTPException(status_code=403, detail="Access forbidden for your role")
     return user
+
+
+def report_fieldset(
+    fields: Optional[str] = Query(
+        None,
+        description=f"Comma separated report fields to return ({', '.join(REPORT_FIELDS)}). `id` is always "
+        "returned. Defaults to all fields.",
+    ),
+    include: Optional[str] = Query(
+        None,
+        description=f"Comma separated relationships to return ({', '.join(REPORT_RELATIONSHIPS)}). Defaults "
+        "to all relationships, or to none when `fields` is given.",
+    ),
+) -> ReportFieldset:
+    try:
+        return ReportFieldset.parse(fields, include)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
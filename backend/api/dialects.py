@@ -0,0 +1,170 @@
+"""
+Dialect-Portable SQL
+
+This module provides SQL expressions whose PostgreSQL spelling has no direct equivalent in SQLite, each
+compiled to the native form of the dialect it runs on:
+
+- `age_in_years(born, on)`: whole years from `born` to `on`, e.g. a patient's age on a given date.
+  PostgreSQL: `date_part('year', age(on, born))`. SQLite: the difference of the years, less one if the
+  anniversary has not been reached (`strftime('%m-%d', ...)` compared as text).
+- `date_trunc(unit, value)`: `value` truncated to the start of its `year`, `month`, `week` (Monday),
+  `day`, `hour`, or `minute`. PostgreSQL: `date_trunc`. SQLite: `strftime` to the same
+  `YYYY-MM-DD HH:MM:SS` text the `DateTime` type stores.
+- `json_contains(column, values)`: whether the JSON array in `column` contains every element of the
+  list `values`. PostgreSQL: `CAST(column AS JSONB) @> :values` (the columns are `JSON`, which has no
+  containment operator). SQLite: no element of `values` missing from `json_each(column)`. Only arrays of
+  scalars are supported, as stored in `Disease.symptoms`.
+
+Any other dialect raises `CompileError`. The application runs on PostgreSQL, SQLite is the database of the
+fast test profile (`pytest --sqlite`, see `tests/conftest.py`).
+"""
+
+from datetime import date, datetime
+from typing import Any, List, Union
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Integer,
+    cast,
+    func,
+    literal,
+    select,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+# strftime formats truncating a SQLite date or datetime to each unit, and the modifiers applied first.
+_SQLITE_TRUNCATIONS = {
+    "year": ("%Y-01-01 00:00:00", ()),
+    "month": ("%Y-%m-01 00:00:00", ()),
+    # Back six days, then forward to the next Monday: the Monday of the value's week.
+    "week": ("%Y-%m-%d 00:00:00", ("-6 days", "weekday 1")),
+    "day": ("%Y-%m-%d 00:00:00", ()),
+    "hour": ("%Y-%m-%d %H:00:00", ()),
+    "minute": ("%Y-%m-%d %H:%M:00", ()),
+}
+
+
+class age_in_years(FunctionElement):
+    """Whole years from `born` to `on`.
+
+    Args:
+        born: Date of birth, a column or a date.
+        on: Date the age is computed on, a column or a date.
+    """
+
+    type = Integer()
+    name = "age_in_years"
+    inherit_cache = True
+
+    def __init__(
+        self, born: Union[ColumnElement, date], on: Union[ColumnElement, date]
+    ):
+        super().__init__(born, on)
+
+
+class date_trunc(FunctionElement):
+    """`value` truncated to the start of `unit`.
+
+    Args:
+        unit (str): `year`, `month`, `week`, `day`, `hour`, or `minute`.
+        value: A date or timestamp column, or a datetime.
+
+    Raises:
+        ValueError: If the unit is not supported.
+    """
+
+    type = DateTime()
+    name = "date_trunc"
+    inherit_cache = False
+
+    def __init__(self, unit: str, value: Union[ColumnElement, datetime]):
+        if unit not in _SQLITE_TRUNCATIONS:
+            raise ValueError(
+                f"Unsupported unit {unit!r}, expected one of {', '.join(_SQLITE_TRUNCATIONS)}"
+            )
+        self.unit = unit
+        super().__init__(value)
+
+
+class json_contains(FunctionElement):
+    """Whether the JSON array in `column` contains every element of `values`.
+
+    Args:
+        column: A JSON column holding an array of scalars.
+        values (List): Scalars that must all be in the array.
+    """
+
+    type = Boolean()
+    name = "json_contains"
+    inherit_cache = False
+
+    def __init__(self, column: ColumnElement, values: List[Any]):
+        self.values = list(values)
+        super().__init__(column)
+
+
+@compiles(age_in_years)
+@compiles(date_trunc)
+@compiles(json_contains)
+def _unsupported(element, compiler, **kw):
+    raise CompileError(
+        f"{element.name} is not supported on {compiler.dialect.name}, only on PostgreSQL and SQLite"
+    )
+
+
+@compiles(age_in_years, "postgresql")
+def _age_in_years_postgresql(element, compiler, **kw):
+    born, on = element.clauses
+    return compiler.process(func.date_part("year", func.age(on, born)), **kw)
+
+
+@compiles(age_in_years, "sqlite")
+def _age_in_years_sqlite(element, compiler, **kw):
+    born, on = element.clauses
+    years = cast(func.strftime("%Y", on), Integer) - cast(
+        func.strftime("%Y", born), Integer
+    )
+    before_anniversary = cast(
+        func.strftime("%m-%d", on) < func.strftime("%m-%d", born), Integer
+    )
+    return compiler.process(years - before_anniversary, **kw)
+
+
+@compiles(date_trunc, "postgresql")
+def _date_trunc_postgresql(element, compiler, **kw):
+    (value,) = element.clauses
+    return compiler.process(func.date_trunc(element.unit, value), **kw)
+
+
+@compiles(date_trunc, "sqlite")
+def _date_trunc_sqlite(element, compiler, **kw):
+    (value,) = element.clauses
+    format, modifiers = _SQLITE_TRUNCATIONS[element.unit]
+    return compiler.process(func.strftime(format, value, *modifiers), **kw)
+
+
+@compiles(json_contains, "postgresql")
+def _json_contains_postgresql(element, compiler, **kw):
+    (column,) = element.clauses
+    return compiler.process(
+        cast(column, JSONB).op("@>")(literal(element.values, JSONB)), **kw
+    )
+
+
+@compiles(json_contains, "sqlite")
+def _json_contains_sqlite(element, compiler, **kw):
+    (column,) = element.clauses
+    wanted = func.json_each(literal(element.values, JSON)).table_valued("value")
+    held = func.json_each(column).table_valued("value")
+    missing = (
+        select(wanted.c.value)
+        .where(wanted.c.value.not_in(select(held.c.value).scalar_subquery()))
+        .exists()
+    )
+    return compiler.process(~missing, **kw)
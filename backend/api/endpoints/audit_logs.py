@@ -14,8 +14,9 @@ from typing import List, Optional
 
 from api import models, schemas
 from api.dependencies import get_db, senior_required
+from api.instrumentation import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get(
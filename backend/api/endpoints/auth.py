@@ -17,10 +17,11 @@ from passlib.context import CryptContext
 from api import models, schemas
 from api.dependencies import get_db
 from api.enums import UserRoleEnum
+from api.instrumentation import TimedRoute
 
 from jose import jwt
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -15,6 +15,8 @@ Business Rules:
 - Disease records are managed via a one-to-one relationship with reports.
 - Deleting a report cascade-deletes the associated disease.
 - Full audit logging is performed on all create, update, and delete actions.
+- Updates and deletions accept an `If-Match` header with the disease's `version`, and answer
+  `409 Conflict` if it changed since it was read (see `api/conditional.py`).
 
 Security:
 - Write actions (POST, DELETE) require authenticated users.
@@ -24,15 +26,16 @@ Returns:
     JSON responses with disease details or confirmation messages.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Path, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Path, Request, status
+from sqlalchemy.orm import Session, joinedload
 from datetime import date
 
-from api import models, schemas
+from api import conditional, models, queries, schemas
 from api.dependencies import get_db, get_current_user
 from api.audit_log import log_audit_event
+from api.instrumentation import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 # -------------------------------
@@ -61,14 +64,14 @@ def get_disease(report_id: int = Path(..., gt=0), db: Session = Depends(get_db))
     Returns:
         schemas.Disease: The disease details associated with the given report.
     """
-    report = db.query(models.Report).filter(models.Report.id == report_id).first()
-    if not report:
+    report_exists, disease = queries.get_report_disease(db, report_id)
+    if not report_exists:
         raise HTTPException(status_code=404, detail="Report not found")
-    if not report.disease:
+    if not disease:
         raise HTTPException(
             status_code=404, detail="No disease assigned to this report"
         )
-    return report.disease
+    return disease
 
 
 # -------------------------------
@@ -86,11 +89,15 @@ def get_disease(report_id: int = Path(..., gt=0), db: Session = Depends(get_db))
         400: {
             "description": "Invalid request, report not in draft or date detected is in the future"
         },
+        409: {
+            "description": "Disease version does not match If-Match, or changed concurrently"
+        },
     },
 )
 def create_or_update_disease(
     report_id: int,
     disease_data: schemas.DiseaseCreate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -103,23 +110,29 @@ def create_or_update_disease(
     - Disease date cannot be in the future.
     - Operation allowed only if report is in draft status.
     - Audit logs are created for both creation and update actions.
+    - With `If-Match`, the disease is updated only if its `version` matches.
 
     Args:
         report_id (int): ID of the report to which disease is being linked.
         disease_data (schemas.DiseaseCreate): Input payload containing disease details.
+        request (Request): The incoming request, for its `If-Match` header.
         db (Session): SQLAlchemy session dependency.
         current_user (models.User): Authenticated user making the request.
 
     Raises:
         HTTPException (404): If report not found.
+        HTTPException (409): If the disease's version does not match `If-Match`, or it changed concurrently.
         HTTPException (400): If report is not in draft or date_detected is invalid.
 
     Returns:
         schemas.Disease: The created or updated disease instance.
     """
-    report = db.query(models.Report).filter(models.Report.id == report_id).first()
+    report = _load_report_with_disease(db, report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
+    conditional.check_if_match(
+        request, report.disease.version if report.disease else None, "Disease"
+    )
 
     if report.status != models.ReportStateEnum.draft:
         raise HTTPException(
@@ -185,10 +198,14 @@ def create_or_update_disease(
     responses={
         404: {"description": "Report or disease not found"},
         400: {"description": "Cannot delete disease from non-draft report"},
+        409: {
+            "description": "Disease version does not match If-Match, or changed concurrently"
+        },
     },
 )
 def delete_disease(
     report_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -199,20 +216,23 @@ def delete_disease(
     - Disease removal is only allowed on draft reports.
     - The disease is deleted using ORM `delete-orphan` cascade via the report relationship.
     - Audit log is created recording the deletion event.
+    - With `If-Match`, the disease is deleted only if its `version` matches.
 
     Args:
         report_id (int): Unique identifier of the report.
+        request (Request): The incoming request, for its `If-Match` header.
         db (Session): SQLAlchemy session dependency.
         current_user (models.User): Authenticated user performing the deletion.
 
     Raises:
         HTTPException (404): If the report or disease does not exist.
+        HTTPException (409): If the disease's version does not match `If-Match`, or it changed concurrently.
         HTTPException (400): If the report is not in draft state.
 
     Returns:
         dict: Confirmation message on successful deletion.
     """
-    report = db.query(models.Report).filter(models.Report.id == report_id).first()
+    report = _load_report_with_disease(db, report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
@@ -223,6 +243,7 @@ def delete_disease(
 
     if not report.disease:
         raise HTTPException(status_code=404, detail="No disease to delete")
+    conditional.check_if_match(request, report.disease.version, "Disease")
 
     disease_id = report.disease.id
     report.disease = None  # triggers delete-orphan cascade
@@ -239,3 +260,13 @@ def delete_disease(
     )
 
     return {"detail": "Disease deleted successfully"}
+
+
+def _load_report_with_disease(db: Session, report_id: int) -> models.Report | None:
+    # One query for both, where accessing `report.disease` would lazy load it with a second one.
+    return (
+        db.query(models.Report)
+        .options(joinedload(models.Report.disease))
+        .filter(models.Report.id == report_id)
+        .first()
+    )
@@ -1,14 +1,62 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 import csv
 import io
+from typing import List
 
-from api import models, schemas
+from api import models, queries
+from api.serializers import FastJSONResponse, dump_reports
 from api.dependencies import get_db, get_current_user
 from api.audit_log import log_audit_event
+from api.instrumentation import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+CSV_COLUMNS = [
+    "report_id",
+    "status",
+    "created_at",
+    "updated_at",
+    "reporter_email",
+    "patients",
+    "disease_name",
+]
+
+
+def csv_row(report: models.Report) -> list:
+    """The CSV export row of a report, its relationships loaded."""
+    patient_names = (
+        ", ".join(f"{p.first_name} {p.last_name}" for p in report.patients)
+        if report.patients
+        else ""
+    )
+    return [
+        report.id,
+        report.status.value,
+        report.created_at.isoformat() if report.created_at else "",
+        report.updated_at.isoformat() if report.updated_at else "",
+        report.reporter.email if report.reporter else "",
+        patient_names,
+        report.disease.disease_name if report.disease else "",
+    ]
+
+
+def write_csv(reports: List[models.Report]) -> io.StringIO:
+    """Write the CSV export of reports, with a header row.
+
+    Args:
+        reports (List[models.Report]): Reports with their reporter, disease, and patients loaded.
+
+    Returns:
+        io.StringIO: The CSV document, positioned at its start.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_COLUMNS)
+    writer.writerows(csv_row(report) for report in reports)
+    output.seek(0)
+    return output
 
 
 @router.get(
@@ -42,20 +90,12 @@ def export_reports(
         user (models.User): Authenticated user requesting the export.
 
     Returns:
-        JSONResponse or StreamingResponse: Exported data.
+        FastJSONResponse or StreamingResponse: Exported data.
     """
     if format.lower() not in {"json", "csv"}:
         raise HTTPException(status_code=400, detail="Format must be 'json' or 'csv'")
 
-    reports = (
-        db.query(models.Report)
-        .options(
-            joinedload(models.Report.reporter),
-            joinedload(models.Report.patients),
-            joinedload(models.Report.disease),
-        )
-        .all()
-    )
+    reports = queries.report_details(db).all()
 
     # Log the export event
     log_audit_event(
@@ -68,51 +108,10 @@ def export_reports(
     )
 
     if format.lower() == "json":
-        data = [
-            schemas.Report.model_validate(r, from_attributes=True).model_dump(
-                mode="json"
-            )
-            for r in reports
-        ]
-        return JSONResponse(content=data)
-
-    # CSV export
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    writer.writerow(
-        [
-            "report_id",
-            "status",
-            "created_at",
-            "updated_at",
-            "reporter_email",
-            "patients",
-            "disease_name",
-        ]
-    )
+        return FastJSONResponse(content=dump_reports(reports))
 
-    for r in reports:
-        patient_names = (
-            ", ".join(f"{p.first_name} {p.last_name}" for p in r.patients)
-            if r.patients
-            else ""
-        )
-        writer.writerow(
-            [
-                r.id,
-                r.status.value,
-                r.created_at.isoformat() if r.created_at else "",
-                r.updated_at.isoformat() if r.updated_at else "",
-                r.reporter.email if r.reporter else "",
-                patient_names,
-                r.disease.disease_name if r.disease else "",
-            ]
-        )
-
-    output.seek(0)
     return StreamingResponse(
-        output,
+        write_csv(reports),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=reports.csv"},
     )
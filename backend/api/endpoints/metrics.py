@@ -0,0 +1,31 @@
+"""
+Metrics Endpoint
+
+This module exposes the application metrics (see `api/metrics.py`) in the Prometheus text format, for
+scraping by a Prometheus server.
+
+Endpoints:
+- GET /metrics: Metrics of this worker, or of every worker of the host when `PROMETHEUS_MULTIPROC_DIR`
+  is set.
+
+Not authenticated, and left out of the OpenAPI schema: restrict access to it at the reverse proxy.
+"""
+
+from fastapi import APIRouter, Response
+
+from api.metrics import metrics_response
+from api.instrumentation import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("", include_in_schema=False)
+def get_metrics() -> Response:
+    """
+    Render the current metrics.
+
+    Returns:
+        Response: The Prometheus text exposition.
+    """
+    content, media_type = metrics_response()
+    return Response(content=content, media_type=media_type)
@@ -13,6 +13,12 @@ Endpoints include:
 Audit logging is automatically handled for all create, update, and delete operations,
 ensuring full traceability of data changes.
 
+Writes accept an `If-Match` header with the version of the report they change, and answer `409 Conflict`
+if it changed since it was read (see `api/conditional.py`): a patient edit made in one tab does not
+overwrite a newer edit of the same report made in another. A patient belongs to no report when created,
+so creations never match, and deleting a patient changes every report it is linked to, so all of their
+entity tags must be listed.
+
 Security:
 - Most endpoints require authenticated users.
 - Audit logging captures the user ID for traceability.
@@ -21,15 +27,16 @@ Returns:
     - Patient records, list of patients associated with reports, or confirmation of deletions.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from api import models, schemas
+from api import conditional, models, queries, schemas
 from api.dependencies import get_db, get_current_user
 from api.audit_log import log_audit_event
+from api.instrumentation import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 # -------------------------------
@@ -45,10 +52,12 @@ router = APIRouter()
     responses={
         404: {"description": "Report not found or one or more patients not found"},
         400: {"description": "Invalid patient data or report not in draft state"},
+        409: {"description": "Report version does not match If-Match"},
     },
 )
 def add_or_update_patients_to_report(
     patient_link: schemas.ReportPatientsLink,
+    request: Request,
     report_id: int = Path(..., description="Report ID"),
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
@@ -57,16 +66,19 @@ def add_or_update_patients_to_report(
     Add or update the list of patients associated with a report.
 
     This endpoint allows replacing the entire list of patients linked to a report
-    with a new set of patient IDs provided by the client.
+    with a new set of patient IDs provided by the client. With `If-Match`, the patients
+    are replaced only if the report's `version` matches.
 
     Args:
         patient_link (schemas.ReportPatientsLink): List of patient IDs to associate with the report.
+        request (Request): The incoming request, for its `If-Match` header.
         report_id (int): ID of the report to update patient associations.
         db (Session): SQLAlchemy database session.
         user (models.User): Authenticated user performing the operation.
 
     Raises:
         HTTPException (404): If the report is not found.
+        HTTPException (409): If the report's version does not match `If-Match`.
         HTTPException (404): If one or more patient IDs do not exist in the system.
 
     Returns:
@@ -75,6 +87,7 @@ def add_or_update_patients_to_report(
     report = db.query(models.Report).filter(models.Report.id == report_id).first()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
+    conditional.check_if_match(request, report.version, "Report")
 
     patients = (
         db.query(models.Patient)
@@ -85,6 +98,8 @@ def add_or_update_patients_to_report(
     if len(patients) != len(patient_link.patient_ids):
         raise HTTPException(status_code=404, detail="One or more patients not found")
 
+    # Read before the commit expires the patients, which would reload them one by one.
+    patient_ids = [p.id for p in patients]
     report.patients = patients
     db.commit()
     db.refresh(report)
@@ -95,7 +110,7 @@ def add_or_update_patients_to_report(
         action="UPDATE",
         entity_type="Report",
         entity_id=report_id,
-        changes={"patients": [p.id for p in patients]},
+        changes={"patients": patient_ids},
     )
 
     return report.patients
@@ -130,11 +145,11 @@ def get_patients_for_report(
     Returns:
         List[schemas.Patient]: List of patients associated with the report.
     """
-    report = db.query(models.Report).filter(models.Report.id == report_id).first()
-    if not report:
+    report_exists, patients = queries.get_report_patients(db, report_id)
+    if not report_exists:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    return report.patients
+    return patients
 
 
 # -------------------------------
@@ -149,10 +164,12 @@ def get_patients_for_report(
     response_description="The newly created patient record.",
     responses={
         400: {"description": "Invalid patient data"},
+        409: {"description": "If-Match was sent: the patient does not exist yet"},
     },
 )
 def create_patient(
     patient_data: schemas.PatientCreate,
+    request: Request,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
@@ -164,12 +181,18 @@ def create_patient(
 
     Args:
         patient_data (schemas.PatientCreate): Patient details.
+        request (Request): The incoming request, for its `If-Match` header.
         db (Session): SQLAlchemy database session.
         user (models.User): Authenticated user performing the creation.
 
+    Raises:
+        HTTPException (409): If `If-Match` is present, as there is no current patient for it to match.
+
     Returns:
         schemas.Patient: The newly created patient record.
     """
+    conditional.check_if_match(request, None, "Patient")
+
     patient = models.Patient(**patient_data.model_dump())
     db.add(patient)
     db.commit()
@@ -232,9 +255,13 @@ def get_patient_by_id(
     summary="Delete a patient",
     description="Deletes a patient record independently of reports. This removes only the patient and its report associations.",
     response_description="Patient deleted successfully.",
-    responses={404: {"description": "Patient not found"}},
+    responses={
+        404: {"description": "Patient not found"},
+        409: {"description": "A linked report's version does not match If-Match"},
+    },
 )
 def delete_patient(
+    request: Request,
     patient_id: int = Path(..., description="Patient ID"),
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
@@ -246,14 +273,18 @@ def delete_patient(
     - Deletes the patient.
     - Removes any association between the patient and reports via the association table.
     - Does not delete or alter any reports the patient was previously linked to.
+    - With `If-Match`, deletes the patient only if the `version` of every report it is linked to is
+      listed (e.g. `If-Match: "3", "7"`).
 
     Args:
+        request (Request): The incoming request, for its `If-Match` header.
         patient_id (int): ID of the patient to delete.
         db (Session): SQLAlchemy database session.
         user (models.User): Authenticated user performing the deletion.
 
     Raises:
         HTTPException (404): If the patient is not found.
+        HTTPException (409): If the version of a linked report does not match `If-Match`.
 
     Returns:
         None
@@ -261,6 +292,8 @@ def delete_patient(
     patient = db.query(models.Patient).filter(models.Patient.id == patient_id).first()
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
+    for report in patient.reports:
+        conditional.check_if_match(request, report.version, "Report")
 
     db.delete(patient)
     db.commit()
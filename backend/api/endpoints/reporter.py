@@ -15,6 +15,8 @@ Features:
     - Only allows assigning or modifying reporter details on draft reports.
     - Includes audit logging for all create and update actions.
     - Requires authenticated user access for all operations.
+    - Accepts an `If-Match` header with the report's `version`, and answers `409 Conflict` if the report
+      changed since it was read (see `api/conditional.py`).
 
 Security:
     - All endpoints require valid authentication via JWT token.
@@ -26,13 +28,14 @@ See Also:
     - Audit Logging: `log_audit_event` in `audit_log.py`
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from api import models, schemas
+from api import conditional, models, queries, schemas
 from api.dependencies import get_db, get_current_user
 from api.audit_log import log_audit_event
+from api.instrumentation import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 # -------------------------------
@@ -48,11 +51,13 @@ router = APIRouter()
     responses={
         404: {"description": "Report not found"},
         400: {"description": "Reporter can only be added to draft reports"},
+        409: {"description": "Report version does not match If-Match"},
     },
 )
 def add_or_update_reporter(
     report_id: int,
     reporter_data: schemas.ReporterCreate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -68,16 +73,19 @@ def add_or_update_reporter(
         - Reporter uniqueness is determined by email address.
         - Automatically creates or updates the reporter and links them to the report.
         - Triggers audit log events for both reporter creation and update actions.
+        - With `If-Match`, the reporter is assigned only if the report's `version` matches.
 
     Args:
         report_id (int): ID of the report to which the reporter should be assigned.
         reporter_data (schemas.ReporterCreate): Reporter information including name, contact details,
             job title, and organization details.
+        request (Request): The incoming request, for its `If-Match` header.
         db (Session): Database session dependency.
         current_user (models.User): Authenticated user performing the action.
 
     Raises:
         HTTPException (404): If the report does not exist.
+        HTTPException (409): If the report's version does not match `If-Match`.
         HTTPException (400): If the report is not in draft status.
 
     Returns:
@@ -86,6 +94,7 @@ def add_or_update_reporter(
     report = db.query(models.Report).filter(models.Report.id == report_id).first()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
+    conditional.check_if_match(request, report.version, "Report")
     if report.status != schemas.ReportStateEnum.draft:
         raise HTTPException(
             status_code=400, detail="Reporter can only be added to draft reports"
@@ -168,13 +177,13 @@ def get_reporter_by_report(
     Returns:
         schemas.Reporter: The reporter details associated with the report.
     """
-    report = db.query(models.Report).filter(models.Report.id == report_id).first()
-    if not report:
+    report_exists, reporter = queries.get_report_reporter(db, report_id)
+    if not report_exists:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    if not report.reporter:
+    if not reporter:
         raise HTTPException(
             status_code=404, detail="Reporter not associated with this report"
         )
 
-    return report.reporter
+    return reporter
@@ -12,26 +12,50 @@ Each report records details of a disease outbreak and is associated with:
 Endpoints:
 - POST   /api/reports: Create a new draft report.
 - GET    /api/reports: List paginated reports.
+- POST   /api/reports/batch: Retrieve many reports by ID in one request.
+- POST   /api/reports/transitions: Move many reports to a new state (see `api/state_machine.py`).
 - GET    /api/reports/{id}: Retrieve full report details.
 - PUT    /api/reports/{id}: Update draft report status.
 - DELETE /api/reports/{id}: Delete draft report.
 
+Conditional requests:
+- GET endpoints send an `ETag`, and single reports also a `Last-Modified` date.
+- Requests whose `If-None-Match` / `If-Modified-Since` match are answered with `304 Not Modified` (see
+  `api/conditional.py`).
+- Serialized single reports are cached in memory and invalidated on commit (see `api/cache.py`).
+- PUT and DELETE accept an `If-Match` header with the report's `version`, and answer `409 Conflict` if it
+  changed since (optimistic concurrency).
+
+Sparse fieldsets:
+- GET endpoints accept `fields` (scalar fields) and `include` (relationships) to return, and load, only
+  part of each report (see `queries.ReportFieldset`).
+
 Security:
 - Requires authentication via `get_current_user`.
-- Audit logs are generated for create, update, and delete actions.
+- Audit logs are generated for create, update, delete, and state transition actions.
 
 Dependencies:
 - FastAPI, SQLAlchemy ORM, JWT-based user authentication.
 - Related models: Report, Reporter, Disease, Patient, User.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from api import models, schemas
-from api.dependencies import get_db, get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from api import conditional, models, queries, schemas, state_machine
+from api.cache import CachedReport, report_cache
+from api.serializers import (
+    FastJSONResponse,
+    dump_report,
+    dump_report_batch,
+    dump_reports,
+)
+from api.dependencies import get_db, get_current_user, report_fieldset
 from api.audit_log import log_audit_event
+from api.instrumentation import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 # -------------------------------
@@ -135,6 +159,9 @@ def create_report(
                 }
             },
         },
+        304: {
+            "description": "Not Modified - The page matches the `If-None-Match` entity tag"
+        },
         401: {"description": "Unauthorized - Invalid or missing authentication token"},
         403: {
             "description": "Forbidden - User does not have permission to view reports"
@@ -142,8 +169,10 @@ def create_report(
     },
 )
 def list_reports(
+    request: Request,
     skip: int = 0,
     limit: int = 20,
+    fieldset: queries.ReportFieldset = Depends(report_fieldset),
     db: Session = Depends(get_db),
 ):
     """
@@ -153,27 +182,141 @@ def list_reports(
     Each report includes nested reporter, patient, and disease data using eager loading
     to avoid N+1 query issues.
 
+    `fields` and `include` restrict the response, and the columns and relationships loaded, to the
+    requested fields (e.g. `?fields=id,status,created_at` for a table view).
+
+    The response carries an `ETag` derived from the IDs and versions of the reports on the page, and from
+    `fields` and `include`.
+    A request whose `If-None-Match` matches it is answered with an empty `304 Not Modified`
+    after a single index scan. No `Last-Modified` is sent, as removing a report from the page
+    would not advance it.
+
     Args:
+        request (Request): Incoming request, for its conditional headers.
         skip (int): Number of records to skip for pagination. Defaults to 0.
         limit (int): Maximum number of reports to return. Defaults to 20.
+        fieldset (queries.ReportFieldset): Fields to return, from the `fields` and `include` parameters.
         db (Session): SQLAlchemy database session.
 
     Returns:
         list[schemas.Report]: List of report objects with associations.
     """
 
-    reports = (
-        db.query(models.Report)
-        .options(
-            joinedload(models.Report.reporter),
-            joinedload(models.Report.patients),
-            joinedload(models.Report.disease),
-        )
-        .offset(skip)
-        .limit(limit)
-        .all()
+    etag = conditional.collection_etag(
+        (
+            (row.report_id, row.version)
+            for row in queries.list_report_versions(db, skip, limit)
+        ),
+        fieldset.tag,
     )
-    return reports
+    headers = conditional.validator_headers(etag)
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(headers)
+
+    reports = queries.list_reports(db, skip, limit, fieldset=fieldset)
+    return FastJSONResponse(content=dump_reports(reports, fieldset), headers=headers)
+
+
+# -------------------------------
+# POST /api/reports/batch
+# -------------------------------
+@router.post(
+    "/batch",
+    response_model=schemas.ReportBatch,
+    summary="Get many reports by ID",
+    description=f"Retrieve up to {schemas.REPORT_BATCH_LIMIT} reports by ID in one request. IDs that do not exist are listed in `missing`.",
+    response_description="The reports found, in request order, and the IDs not found.",
+    responses={
+        422: {
+            "description": f"Unprocessable Entity - No IDs, or more than {schemas.REPORT_BATCH_LIMIT}"
+        },
+    },
+)
+def get_reports_batch(
+    batch: schemas.ReportBatchRequest,
+    fieldset: queries.ReportFieldset = Depends(report_fieldset),
+    db: Session = Depends(get_db),
+):
+    """
+    Fetch many reports by ID in one round trip.
+
+    The reports are loaded by set based queries whatever their number: one query for the reports,
+    their reporters, and their diseases, and one `IN` query for the patients of all of them. Duplicate
+    IDs are returned once. `fields` and `include` restrict the reports as on `GET /api/reports`.
+
+    Args:
+        batch (schemas.ReportBatchRequest): IDs of the reports to fetch.
+        fieldset (queries.ReportFieldset): Fields to return, from the `fields` and `include` parameters.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        schemas.ReportBatch: The reports found, in the order of their first request, and the requested
+            IDs that do not exist.
+    """
+    report_ids = list(dict.fromkeys(batch.ids))
+    reports = queries.get_reports_in_order(db, report_ids, fieldset)
+    found = {report.id for report in reports}
+    missing = [report_id for report_id in report_ids if report_id not in found]
+    return FastJSONResponse(content=dump_report_batch(reports, missing, fieldset))
+
+
+# -------------------------------
+# POST /api/reports/transitions
+# -------------------------------
+@router.post(
+    "/transitions",
+    response_model=List[schemas.ReportTransitionResult],
+    summary="Move many reports to a new state",
+    description=f"Move up to {schemas.REPORT_TRANSITION_LIMIT} reports to a new state, where the report state machine allows it. Returns the outcome for each report.",
+    response_description="The outcome of the transition for each report, in request order.",
+    responses={
+        401: {"description": "Unauthorized - Invalid or missing authentication token"},
+        403: {
+            "description": "Forbidden - User's role may not move reports to the requested state"
+        },
+        422: {
+            "description": f"Unprocessable Entity - No IDs, more than {schemas.REPORT_TRANSITION_LIMIT}, or an unknown state"
+        },
+    },
+)
+def transition_reports(
+    transition: schemas.ReportTransitionRequest,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(get_current_user),
+):
+    """
+    Move many reports to a new state in one request.
+
+    Reports are moved only from the states the state machine allows for the target state and the user's
+    role (e.g. only seniors can approve, and only submitted or under review reports). Reports in any other
+    state are left unchanged and reported as `Not Allowed`, unknown IDs as `Not Found`. The transition is
+    applied by one conditional `UPDATE` for all reports, so a report changed by a concurrent request is
+    never moved from a state it is no longer in.
+
+    Audit logging:
+        - Action: UPDATE
+        - Entity: Report
+        - Recorded fields: Report ID, previous and new status (one entry per moved report)
+
+    Args:
+        transition (schemas.ReportTransitionRequest): IDs of the reports and the state to move them to.
+        db (Session): SQLAlchemy database session.
+        user (models.User): Authenticated user performing the transition.
+
+    Raises:
+        HTTPException: 403 if the user's role may not move reports to the requested state.
+
+    Returns:
+        List[schemas.ReportTransitionResult]: The outcome for each distinct report ID, in request order.
+    """
+    try:
+        results = state_machine.transition_reports(
+            db, transition.ids, transition.status, user
+        )
+    except PermissionError as error:
+        raise HTTPException(status_code=403, detail=str(error))
+    db.commit()
+    return results
 
 
 # -------------------------------
@@ -203,6 +346,9 @@ def list_reports(
                 }
             },
         },
+        304: {
+            "description": "Not Modified - The client's copy of the report is current"
+        },
         404: {"description": "Report not found - No report exists with the given ID"},
         401: {"description": "Unauthorized - Invalid or missing authentication token"},
         403: {
@@ -212,6 +358,8 @@ def list_reports(
 )
 def get_report(
     report_id: int,
+    request: Request,
+    fieldset: queries.ReportFieldset = Depends(report_fieldset),
     db: Session = Depends(get_db),
 ):
     """
@@ -220,8 +368,21 @@ def get_report(
     Fetches a report by its unique ID and returns its full data, including linked
     reporter, patients, and disease. Returns 404 if the report does not exist.
 
+    The response carries an `ETag` and a `Last-Modified` date that change whenever the report
+    or any of its children changes. A request whose `If-None-Match` (or, without it,
+    `If-Modified-Since`) shows the client's copy is current is answered with an empty
+    `304 Not Modified` after a single primary key lookup.
+
+    Serialized reports are cached (see `api/cache.py`), and served after checking their version.
+    Approved reports are served from the cache without any query when invalidations are broadcast
+    between workers. Sparse representations (`fields` / `include`) are not cached, and their `ETag`
+    carries the fieldset, so that it never validates the full representation (nor is accepted in
+    `If-Match`).
+
     Args:
         report_id (int): The ID of the report to retrieve.
+        request (Request): Incoming request, for its conditional headers.
+        fieldset (queries.ReportFieldset): Fields to return, from the `fields` and `include` parameters.
         db (Session): SQLAlchemy database session.
 
     Raises:
@@ -231,19 +392,67 @@ def get_report(
         schemas.Report: Full report data with all associations.
     """
 
-    report = (
-        db.query(models.Report)
-        .options(
-            joinedload(models.Report.reporter),
-            joinedload(models.Report.patients),
-            joinedload(models.Report.disease),
+    if not fieldset.is_full:
+        return _sparse_report_response(db, request, report_id, fieldset)
+
+    cached = report_cache.get(report_id)
+    if cached is not None and cached.is_read_only and report_cache.is_coherent:
+        return _cached_report_response(request, cached)
+
+    generation = report_cache.generation
+    validators = queries.get_report_validators(db, report_id)
+    if validators is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    if cached is None or cached.version != validators.version:
+        etag = conditional.version_etag(validators.version)
+        if conditional.is_not_modified(request, etag, validators.modified_at):
+            return conditional.not_modified(
+                conditional.validator_headers(etag, validators.modified_at)
+            )
+
+        report = queries.get_report(db, report_id)
+        if not report:
+            raise HTTPException(status_code=404, detail="Report not found")
+        cached = CachedReport(
+            report_id=report_id,
+            version=validators.version,
+            modified_at=validators.modified_at,
+            status=validators.status,
+            body=dump_report(report),
         )
-        .filter(models.Report.id == report_id)
-        .first()
-    )
+        report_cache.set(report_id, cached, generation)
+
+    return _cached_report_response(request, cached)
+
+
+def _sparse_report_response(
+    db: Session, request: Request, report_id: int, fieldset: queries.ReportFieldset
+) -> Response:
+    """Answer a report GET restricted to `fieldset`, bypassing the cache of full representations.
+
+    The entity tag carries the fieldset (see `conditional.version_etag`), so that it validates only
+    this representation.
+    """
+    headers = {}
+    validators = queries.get_report_validators(db, report_id)
+    if validators is not None:
+        etag = conditional.version_etag(validators.version, fieldset.tag)
+        headers = conditional.validator_headers(etag, validators.modified_at)
+        if conditional.is_not_modified(request, etag, validators.modified_at):
+            return conditional.not_modified(headers)
+
+    report = queries.get_report(db, report_id, fieldset)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
-    return report
+    return FastJSONResponse(content=dump_report(report, fieldset), headers=headers)
+
+
+def _cached_report_response(request: Request, cached: CachedReport) -> Response:
+    """Answer a report GET from its serialized representation, with a 304 if the client's copy is current."""
+    if conditional.is_not_modified(request, cached.etag, cached.modified_at):
+        return conditional.not_modified(cached.headers)
+    return FastJSONResponse(content=cached.body, headers=cached.headers)
 
 
 # -------------------------------
@@ -273,11 +482,16 @@ def get_report(
                 }
             },
         },
-        400: {"description": "Bad Request - Report is not in draft status"},
+        400: {
+            "description": "Bad Request - Report is not in draft status, or cannot move to the new status"
+        },
+        409: {
+            "description": "Conflict - Report version does not match If-Match, or changed concurrently"
+        },
         404: {"description": "Report not found - No report exists with the given ID"},
         401: {"description": "Unauthorized - Invalid or missing authentication token"},
         403: {
-            "description": "Forbidden - User does not have permission to update this report"
+            "description": "Forbidden - User's role may not move the report to the new status"
         },
         422: {"description": "Unprocessable Entity - Validation error in report data"},
         500: {
@@ -288,6 +502,7 @@ def get_report(
 def update_report(
     report_id: int,
     report_data: schemas.ReportUpdate,
+    request: Request,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
@@ -296,7 +511,12 @@ def update_report(
 
     Modifies the status of a report, but only if it is still in the 'draft' state.
     Prevents changes to submitted, under_review, or approved reports. Updates are
-    limited to the `status` field.
+    limited to the `status` field, and a new status must be reachable by the user
+    through the report state machine (see `api/state_machine.py`), as with
+    POST `/api/reports/transitions`.
+
+    Send the report's `version` in `If-Match` (e.g. `If-Match: "3"`) to update it only if it has not
+    changed since it was read.
 
     Audit logging:
         - Action: UPDATE
@@ -306,12 +526,15 @@ def update_report(
     Args:
         report_id (int): The ID of the report to update.
         report_data (schemas.ReportBase): The new status to assign.
+        request (Request): The incoming request, for its `If-Match` header.
         db (Session): SQLAlchemy database session.
         user (models.User): Authenticated user making the update.
 
     Raises:
         HTTPException: 404 if the report does not exist.
-        HTTPException: 400 if the report is not in draft status.
+        HTTPException: 409 if the report's version does not match `If-Match`, or it changed concurrently.
+        HTTPException: 400 if the report is not in draft status, or no transition leads to the new status.
+        HTTPException: 403 if the user's role may not move the report to the new status.
 
     Returns:
         schemas.Report: The updated report object.
@@ -320,10 +543,21 @@ def update_report(
     report = db.query(models.Report).filter(models.Report.id == report_id).first()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
+    conditional.check_if_match(request, report.version, "Report")
     if report.status != models.ReportStateEnum.draft:
         raise HTTPException(status_code=400, detail="Only draft reports can be edited")
 
-    for field, value in report_data.model_dump(exclude_unset=True).items():
+    changes = report_data.model_dump(exclude_unset=True)
+    target = changes.get("status")
+    if target is not None and target != report.status:
+        try:
+            state_machine.check_transition(report.status, target, user.role)
+        except PermissionError as error:
+            raise HTTPException(status_code=403, detail=str(error))
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+    for field, value in changes.items():
         setattr(report, field, value)
 
     db.commit()
@@ -346,6 +580,9 @@ def update_report(
         204: {"description": "Report deleted successfully"},
         404: {"description": "Report not found - No report exists with the given ID"},
         400: {"description": "Bad Request - Report is not in draft status"},
+        409: {
+            "description": "Conflict - Report version does not match If-Match, or changed concurrently"
+        },
         401: {"description": "Unauthorized - Invalid or missing authentication token"},
         403: {
             "description": "Forbidden - User does not have permission to delete this report"
@@ -357,6 +594,7 @@ def update_report(
 )
 def delete_report(
     report_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user),
 ):
@@ -369,6 +607,8 @@ def delete_report(
         - Patient links are removed from the association table (many-to-many).
         - The reporter is not deleted, only disassociated if necessary.
 
+    Send the report's `version` in `If-Match` to delete it only if it has not changed since it was read.
+
     Audit logging:
         - Action: DELETE
         - Entity: Report
@@ -376,11 +616,13 @@ def delete_report(
 
     Args:
         report_id (int): The ID of the report to delete.
+        request (Request): The incoming request, for its `If-Match` header.
         db (Session): SQLAlchemy database session.
         user (models.User): The authenticated user requesting deletion.
 
     Raises:
         HTTPException: 404 if the report does not exist.
+        HTTPException: 409 if the report's version does not match `If-Match`, or it changed concurrently.
         HTTPException: 400 if the report is not in draft state.
 
     Returns:
@@ -390,6 +632,7 @@ def delete_report(
     report = db.query(models.Report).filter(models.Report.id == report_id).first()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
+    conditional.check_if_match(request, report.version, "Report")
     if report.status != models.ReportStateEnum.draft:
         raise HTTPException(status_code=400, detail="Only draft reports can be deleted")
 
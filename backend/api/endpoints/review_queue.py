@@ -0,0 +1,104 @@
+"""Review Queue Endpoints
+
+This module provides the endpoints through which senior reviewers take submitted reports to review,
+without two reviewers ever being given the same report (see `api/review_queue.py`).
+
+Endpoints:
+- POST /api/review-queue/claim: Claim the oldest unclaimed reports, moving them to `under_review`.
+- POST /api/review-queue/release: Hand claimed reports back to the queue, moving them to `submitted`.
+
+Claims expire after a lease (`REVIEW_CLAIM_LEASE_SECONDS`, 30 minutes by default), after which other
+reviewers can claim the reports. Reviewers complete a claim by approving the reports, or returning them
+to draft, with `POST /api/reports/transitions`.
+
+Security:
+- Requires a senior user via `senior_required`.
+- Audit logs are generated for every claimed and released report.
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from api import models, queries, review_queue, schemas
+from api.dependencies import get_db, senior_required
+from api.instrumentation import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.post(
+    "/claim",
+    response_model=schemas.ReviewClaim,
+    summary="Claim reports to review",
+    description="Claim the oldest submitted reports not claimed by another reviewer, moving them to `under_review`.",
+    response_description="The claimed reports and the end of the lease on them.",
+    responses={
+        401: {"description": "Unauthorized - Invalid or missing authentication token"},
+        403: {"description": "Forbidden - Only senior users can review reports"},
+    },
+)
+def claim_reports(
+    limit: int = Query(
+        10,
+        ge=1,
+        le=schemas.REVIEW_CLAIM_LIMIT,
+        description="Most reports to claim.",
+    ),
+    db: Session = Depends(get_db),
+    user: models.User = Depends(senior_required),
+):
+    """Claim up to `limit` reports for the current reviewer.
+
+    Reports are claimed oldest first, from the submitted reports and the under review reports whose
+    previous claim expired. Concurrent claims never return the same report: each skips the reports the
+    others are claiming instead of waiting for them. Fewer than `limit` reports (possibly none) are
+    returned when the queue runs short.
+
+    Args:
+        limit (int): Most reports to claim. Defaults to 10.
+        db (Session): SQLAlchemy database session.
+        user (models.User): Authenticated senior reviewer.
+
+    Returns:
+        schemas.ReviewClaim: The claimed reports, oldest first, and the end of the lease on them.
+    """
+    report_ids, lease_expires_at = review_queue.claim_reports(db, user, limit)
+    db.commit()
+    return {
+        "lease_expires_at": lease_expires_at,
+        "reports": queries.get_reports_in_order(db, report_ids),
+    }
+
+
+@router.post(
+    "/release",
+    response_model=schemas.ReportIds,
+    summary="Release claimed reports",
+    description="Hand reports claimed by the current reviewer back to the review queue, moving them to `submitted`.",
+    response_description="The IDs of the released reports.",
+    responses={
+        401: {"description": "Unauthorized - Invalid or missing authentication token"},
+        403: {"description": "Forbidden - Only senior users can review reports"},
+    },
+)
+def release_reports(
+    release: schemas.ReviewRelease,
+    db: Session = Depends(get_db),
+    user: models.User = Depends(senior_required),
+):
+    """Release reports claimed by the current reviewer.
+
+    Reports the reviewer does not hold (never claimed, already moved on, or whose expired claim another
+    reviewer took over) are left unchanged and not returned.
+
+    Args:
+        release (schemas.ReviewRelease): IDs of the reports to release.
+        db (Session): SQLAlchemy database session.
+        user (models.User): Authenticated senior reviewer.
+
+    Returns:
+        schemas.ReportIds: The IDs of the released reports.
+    """
+    released = review_queue.release_reports(db, user, release.ids)
+    db.commit()
+    return {"ids": released}
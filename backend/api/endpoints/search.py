@@ -1,43 +1,284 @@
+"""
+Search Endpoints
+
+This module provides the report search endpoints of the Disease Outbreak Reporting System.
+
+Endpoints:
+- GET /api/reports/search: Search reports, returning full report details.
+- GET /api/reports/search/summary: Search reports, returning flat summaries only.
+- GET /api/reports/search/faceted: Search reports, returning full report details, the total, and facet
+  counts (by status, disease category, severity, and hospital) for the same filters.
+
+All endpoints filter, rank, and paginate on the denormalized `report_search` table (see
+`api/search_index.py`), so the search itself never joins the source tables.
+
+Search modes:
+- `q`: Ranked full-text search over disease name, hospital name, symptoms, and lab results.
+  Every term is prefix matched, so `q=influ` finds "Influenza". Backed by a GIN index on the
+  search document.
+- `disease_name` / `hospital_name`: Case-insensitive substring match. Backed by `pg_trgm`
+  trigram GIN indexes.
+- `status`: Exact match on report status.
+
+All filters can be combined. Results are ordered by relevance when `q` is given, otherwise by report ID.
+
+`/search` accepts the `fields` and `include` parameters of the report endpoints, to return and load only
+part of each report (see `queries.ReportFieldset`).
+"""
+
+from collections import Counter
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Query as OrmQuery, Session
 from typing import List, Optional
 
-from api import models, schemas
-from api.dependencies import get_db
-from api.enums import ReportStateEnum
+from api import models, queries, schemas
+from api.dependencies import get_db, report_fieldset
+from api.enums import DiseaseCategoryEnum, ReportStateEnum, SeverityLevelEnum
+from api.search_index import prefix_tsquery
+from api.serializers import FastJSONResponse, dump_reports
+from api.instrumentation import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+Q_DESCRIPTION = "Free text matched by prefix against disease name, hospital name, symptoms, and lab results."
+
+# `report_search` columns counted by `/search/faceted`, in the order of the grouping sets.
+FACETS = ("status", "disease_category", "severity_level", "hospital_name")
+
+# Maximum number of hospitals listed in the hospital facet.
+HOSPITAL_FACET_LIMIT = 20
+
+
+def _search_query(
+    db: Session,
+    q: Optional[str],
+    status: Optional[ReportStateEnum],
+    disease_name: Optional[str],
+    hospital_name: Optional[str],
+) -> OrmQuery:
+    """Build the filtered and ordered `report_search` query shared by the search endpoints."""
+    query = db.query(models.ReportSearch)
+
+    if status:
+        query = query.filter(models.ReportSearch.status == status)
+
+    if disease_name:
+        query = query.filter(
+            models.ReportSearch.disease_name.ilike(f"%{disease_name}%")
+        )
+
+    if hospital_name:
+        query = query.filter(
+            models.ReportSearch.hospital_name.ilike(f"%{hospital_name}%")
+        )
+
+    if q:
+        ts_query = prefix_tsquery(q)
+        query = query.filter(
+            models.ReportSearch.search_vector.op("@@")(ts_query)
+        ).order_by(
+            func.ts_rank_cd(models.ReportSearch.search_vector, ts_query).desc(),
+            models.ReportSearch.report_id,
+        )
+    else:
+        query = query.order_by(models.ReportSearch.report_id)
+
+    return query
+
+
+def _load_page(
+    db: Session,
+    query: OrmQuery,
+    skip: int,
+    limit: int,
+    fieldset: queries.ReportFieldset = queries.FULL_REPORT,
+) -> List[models.Report]:
+    """Load one page of the reports matched by a `_search_query`, in its order.
+
+    The page of report IDs is read from `report_search`, then those reports are loaded with the fields
+    of `fieldset` (by default their reporter, disease, and patients) in a fixed number of queries.
+    """
+    report_ids = [
+        row.report_id
+        for row in query.with_entities(models.ReportSearch.report_id)
+        .offset(skip)
+        .limit(limit)
+    ]
+    return queries.get_reports_in_order(db, report_ids, fieldset)
+
+
+def _facet_counts(query: OrmQuery) -> tuple[int, schemas.SearchFacets]:
+    """Count the reports matched by a `_search_query`, in total and per facet value, in one query.
+
+    A single `GROUP BY GROUPING SETS ((status), (disease_category), (severity_level), (hospital_name), ())`
+    over the filtered rows returns one row per value of each facet plus one row for the empty grouping
+    set, which is the total. `GROUPING(column)` is 0 on the rows grouped by that column, telling a NULL
+    group value apart from a column that was not grouped.
+
+    Returns:
+        tuple[int, schemas.SearchFacets]: The total number of matching reports and the facet counts.
+            Enum facets list every member, including those with no reports. The hospital facet lists
+            the `HOSPITAL_FACET_LIMIT` most frequent hospitals. Reports without the field are not
+            counted in its facet.
+    """
+    columns = [getattr(models.ReportSearch, name) for name in FACETS]
+    rows = (
+        query.order_by(None)
+        .with_entities(
+            *columns,
+            *(func.grouping(column) for column in columns),
+            func.count(),
+        )
+        .group_by(func.grouping_sets(*(tuple_(column) for column in columns), tuple_()))
+        .all()
+    )
 
-router = APIRouter()
+    total = 0
+    counts = {name: Counter() for name in FACETS}
+    for row in rows:
+        values, grouped, count = row[: len(FACETS)], row[len(FACETS) : -1], row[-1]
+        if all(grouped):
+            total = count
+            continue
+        index = grouped.index(0)
+        if values[index] is not None:
+            counts[FACETS[index]][
+                getattr(values[index], "value", values[index])
+            ] = count
+
+    return total, schemas.SearchFacets(
+        status={
+            member.value: counts["status"][member.value] for member in ReportStateEnum
+        },
+        disease_category={
+            member.value: counts["disease_category"][member.value]
+            for member in DiseaseCategoryEnum
+        },
+        severity_level={
+            member.value: counts["severity_level"][member.value]
+            for member in SeverityLevelEnum
+        },
+        hospital_name=dict(counts["hospital_name"].most_common(HOSPITAL_FACET_LIMIT)),
+    )
 
 
 @router.get(
     "/search",
     response_model=List[schemas.Report],
     summary="Search Reports",
-    description="Search for reports based on status, disease name, or hospital name.",
+    description="Search for reports by free text, status, disease name, or hospital name. Free text results are ranked by relevance.",
     response_description="A list of reports matching the search criteria.",
 )
 def search_reports(
+    q: Optional[str] = Query(None, description=Q_DESCRIPTION),
     status: Optional[ReportStateEnum] = Query(None),
     disease_name: Optional[str] = Query(None),
     hospital_name: Optional[str] = Query(None),
     skip: int = 0,
     limit: int = 20,
+    fieldset: queries.ReportFieldset = Depends(report_fieldset),
     db: Session = Depends(get_db),
 ):
-    query = db.query(models.Report)
+    """
+    Search reports, returning full report details, or the fields requested with `fields` and `include`.
 
-    if status:
-        query = query.filter(models.Report.status == status)
+    Args:
+        q (Optional[str]): Free text search, ranked by relevance. Each term is prefix matched.
+        status (Optional[ReportStateEnum]): Only return reports in this status.
+        disease_name (Optional[str]): Case-insensitive substring of the disease name.
+        hospital_name (Optional[str]): Case-insensitive substring of the reporter's hospital name.
+        skip (int): Number of records to skip for pagination. Defaults to 0.
+        limit (int): Maximum number of reports to return. Defaults to 20.
+        fieldset (queries.ReportFieldset): Fields to return, from the `fields` and `include` parameters.
+        db (Session): SQLAlchemy database session.
 
-    if disease_name:
-        query = query.join(models.Disease).filter(
-            models.Disease.disease_name.ilike(f"%{disease_name}%")
-        )
+    Returns:
+        List[schemas.Report]: Reports matching all of the given criteria.
+    """
+    query = _search_query(db, q, status, disease_name, hospital_name)
+    reports = _load_page(db, query, skip, limit, fieldset)
+    return FastJSONResponse(content=dump_reports(reports, fieldset))
 
-    if hospital_name:
-        query = query.join(models.Reporter).filter(
-            models.Reporter.hospital_name.ilike(f"%{hospital_name}%")
-        )
 
-    results = query.offset(skip).limit(limit).all()
-    return results
+@router.get(
+    "/search/summary",
+    response_model=List[schemas.ReportSummary],
+    summary="Search Report Summaries",
+    description="Same search as `/search`, but returns flat report summaries read from a single table. Intended for list and table views.",
+    response_description="A list of report summaries matching the search criteria.",
+)
+def search_report_summaries(
+    q: Optional[str] = Query(None, description=Q_DESCRIPTION),
+    status: Optional[ReportStateEnum] = Query(None),
+    disease_name: Optional[str] = Query(None),
+    hospital_name: Optional[str] = Query(None),
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+):
+    """
+    Search reports, returning flat summaries.
+
+    Args:
+        q (Optional[str]): Free text search, ranked by relevance. Each term is prefix matched.
+        status (Optional[ReportStateEnum]): Only return reports in this status.
+        disease_name (Optional[str]): Case-insensitive substring of the disease name.
+        hospital_name (Optional[str]): Case-insensitive substring of the reporter's hospital name.
+        skip (int): Number of records to skip for pagination. Defaults to 0.
+        limit (int): Maximum number of summaries to return. Defaults to 20.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        List[schemas.ReportSummary]: Summaries of reports matching all of the given criteria.
+    """
+    return (
+        _search_query(db, q, status, disease_name, hospital_name)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+@router.get(
+    "/search/faceted",
+    response_model=schemas.FacetedSearchResults,
+    summary="Search Reports With Facet Counts",
+    description="Same search as `/search`, but also returns the total number of matches and their counts by status, disease category, severity, and hospital, for drill-down navigation.",
+    response_description="A page of reports matching the search criteria, the total, and the facet counts.",
+)
+def search_reports_faceted(
+    q: Optional[str] = Query(None, description=Q_DESCRIPTION),
+    status: Optional[ReportStateEnum] = Query(None),
+    disease_name: Optional[str] = Query(None),
+    hospital_name: Optional[str] = Query(None),
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+):
+    """
+    Search reports, returning a page of full report details with facet counts.
+
+    The facet counts cover every report matching the filters, not only the returned page, and are
+    computed by a single grouped query (see `_facet_counts`).
+
+    Args:
+        q (Optional[str]): Free text search, ranked by relevance. Each term is prefix matched.
+        status (Optional[ReportStateEnum]): Only return reports in this status.
+        disease_name (Optional[str]): Case-insensitive substring of the disease name.
+        hospital_name (Optional[str]): Case-insensitive substring of the reporter's hospital name.
+        skip (int): Number of records to skip for pagination. Defaults to 0.
+        limit (int): Maximum number of reports to return. Defaults to 20.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        schemas.FacetedSearchResults: The page of reports, the total number of matches, and the facet
+            counts.
+    """
+    query = _search_query(db, q, status, disease_name, hospital_name)
+    total, facets = _facet_counts(query)
+    return schemas.FacetedSearchResults(
+        total=total,
+        results=_load_page(db, query, skip, limit) if total else [],
+        facets=facets,
+    )
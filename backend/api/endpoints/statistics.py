@@ -10,13 +10,15 @@ Accessible only to authenticated users.
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, true
 from datetime import date
 
 from api import models, schemas
 from api.dependencies import get_db, get_current_user
+from api.dialects import age_in_years
+from api.instrumentation import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get(
@@ -47,57 +49,80 @@ def get_statistics(
     Returns:
         schemas.StatisticsSummary: Statistical summary response.
     """
-    total_reports = db.query(func.count(models.Report.id)).scalar()
-
-    # Reports by status
-    reports_by_status = {
-        status.value: db.query(func.count(models.Report.id))
-        .filter(models.Report.status == status)
-        .scalar()
-        for status in models.ReportStateEnum
-    }
-
-    # Diseases by category
-    diseases_by_category = {
-        category.value: db.query(func.count(models.Disease.id))
-        .filter(models.Disease.disease_category == category)
-        .scalar()
-        for category in models.DiseaseCategoryEnum
-    }
-
-    # Diseases by severity
-    diseases_by_severity = {
-        severity.value: db.query(func.count(models.Disease.id))
-        .filter(models.Disease.severity_level == severity)
-        .scalar()
-        for severity in models.SeverityLevelEnum
-    }
+    # Every figure is computed in one statement: one-row aggregates over each table, joined together.
+    reports = select(
+        func.count(models.Report.id).label("total"),
+        *(
+            func.count(models.Report.id)
+            .filter(models.Report.status == status)
+            .label(f"status_{status.name}")
+            for status in models.ReportStateEnum
+        ),
+    ).subquery("report_counts")
+
+    diseases = select(
+        *(
+            func.count(models.Disease.id)
+            .filter(models.Disease.disease_category == category)
+            .label(f"category_{category.name}")
+            for category in models.DiseaseCategoryEnum
+        ),
+        *(
+            func.count(models.Disease.id)
+            .filter(models.Disease.severity_level == severity)
+            .label(f"severity_{severity.name}")
+            for severity in models.SeverityLevelEnum
+        ),
+    ).subquery("disease_counts")
 
     # Most common disease by name (if any)
     most_common_disease = (
-        db.query(
-            models.Disease.disease_name, func.count(models.Disease.id).label("count")
-        )
+        select(models.Disease.disease_name)
         .group_by(models.Disease.disease_name)
         .order_by(func.count(models.Disease.id).desc())
         .limit(1)
-        .first()
+        .scalar_subquery()
     )
-    most_common_disease_name = most_common_disease[0] if most_common_disease else None
 
     # Average patient age calculation
     today = date.today()
-    ages_query = db.query(
-        func.avg(func.date_part("year", func.age(today, models.Patient.date_of_birth)))
-    ).scalar()
+    average_age = select(
+        func.avg(age_in_years(models.Patient.date_of_birth, today))
+    ).scalar_subquery()
+
+    row = (
+        db.execute(
+            select(
+                reports,
+                diseases,
+                most_common_disease.label("most_common_disease"),
+                average_age.label("average_patient_age"),
+            ).select_from(reports.join(diseases, true()))
+        )
+        .one()
+        ._mapping
+    )
 
-    average_patient_age = round(ages_query, 2) if ages_query is not None else None
+    average_patient_age = (
+        round(row["average_patient_age"], 2)
+        if row["average_patient_age"] is not None
+        else None
+    )
 
     return schemas.StatisticsSummary(
-        total_reports=total_reports,
-        reports_by_status=reports_by_status,
-        diseases_by_category=diseases_by_category,
-        diseases_by_severity=diseases_by_severity,
+        total_reports=row["total"],
+        reports_by_status={
+            status.value: row[f"status_{status.name}"]
+            for status in models.ReportStateEnum
+        },
+        diseases_by_category={
+            category.value: row[f"category_{category.name}"]
+            for category in models.DiseaseCategoryEnum
+        },
+        diseases_by_severity={
+            severity.value: row[f"severity_{severity.name}"]
+            for severity in models.SeverityLevelEnum
+        },
         average_patient_age=average_patient_age,
-        most_common_disease=most_common_disease_name,
+        most_common_disease=row["most_common_disease"],
     )
@@ -42,6 +42,16 @@ class ReportStateEnum(str, enum.Enum):
     approved = "Approved"
 
 
+# Outcome of a report state transition (see `api/state_machine.py`):
+# - Transitioned - the report was moved to the requested state.
+# - Not Allowed - the report's current state cannot be moved to the requested state.
+# - Not Found - no report exists with the given ID.
+class TransitionOutcomeEnum(str, enum.Enum):
+    transitioned = "Transitioned"
+    not_allowed = "Not Allowed"
+    not_found = "Not Found"
+
+
 class UserRoleEnum(str, enum.Enum):
     junior = "Junior"
     senior = "Senior"
@@ -0,0 +1,371 @@
+"""
+Idempotency Keys
+
+This module makes `POST` and `PATCH` requests safe to retry. A client sends a unique `Idempotency-Key`
+header with the request, and sends the same key again when it retries after a timeout or a dropped
+connection. The first request is executed and its response recorded, retries get the recorded response
+back (with an `Idempotent-Replayed: true` header) instead of executing again, so a retried
+`POST /api/reports` creates one report, not two.
+
+Recorded responses are kept in the `idempotency_keys` table (`models.IdempotencyKey`), shared by all
+workers, for `IDEMPOTENCY_KEY_TTL_SECONDS` (24 hours by default). Rows are compact: the key and the
+request fingerprint are stored as SHA-256 digests, and only the response is stored in full. Expired rows
+are deleted by `purge_expired_keys`, run periodically by the application (`purge_periodically`).
+
+Concurrent duplicates (a retry sent while the first request is still running) wait for the first to
+finish rather than executing twice. The first request inserts its row in a transaction that stays open
+until its response is recorded, and PostgreSQL makes a conflicting insert wait for that transaction.
+If the first request fails with a server error, or its worker dies, the transaction rolls back and the
+waiting retry executes the request itself.
+
+As these transactions last as long as the requests, they run on a small engine of their own
+(`IDEMPOTENCY_POOL_SIZE` connections), not on the application's pool: keyed requests and their waiting
+duplicates cannot take the connections the endpoints need. A keyed request finding every claim
+connection busy for `IDEMPOTENCY_WAIT_SECONDS` is answered with `503 Service Unavailable`, and can be
+retried with the same key.
+
+Rules:
+- Keys are scoped to the credentials (`Authorization` header) they were sent with.
+- A key reused with a different method, path, or body is refused with `422 Unprocessable Entity`.
+- A duplicate still waiting after `IDEMPOTENCY_WAIT_SECONDS` is answered with `409 Conflict`.
+- Responses with a 5xx status, or larger than `MAX_RECORDED_BODY`, are not recorded.
+- Requests to `UNRECORDED_PATHS` (the authentication endpoints, whose responses carry access tokens)
+  ignore the key: they execute every time and nothing is stored.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import (
+    Connection,
+    Engine,
+    create_engine,
+    delete,
+    func,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api import models
+from api.database import get_engine
+
+logger = logging.getLogger(__name__)
+
+KEY_TTL = timedelta(seconds=int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400")))
+WAIT_TIMEOUT = int(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+PURGE_INTERVAL = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "600"))
+POOL_SIZE = int(os.getenv("IDEMPOTENCY_POOL_SIZE", "5"))
+
+# Methods whose requests can carry an `Idempotency-Key`. Other methods are idempotent by definition.
+METHODS = frozenset({"POST", "PATCH"})
+MAX_KEY_LENGTH = 255
+MAX_RECORDED_BODY = 1024 * 1024
+# Path prefixes of requests that are never recorded, as their responses are credentials.
+UNRECORDED_PATHS = ("/api/auth/",)
+
+# Headers generated per response, never replayed.
+_UNRECORDED_HEADERS = frozenset({b"date", b"server", b"set-cookie"})
+
+
+_claims_engine: Engine | None = None
+_claims_engine_lock = threading.Lock()
+
+
+def get_claims_engine() -> Engine:
+    """Return the engine holding the claims of keyed requests, created on the first call.
+
+    It connects to the application's database, with a pool of `POOL_SIZE` connections and no overflow.
+    """
+    global _claims_engine
+    if _claims_engine is None:
+        with _claims_engine_lock:
+            if _claims_engine is None:
+                _claims_engine = create_engine(
+                    get_engine().url,
+                    future=True,
+                    pool_size=POOL_SIZE,
+                    max_overflow=0,
+                    pool_timeout=WAIT_TIMEOUT,
+                )
+    return _claims_engine
+
+
+def _digest(*parts: bytes) -> bytes:
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(len(part).to_bytes(8, "big"))
+        hasher.update(part)
+    return hasher.digest()
+
+
+def scoped_key(authorization: str, client_key: str) -> bytes:
+    """Return the stored form of a client's `Idempotency-Key`, scoped to its credentials.
+
+    Args:
+        authorization (str): The request's `Authorization` header, empty if it has none.
+        client_key (str): The `Idempotency-Key` header.
+
+    Returns:
+        bytes: The 32 byte key of the `idempotency_keys` row.
+    """
+    return _digest(authorization.encode(), client_key.encode())
+
+
+def _json_response(status_code: int, detail: str) -> tuple[int, List[tuple], bytes]:
+    body = json.dumps({"detail": detail}, separators=(",", ":")).encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    return status_code, headers, body
+
+
+class _Claim:
+    """The row of one key, owned by the request that inserted it until the response is recorded."""
+
+    def __init__(self, connection: Connection, key: bytes):
+        self.connection = connection
+        self.key = key
+
+    def record(self, status_code: int, headers: List[tuple], body: bytes) -> None:
+        self.connection.execute(
+            update(models.IdempotencyKey)
+            .where(models.IdempotencyKey.key == self.key)
+            .values(
+                status_code=status_code,
+                headers=[
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in headers
+                ],
+                body=body,
+            )
+        )
+        self.connection.commit()
+        self.connection.close()
+
+    def release(self) -> None:
+        self.connection.rollback()
+        self.connection.close()
+
+
+def _claim(key: bytes, fingerprint: bytes):
+    """Insert the row of `key`, or wait for the request holding it and read its recorded response.
+
+    Returns:
+        _Claim | tuple[int, List[tuple], bytes]: The claim if this request must execute, otherwise the
+            status, headers, and body to answer with.
+    """
+    try:
+        connection = get_claims_engine().connect()
+    except PoolTimeoutError:
+        return _json_response(
+            503, "Too many requests with an Idempotency-Key are in progress"
+        )
+    try:
+        # Bounds the wait on a concurrent request holding the key.
+        connection.execute(text(f"SET LOCAL lock_timeout = '{WAIT_TIMEOUT}s'"))
+        connection.execute(
+            delete(models.IdempotencyKey).where(
+                models.IdempotencyKey.key == key,
+                models.IdempotencyKey.expires_at < func.now(),
+            )
+        )
+        claimed = connection.execute(
+            insert(models.IdempotencyKey)
+            .values(key=key, fingerprint=fingerprint, expires_at=func.now() + KEY_TTL)
+            .on_conflict_do_nothing(index_elements=[models.IdempotencyKey.key])
+            .returning(models.IdempotencyKey.key)
+        ).first()
+        if claimed is not None:
+            return _Claim(connection, key)
+
+        row = connection.execute(
+            select(
+                models.IdempotencyKey.fingerprint,
+                models.IdempotencyKey.status_code,
+                models.IdempotencyKey.headers,
+                models.IdempotencyKey.body,
+            ).where(models.IdempotencyKey.key == key)
+        ).first()
+    except OperationalError as error:
+        connection.rollback()
+        connection.close()
+        if getattr(error.orig, "pgcode", None) == "55P03":  # lock_not_available
+            return _json_response(
+                409, "A request with this Idempotency-Key is still in progress"
+            )
+        raise
+    except BaseException:
+        connection.rollback()
+        connection.close()
+        raise
+
+    connection.rollback()
+    connection.close()
+    if row is None:
+        # The first request's row expired and was purged between the insert and the select.
+        return _claim(key, fingerprint)
+    if bytes(row.fingerprint) != fingerprint:
+        return _json_response(
+            422, "Idempotency-Key was already used with a different request"
+        )
+    headers = [
+        (name.encode("latin-1"), value.encode("latin-1")) for name, value in row.headers
+    ]
+    return (
+        row.status_code,
+        headers + [(b"idempotent-replayed", b"true")],
+        bytes(row.body),
+    )
+
+
+def purge_expired_keys(connection: Connection) -> int:
+    """Delete the rows of expired keys.
+
+    Args:
+        connection (Connection): Connection to execute on. Committed by the caller.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    result = connection.execute(
+        delete(models.IdempotencyKey).where(
+            models.IdempotencyKey.expires_at < func.now()
+        )
+    )
+    return result.rowcount
+
+
+async def purge_periodically(interval: Optional[float] = None) -> None:
+    """Run `purge_expired_keys` every `interval` seconds (`PURGE_INTERVAL` by default), until cancelled."""
+
+    def purge() -> int:
+        with get_engine().begin() as connection:
+            return purge_expired_keys(connection)
+
+    while True:
+        await asyncio.sleep(interval or PURGE_INTERVAL)
+        try:
+            deleted = await run_in_threadpool(purge)
+            logger.debug("Purged %d expired idempotency keys", deleted)
+        except Exception:
+            logger.exception("Purging expired idempotency keys failed")
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware recording and replaying the responses of requests with an `Idempotency-Key`."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in METHODS
+            or scope["path"].startswith(UNRECORDED_PATHS)
+        ):
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        client_key = headers.get("idempotency-key")
+        if client_key is None:
+            return await self.app(scope, receive, send)
+        if not 0 < len(client_key) <= MAX_KEY_LENGTH:
+            return await _send_response(
+                send,
+                *_json_response(
+                    400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+                ),
+            )
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        key = scoped_key(headers.get("authorization", ""), client_key)
+        fingerprint = _digest(
+            scope["method"].encode(),
+            scope["path"].encode(),
+            scope.get("query_string", b""),
+            body,
+        )
+        outcome = await run_in_threadpool(_claim, key, fingerprint)
+        if not isinstance(outcome, _Claim):
+            return await _send_response(send, *outcome)
+
+        await self._execute(scope, receive, send, body, outcome)
+
+    async def _execute(
+        self, scope: Scope, receive: Receive, send: Send, body: bytes, claim: _Claim
+    ) -> None:
+        body_sent = False
+
+        async def replay_body() -> Message:
+            # The body was read to fingerprint the request: hand it to the app, then pass on the
+            # server's next messages (the disconnect).
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status_code = 500
+        response_headers: List[tuple] = []
+        chunks: List[bytes] = []
+        size = 0
+
+        async def capture(message: Message) -> None:
+            nonlocal status_code, response_headers, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in _UNRECORDED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= MAX_RECORDED_BODY:
+                    chunks.append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            await run_in_threadpool(claim.release)
+            raise
+        if status_code >= 500 or size > MAX_RECORDED_BODY:
+            await run_in_threadpool(claim.release)
+        else:
+            await run_in_threadpool(
+                claim.record, status_code, response_headers, b"".join(chunks)
+            )
+
+
+async def _send_response(
+    send: Send, status_code: int, headers: List[tuple], body: bytes
+) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": headers,
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
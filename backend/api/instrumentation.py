@@ -0,0 +1,328 @@
+"""
+Request Instrumentation
+
+This module measures, for every HTTP request, where its time goes:
+
+- `db`: number of SQL statements executed and total time spent executing them.
+- `pool`: time spent waiting for a database connection from the pool (including opening new ones).
+- `serialize`: time spent encoding the response: from the return of the endpoint to the start of the
+  response (validation against its `response_model` and rendering to JSON, recorded by `TimedRoute`),
+  plus the reports serialized inside the endpoint by `api/serializers.py`.
+- `app`: total time of the request.
+
+The measurements are sent back in a `Server-Timing` response header, readable in the network panel of
+browser developer tools:
+
+    Server-Timing: db;dur=4.1;desc="6 queries", pool;dur=0.1, serialize;dur=1.8, app;dur=9.7
+
+and logged as one JSON line per request on the `api.requests` logger, together with the method, route
+template, and status.
+
+Statement capture: when `SLOW_REQUEST_MS` is set, the SQL statements of every request are collected and,
+for requests slower than that many milliseconds, added to the log line (at most `MAX_CAPTURED_STATEMENTS`,
+with their durations). Statements of faster requests are dropped.
+
+Savepoint statements are not counted, as `BEGIN` and `COMMIT` are not: they control the transaction
+rather than query it.
+
+Measurements are collected by SQLAlchemy engine events (`instrument_engine`, installed by
+`api/database.py`), by `TimedQueuePool`, and by `TimedRoute` (the route class of every router), into a `RequestMetrics` held in a context variable. Sync
+endpoints run in a worker thread with a copy of the request's context, so their statements are counted
+too.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    DB_POOL_WAIT,
+    REQUEST_DURATION,
+    REQUESTS_IN_PROGRESS,
+)
+
+logger = logging.getLogger("api.requests")
+
+SLOW_REQUEST_MS: Optional[float] = (
+    float(os.environ["SLOW_REQUEST_MS"]) if os.getenv("SLOW_REQUEST_MS") else None
+)
+MAX_CAPTURED_STATEMENTS = 50
+
+_TRANSACTION_CONTROL = ("SAVEPOINT ", "RELEASE SAVEPOINT ", "ROLLBACK TO SAVEPOINT ")
+
+
+@dataclass
+class RequestMetrics:
+    """Measurements of one request, and its ASGI scope. Durations are in seconds."""
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+    endpoint_returned_at: Optional[float] = None
+    capture: bool = False
+    statements: List[tuple[str, float]] = field(default_factory=list)
+    scope: Optional[Scope] = field(default=None, repr=False)
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Format the measurements as a `Server-Timing` header value."""
+        return ", ".join(
+            [
+                f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"',
+                f"pool;dur={self.pool_wait_seconds * 1000:.1f}",
+                f"serialize;dur={self.serialization_seconds * 1000:.1f}",
+                f"app;dur={total_seconds * 1000:.1f}",
+            ]
+        )
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def is_transaction_control(statement: str) -> bool:
+    """Whether a statement creates, releases, or rolls back to a savepoint, rather than querying."""
+    return statement.startswith(_TRANSACTION_CONTROL)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """Return the measurements of the request being handled, None outside of a request."""
+    return _current.get()
+
+
+@contextmanager
+def timed_serialization() -> Iterator[None]:
+    """Add the time spent in the block to the current request's serialization time."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialization_seconds += time.perf_counter() - start
+
+
+def _record_return(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap `endpoint` to record when it returns in the current request's metrics.
+
+    The wrapper keeps the endpoint's signature (`functools.wraps`), from which FastAPI reads its
+    parameters and response model, and whether it is a coroutine function.
+    """
+
+    def returned() -> None:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.endpoint_returned_at = time.perf_counter()
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def timed_async(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            returned()
+            return result
+
+        return timed_async
+
+    @functools.wraps(endpoint)
+    def timed(*args, **kwargs):
+        result = endpoint(*args, **kwargs)
+        returned()
+        return result
+
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """Route recording when its endpoint returns, so that `ServerTimingMiddleware` can time the encoding
+    of the response, done by FastAPI after the endpoint returns.
+
+    Set as the `route_class` of every `APIRouter` of the application.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _record_return(endpoint), **kwargs)
+
+
+class TimedQueuePool(QueuePool):
+    """Queue pool recording the time spent obtaining each connection, and its usage.
+
+    The time is added to the current request's pool wait, and to the `db_pool_wait_seconds` metric.
+    The `db_pool_checked_out_connections` and `db_pool_overflow_connections` gauges are updated on every
+    checkout and checkin.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_POOL_WAIT.observe(elapsed)
+            self._update_gauges()
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.pool_wait_seconds += elapsed
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        DB_POOL_CHECKED_OUT.set(self.checkedout())
+        DB_POOL_OVERFLOW.set(max(self.overflow(), 0))
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count the statements executed by `engine`, and their time, in the current request's metrics.
+
+    Args:
+        engine (Engine): The engine to instrument.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        metrics = _current.get()
+        if metrics is None or is_transaction_control(statement):
+            return
+        metrics.queries += 1
+        metrics.db_seconds += elapsed
+        if metrics.capture and len(metrics.statements) < MAX_CAPTURED_STATEMENTS:
+            metrics.statements.append((statement, elapsed))
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        # `after_cursor_execute` does not run for failed statements.
+        starts = (
+            context.connection.info.get("query_start") if context.connection else None
+        )
+        if starts:
+            starts.pop()
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """Return the path template of the route that handled a request, e.g. `/api/reports/{report_id}`.
+
+    Routes of included routers only know their path relative to the router's prefix, so the prefix is
+    recovered from the request path.
+
+    Args:
+        scope (Scope): ASGI scope of the request, after routing.
+
+    Returns:
+        str | None: The template, or None if no route matched.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return None
+    path = scope["path"]
+    try:
+        concrete = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    if path.endswith(concrete):
+        return path[: len(path) - len(concrete)] + template
+    return template
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware measuring each request.
+
+    Reports the measurements in `Server-Timing` and the request log, and records the request in the
+    `http_request_duration_seconds` and `http_requests_in_progress` metrics (see `api/metrics.py`).
+    """
+
+    def __init__(
+        self, app: ASGIApp, slow_request_ms: Optional[float] = SLOW_REQUEST_MS
+    ):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metrics = RequestMetrics(capture=self.slow_request_ms is not None, scope=scope)
+        token = _current.set(metrics)
+        in_progress = REQUESTS_IN_PROGRESS.labels(scope["method"])
+        in_progress.inc()
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if metrics.endpoint_returned_at is not None:
+                    metrics.serialization_seconds += (
+                        time.perf_counter() - metrics.endpoint_returned_at
+                    )
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", metrics.server_timing(time.perf_counter() - start)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            seconds = time.perf_counter() - start
+            _current.reset(token)
+            in_progress.dec()
+            route = route_template(scope)
+            # Unmatched paths share one label, keeping the number of series bounded.
+            REQUEST_DURATION.labels(
+                scope["method"], route or "<unmatched>", str(status_code)
+            ).observe(seconds)
+            self._log(scope, route, metrics, status_code, seconds)
+
+    def _log(
+        self,
+        scope: Scope,
+        route: Optional[str],
+        metrics: RequestMetrics,
+        status_code: int,
+        seconds: float,
+    ) -> None:
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": status_code,
+            "duration_ms": round(seconds * 1000, 2),
+            "queries": metrics.queries,
+            "db_ms": round(metrics.db_seconds * 1000, 2),
+            "pool_wait_ms": round(metrics.pool_wait_seconds * 1000, 2),
+            "serialize_ms": round(metrics.serialization_seconds * 1000, 2),
+        }
+        if self.slow_request_ms is not None and seconds * 1000 >= self.slow_request_ms:
+            record["statements"] = [
+                {"sql": statement, "ms": round(elapsed * 1000, 2)}
+                for statement, elapsed in metrics.statements
+            ]
+        logger.info(json.dumps(record))
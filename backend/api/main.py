@@ -1,6 +1,13 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 from api.endpoints import (
     reports,
     reporter,
@@ -11,10 +18,40 @@ from api.endpoints import (
     export,
     auth,
     audit_logs,
+    review_queue,
+    metrics,
 )
+from api.idempotency import IdempotencyMiddleware, purge_periodically
+from api.instrumentation import ServerTimingMiddleware
+from api.metrics import mark_process_dead
+
+# One JSON line per request (see `api/instrumentation.py`) and per slow query (see
+# `api/slow_query_log.py`), on stderr next to the server's access log.
+json_log_handler = logging.StreamHandler()
+json_log_handler.setFormatter(logging.Formatter("%(message)s"))
+for name in ("api.requests", "api.slow_queries"):
+    json_logger = logging.getLogger(name)
+    json_logger.addHandler(json_log_handler)
+    json_logger.setLevel(logging.INFO)
+    json_logger.propagate = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background job evicting expired idempotency keys.
+    purge = asyncio.create_task(purge_periodically())
+    yield
+    purge.cancel()
+    # Drops this worker's in-progress and pool gauges from the metrics of the other workers.
+    mark_process_dead(os.getpid())
+
 
-app = FastAPI(title="Disease Outbreak Reporting System", version="0.1.0")
+app = FastAPI(
+    title="Disease Outbreak Reporting System", version="0.1.0", lifespan=lifespan
+)
 
+# Added first so that it runs inside CORS: replayed responses get the CORS headers of the retry.
+app.add_middleware(IdempotencyMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Change this to restrict origins
@@ -22,6 +59,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so that it is outermost and its timings cover the whole request.
+app.add_middleware(ServerTimingMiddleware)
+
+
+# A versioned row (see `conditional.check_if_match`) changed between being read and written by a request.
+@app.exception_handler(StaleDataError)
+def stale_data_handler(request: Request, exc: StaleDataError):
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "Resource was modified by another request"},
+    )
 
 
 # Custom OpenAPI schema with Bearer Authentication
@@ -59,3 +107,7 @@ app.include_router(statistics.router, prefix="/api", tags=["Statistics"])
 app.include_router(export.router, prefix="/api/reports", tags=["Export"])
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(audit_logs.router, prefix="/api/audit-logs", tags=["Audit Logs"])
+app.include_router(
+    review_queue.router, prefix="/api/review-queue", tags=["Review Queue"]
+)
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
@@ -0,0 +1,203 @@
+"""
+Prometheus Metrics
+
+This module defines the metrics exposed in the Prometheus text format by `GET /metrics`
+(`api/endpoints/metrics.py`):
+
+- `http_request_duration_seconds{method, route, status}`: request latency histogram, by route template
+  (e.g. `/api/reports/{report_id}`), recorded by `instrumentation.ServerTimingMiddleware`.
+- `http_requests_in_progress{method}`: requests being handled.
+- `db_pool_checked_out_connections`, `db_pool_overflow_connections`: connections of the SQLAlchemy pool
+  in use, and opened beyond its `pool_size`.
+- `db_pool_wait_seconds`: histogram of the time spent obtaining a connection from the pool. The pool
+  metrics are recorded by `instrumentation.TimedQueuePool`.
+- `audit_log_write_seconds{mode}`: histogram of the time spent writing audit entries, one at a time
+  (`single`) or batched (`batch`).
+- `reports_created_total`: reports created.
+- `report_transitions_total{status}`: reports moved to each status.
+- `cache_reads_total{cache, result}`: reads of each cache (`api/cache.py`) that found an entry (`hit`)
+  or not (`miss`). The hit ratio is `rate(cache_reads_total{result="hit"}[5m])` over the rate of all
+  reads.
+- `cache_writes_total{cache, result}`: values stored in each cache (`stored`), or refused as too large
+  or built from invalidated data (`rejected`).
+- `cache_invalidations_total{cache, origin}`: keys invalidated by the worker (`local`), clears
+  (`clear`), and invalidation messages applied from other workers (`remote`).
+- `cache_operation_seconds{cache, operation}`: histogram of the time spent in each cache operation
+  (`get`, `set`, `invalidate`, `clear`, `sync`).
+- `cache_entries{cache}`, `cache_size_bytes{cache}`: entries held in worker memory by caches with the
+  `local` backend, summed over the workers.
+
+Report counters are incremented when the transaction that created or moved the reports commits, so
+rolled back changes are never counted.
+
+Multiple workers: each worker process (`uvicorn --workers`, gunicorn) holds its own metrics. Set
+`PROMETHEUS_MULTIPROC_DIR` to an empty directory, writable by the workers of the host, before the server
+starts: the workers then write their metrics to files in it, and `GET /metrics` answers with their sum
+from any worker. Clear the directory when the server restarts.
+"""
+
+import os
+import time
+from collections import Counter as Tally
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from api import models
+from api.enums import ReportStateEnum
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+_CREATED_KEY = "metrics_reports_created"
+_TRANSITIONS_KEY = "metrics_report_transitions"
+# Most connections come from the pool at once, so the default buckets' 5 ms floor is too coarse.
+_POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1, 5, 30)
+# Cache operations take microseconds in memory, up to milliseconds in the shared store.
+_CACHE_OPERATION_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, by route template.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections checked out from the pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Database connections opened beyond the pool size.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent obtaining a database connection from the pool.",
+    buckets=_POOL_WAIT_BUCKETS,
+)
+AUDIT_LOG_WRITE = Histogram(
+    "audit_log_write_seconds",
+    "Time spent writing audit log entries.",
+    ["mode"],
+)
+REPORTS_CREATED = Counter("reports_created", "Reports created.")
+REPORT_TRANSITIONS = Counter(
+    "report_transitions", "Reports moved to a status.", ["status"]
+)
+CACHE_READS = Counter(
+    "cache_reads", "Cache reads, by result (hit or miss).", ["cache", "result"]
+)
+CACHE_WRITES = Counter(
+    "cache_writes",
+    "Values offered to a cache, by result (stored or rejected).",
+    ["cache", "result"],
+)
+CACHE_INVALIDATIONS = Counter(
+    "cache_invalidations",
+    "Cache keys invalidated locally, clears, and invalidations received from other workers.",
+    ["cache", "origin"],
+)
+CACHE_OPERATION = Histogram(
+    "cache_operation_seconds",
+    "Time spent in cache operations.",
+    ["cache", "operation"],
+    buckets=_CACHE_OPERATION_BUCKETS,
+)
+CACHE_ENTRIES = Gauge(
+    "cache_entries",
+    "Entries held in worker memory by a cache.",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+CACHE_SIZE = Gauge(
+    "cache_size_bytes",
+    "Size of the entries held in worker memory by a cache.",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+
+def metrics_response() -> tuple[bytes, str]:
+    """Render the metrics of this process, or of every worker in multi-process mode.
+
+    Returns:
+        tuple[bytes, str]: The Prometheus text exposition and its content type.
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of an exited worker, in multi-process mode."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+@contextmanager
+def timed_audit_write(mode: str) -> Iterator[None]:
+    """Record the time spent in the block as an audit log write.
+
+    Args:
+        mode (str): `single` or `batch`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        AUDIT_LOG_WRITE.labels(mode).observe(time.perf_counter() - start)
+
+
+def count_transitions(db: Session, target: ReportStateEnum, count: int) -> None:
+    """Count reports moved to `target` by a statement executed outside the ORM unit of work.
+
+    Counted when `db` commits. Changes of status flushed by the session are counted automatically.
+    """
+    db.info.setdefault(_TRANSITIONS_KEY, Tally())[target] += count
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_reports(session: Session, flush_context) -> None:
+    for obj in session.new:
+        if isinstance(obj, models.Report):
+            session.info[_CREATED_KEY] = session.info.get(_CREATED_KEY, 0) + 1
+    for obj in session.dirty:
+        if isinstance(obj, models.Report):
+            added = inspect(obj).attrs.status.history.added
+            if added:
+                count_transitions(session, added[0], 1)
+
+
+@event.listens_for(Session, "after_commit")
+def _count_after_commit(session: Session) -> None:
+    created = session.info.pop(_CREATED_KEY, 0)
+    if created:
+        REPORTS_CREATED.inc(created)
+    for status, count in session.info.pop(_TRANSITIONS_KEY, Tally()).items():
+        REPORT_TRANSITIONS.labels(status.value).inc(count)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_CREATED_KEY, None)
+    session.info.pop(_TRANSITIONS_KEY, None)
@@ -3,6 +3,7 @@ from datetime import date, datetime
 from typing import Optional, List
 
 from sqlalchemy import (
+    DDL,
     String,
     Date,
     DateTime,
@@ -12,7 +13,13 @@ from sqlalchemy import (
     Enum as SqlEnum,
     Table,
     Column,
+    Index,
+    LargeBinary,
+    Text,
+    event,
+    text,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -40,6 +47,8 @@ class Base(DeclarativeBase):
 # NOTE: The patient record itself is not deleted when a report is deleted, and vice versa.
 #     : Only the association is cleaned up.
 # Primary keys: Composite primary key (`patient_id`, `report_id`) ensures unique pairs (no duplicate links).
+# The primary key index leads with `patient_id`, so lookups by report (loading a report's patients) use
+# the separate `report_id` index.
 patient_reports = Table(
     "patient_reports",
     Base.metadata,
@@ -47,6 +56,7 @@ patient_reports = Table(
         "patient_id", ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True
     ),
     Column("report_id", ForeignKey("reports.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_patient_reports_report_id", "report_id"),
 )
 
 
@@ -119,6 +129,11 @@ class Disease(Base):
         SqlEnum(TreatmentStatusEnum), nullable=False
     )
 
+    # Optimistic concurrency: incremented by every ORM update, which only applies if the row still has the
+    # version it was loaded with (otherwise `StaleDataError`). Clients send it back in `If-Match`.
+    version: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+
     # The `report_id` foreign key establishes a required link from Disease to a single Report instance (one-to-one relationship).
     # Deleting a Report triggers a database-level cascade (`ondelete="CASCADE"`), which deletes the associated Disease.
     # You cannot delete a Disease independently at the database level because `report_id` is `nullable=False` and enforced by the schema.
@@ -126,7 +141,7 @@ class Disease(Base):
     #   - remove the association via `report.disease = None` (triggers ORM-level delete-orphan), or
     #   - delete the associated Report, which will cascade-delete the Disease.
     report_id: Mapped[int] = mapped_column(
-        ForeignKey("reports.id", ondelete="CASCADE"), nullable=False
+        ForeignKey("reports.id", ondelete="CASCADE"), nullable=False, index=True
     )
 
     # Enables ORM-level access to the associated Report instance.
@@ -147,16 +162,35 @@ class Report(Base):
     updated_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), onupdate=func.now()
     )
+
+    # Optimistic concurrency, as for `Disease.version`. The ORM increments it when the report row changes,
+    # and the flush hooks of `api/search_index.py` when its disease, reporter, or patients do, so that it
+    # identifies the state of the whole report. Statements that bypass the ORM must increment it themselves.
+    version: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+
     created_by: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    creator: Mapped[User] = relationship("User", back_populates="reports")
+    creator: Mapped[User] = relationship(
+        "User", back_populates="reports", foreign_keys=[created_by]
+    )
+
+    # Review queue claim (see `api/review_queue.py`): the senior reviewing an `under_review` report, and when
+    # their lease on it ends. An expired claim can be taken over by another reviewer. Both are NULL for
+    # reports that are not claimed.
+    claimed_by: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL")
+    )
+    claim_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
 
     # The `reporter_id` foreign key establishes an (optional) link from Report to a single Reporter instance.
     # Deleting a Reporter triggers a database-level cascade (`ondelete="CASCADE"`), deleting all their associated Reports.
     # The reverse is not true: deleting a Report has no effect on the Reporter; the Reporter remains in the database.
     reporter_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("reporters.id", ondelete="CASCADE")
+        ForeignKey("reporters.id", ondelete="CASCADE"), index=True
     )
 
     # Enables ORM-level access to the associated Reporter instance.
@@ -194,6 +228,17 @@ class Report(Base):
         single_parent=True,
     )
 
+    __table_args__ = (
+        # Backs the review queue, which takes the oldest submitted reports (and under review reports whose
+        # claim expired). Partial, so that the bulk of drafts and approved reports is left out.
+        Index(
+            "ix_reports_review_queue",
+            "status",
+            "created_at",
+            postgresql_where=text("status IN ('submitted', 'under_review')"),
+        ),
+    )
+
 
 class User(Base):
     __tablename__ = "users"
@@ -220,6 +265,7 @@ class User(Base):
     reports: Mapped[List["Report"]] = relationship(
         "Report",
         back_populates="creator",
+        foreign_keys="Report.created_by",
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
@@ -229,8 +275,9 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # Indexed for `GET /api/audit-logs`, which filters and pages by timestamp, newest first.
     timestamp: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), server_default=func.now(), index=True
     )
 
     user_id: Mapped[Optional[int]] = mapped_column(
@@ -250,3 +297,125 @@ class AuditLog(Base):
 
     def __repr__(self):
         return f"<AuditLog(action={self.action}, entity={self.entity_type}, id={self.entity_id})>"
+
+
+def _pg_trgm_available(ddl, target, bind, **kw) -> bool:
+    """Whether the `pg_trgm` extension is installed or can be installed on the server being created on.
+
+    Like the `report_search_table` migration, `metadata.create_all` only creates the extension and the
+    trigram indexes where it is, and skips them on other servers and dialects.
+    """
+    if bind is None or bind.dialect.name != "postgresql":
+        return False
+    return bool(
+        bind.exec_driver_sql(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        ).scalar()
+    )
+
+
+class ReportSearch(Base):
+    """Denormalized read model of a report, one row per report.
+
+    Holds the report's status and dates together with the fields of its disease, reporter, and patients
+    that search and list views filter, sort, and display on, so those views read a single indexed table
+    instead of joining `reports`, `diseases`, `reporters`, and `patient_reports` at query time.
+
+    Rows are written only by `api.search_index`, which upserts them from ORM flush hooks in the same
+    transaction as the change they reflect. Never write to this table directly.
+    """
+
+    __tablename__ = "report_search"
+    __table_args__ = (
+        Index("ix_report_search_status_created_at", "status", "created_at"),
+        Index(
+            "ix_report_search_search_vector", "search_vector", postgresql_using="gin"
+        ),
+        # Trigram indexes so that substring searches (`ILIKE '%term%'`) can use an index.
+        # Only created where the `pg_trgm` extension is available, see `_pg_trgm_available`.
+        Index(
+            "ix_report_search_disease_name_trgm",
+            "disease_name",
+            postgresql_using="gin",
+            postgresql_ops={"disease_name": "gin_trgm_ops"},
+        ).ddl_if(callable_=_pg_trgm_available),
+        Index(
+            "ix_report_search_hospital_name_trgm",
+            "hospital_name",
+            postgresql_using="gin",
+            postgresql_ops={"hospital_name": "gin_trgm_ops"},
+        ).ddl_if(callable_=_pg_trgm_available),
+    )
+
+    # Deleting a Report cascades to its search row at the database level.
+    report_id: Mapped[int] = mapped_column(
+        ForeignKey("reports.id", ondelete="CASCADE"), primary_key=True
+    )
+    status: Mapped[ReportStateEnum] = mapped_column(
+        SqlEnum(ReportStateEnum), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    created_by: Mapped[int] = mapped_column(nullable=False)
+
+    reporter_id: Mapped[Optional[int]] = mapped_column(nullable=True)
+    hospital_name: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+
+    disease_name: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    disease_category: Mapped[Optional[DiseaseCategoryEnum]] = mapped_column(
+        SqlEnum(DiseaseCategoryEnum), nullable=True
+    )
+    severity_level: Mapped[Optional[SeverityLevelEnum]] = mapped_column(
+        SqlEnum(SeverityLevelEnum), nullable=True
+    )
+    treatment_status: Mapped[Optional[TreatmentStatusEnum]] = mapped_column(
+        SqlEnum(TreatmentStatusEnum), nullable=True
+    )
+    date_detected: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+
+    patient_count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    # Incremented, and `modified_at` reset, every time the row is refreshed, i.e. every time the report
+    # or one of its children changes. The HTTP validators are `Report.version` and `Report.updated_at`,
+    # maintained on every dialect (`api/conditional.py`).
+    version: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    modified_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    # Full-text search document covering the disease name, hospital name, symptoms, and lab results.
+    # Deferred so that it is never loaded with the row itself.
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        Text().with_variant(TSVECTOR(), "postgresql"), nullable=True, deferred=True
+    )
+
+
+event.listen(
+    ReportSearch.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        callable_=_pg_trgm_available
+    ),
+)
+
+
+class IdempotencyKey(Base):
+    """Response recorded for an `Idempotency-Key`, replayed when the request is retried.
+
+    Rows are written only by `api.idempotency`. A row whose `status_code` is NULL belongs to a request
+    still in progress: its inserting transaction stays open until the response is recorded, so retries
+    wait on it.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    # SHA-256 of the credentials and the client's key, so that keys are scoped to their client.
+    key: Mapped[bytes] = mapped_column(LargeBinary(32), primary_key=True)
+    # SHA-256 of the method, path, and body of the request, to detect a key reused for another request.
+    fingerprint: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False)
+    status_code: Mapped[Optional[int]] = mapped_column(nullable=True)
+    headers: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
@@ -0,0 +1,400 @@
+"""
+Report Queries
+
+This module is the shared read layer for reports and their sub-resources. Endpoints use it instead of
+building their own queries, so every read loads exactly what its response serializes, in a fixed number
+of SQL statements that does not grow with the number of rows returned.
+
+Reports are loaded with the eager loading strategies of a `LoaderPolicy`. The default policy uses:
+- Joined eager loads for `Report.reporter` and `Report.disease` (at most one row each), in the same
+  statement as the reports.
+- A `selectinload` for `Report.patients` (a collection), i.e. one extra
+  `SELECT ... WHERE report_id IN (...)` for the whole page. A joined load would repeat every report row
+  once per patient and, combined with `LIMIT`, force a subquery around the paginated reports.
+
+The default can be overridden with the `REPORT_SCALAR_LOADER` and `REPORT_COLLECTION_LOADER` environment
+variables (`joined`, `selectin`, or `subquery`). `benchmarks/loader_benchmark.py` compares policies.
+
+A `ReportFieldset` (the `fields` and `include` query parameters) narrows what is loaded to the requested
+columns (`load_only`) and relationships; relationships that were not requested are not loaded at all.
+
+Sub-resources (`/reports/{id}/disease`, `/reporter`, `/patient`) are loaded by a single direct query by
+report ID, outer joined to `reports` so a missing report can still be told apart from a missing child.
+
+Query counts per endpoint are pinned by `tests/api/test_query_counts.py`.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Row, func
+from sqlalchemy.orm import (
+    Query,
+    Session,
+    joinedload,
+    load_only,
+    selectinload,
+    subqueryload,
+)
+
+from api import models
+
+# Eager loading strategies a `LoaderPolicy` can choose from, by name.
+LOADER_STRATEGIES = {
+    "joined": joinedload,
+    "selectin": selectinload,
+    "subquery": subqueryload,
+}
+
+# Scalar fields and relationships of `schemas.Report`, in serialization order.
+REPORT_FIELDS = ("id", "status", "created_at", "updated_at", "version")
+REPORT_RELATIONSHIPS = ("reporter", "patients", "disease")
+
+
+@dataclass(frozen=True)
+class LoaderPolicy:
+    """Eager loading strategies used to load reports for serialization.
+
+    Attributes:
+        scalar (str): Strategy for the one-to-one relationships (`reporter`, `disease`).
+        collection (str): Strategy for the collection relationships (`patients`).
+
+    Raises:
+        ValueError: If a strategy is not a key of `LOADER_STRATEGIES`.
+    """
+
+    scalar: str = "joined"
+    collection: str = "selectin"
+
+    def __post_init__(self):
+        for strategy in (self.scalar, self.collection):
+            if strategy not in LOADER_STRATEGIES:
+                raise ValueError(
+                    f"Unknown loader strategy '{strategy}', expected one of: {', '.join(LOADER_STRATEGIES)}."
+                )
+
+    @classmethod
+    def from_env(cls) -> "LoaderPolicy":
+        """Build the policy from `REPORT_SCALAR_LOADER` and `REPORT_COLLECTION_LOADER`, if set."""
+        return cls(
+            scalar=os.getenv("REPORT_SCALAR_LOADER", cls.scalar),
+            collection=os.getenv("REPORT_COLLECTION_LOADER", cls.collection),
+        )
+
+    def report_options(
+        self, relationships: Sequence[str] = REPORT_RELATIONSHIPS
+    ) -> tuple:
+        """Loader options loading the given relationships of `schemas.Report` (by default, all of them)."""
+        scalar = LOADER_STRATEGIES[self.scalar]
+        collection = LOADER_STRATEGIES[self.collection]
+        options = {
+            "reporter": scalar(models.Report.reporter),
+            "disease": scalar(models.Report.disease),
+            "patients": collection(models.Report.patients),
+        }
+        return tuple(options[name] for name in relationships)
+
+
+# Policy used by the API.
+LOADER_POLICY = LoaderPolicy.from_env()
+
+
+@dataclass(frozen=True)
+class ReportFieldset:
+    """Fields of `schemas.Report` requested by a client, with the `fields` and `include` query parameters.
+
+    Attributes:
+        fields (Tuple[str, ...]): Scalar fields, in `REPORT_FIELDS` order. Always contains `id`.
+        include (Tuple[str, ...]): Relationships, in `REPORT_RELATIONSHIPS` order.
+    """
+
+    fields: Tuple[str, ...] = REPORT_FIELDS
+    include: Tuple[str, ...] = REPORT_RELATIONSHIPS
+
+    @classmethod
+    def parse(cls, fields: Optional[str], include: Optional[str]) -> "ReportFieldset":
+        """Build a fieldset from comma separated `fields` and `include` parameters.
+
+        Without `fields`, every scalar field is returned. Without `include`, every relationship is
+        returned, unless `fields` is given, in which case none is: `fields=id,status` asks for a
+        lightweight representation.
+
+        Args:
+            fields (Optional[str]): Scalar fields, e.g. `"id,status,created_at"`.
+            include (Optional[str]): Relationships, e.g. `"reporter,disease"`. Empty for none.
+
+        Raises:
+            ValueError: If a name is not in `REPORT_FIELDS` or `REPORT_RELATIONSHIPS` respectively.
+
+        Returns:
+            ReportFieldset: The fieldset, with names in canonical order so that equal requests compare
+                equal.
+        """
+
+        def names(value: str, allowed: Tuple[str, ...], parameter: str) -> set:
+            requested = {name.strip() for name in value.split(",") if name.strip()}
+            for name in requested - set(allowed):
+                raise ValueError(
+                    f"Unknown {parameter} '{name}', expected any of: {', '.join(allowed)}."
+                )
+            return requested
+
+        requested_fields = (
+            names(fields, REPORT_FIELDS, "field") | {"id"}
+            if fields is not None
+            else set(REPORT_FIELDS)
+        )
+        if include is not None:
+            requested_include = names(include, REPORT_RELATIONSHIPS, "relationship")
+        else:
+            requested_include = (
+                set() if fields is not None else set(REPORT_RELATIONSHIPS)
+            )
+        return cls(
+            fields=tuple(name for name in REPORT_FIELDS if name in requested_fields),
+            include=tuple(
+                name for name in REPORT_RELATIONSHIPS if name in requested_include
+            ),
+        )
+
+    @property
+    def is_full(self) -> bool:
+        """Whether every field of `schemas.Report` is requested."""
+        return self == FULL_REPORT
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """Requested scalar fields and relationships."""
+        return self.fields + self.include
+
+    @property
+    def tag(self) -> Optional[str]:
+        """Digest of the fieldset, added to the entity tags of its representations (see
+        `conditional.version_etag`). None for the full representation, whose tags carry none.
+        """
+        if self.is_full:
+            return None
+        key = f"{','.join(self.fields)};{','.join(self.include)}"
+        return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+# Every field of `schemas.Report`, the representation returned without `fields` and `include`.
+FULL_REPORT = ReportFieldset()
+
+
+def report_details(
+    db: Session,
+    policy: Optional[LoaderPolicy] = None,
+    fieldset: ReportFieldset = FULL_REPORT,
+) -> Query:
+    """Build a report query that loads everything `schemas.Report` serializes, or only a fieldset of it.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        policy (Optional[LoaderPolicy]): Loader policy to apply. Defaults to `LOADER_POLICY`.
+        fieldset (ReportFieldset): Fields to load. Defaults to all of them.
+
+    Returns:
+        Query: Query for `models.Report` with the policy's loader options, to be filtered by the caller.
+    """
+    options = (policy or LOADER_POLICY).report_options(fieldset.include)
+    if fieldset.fields != REPORT_FIELDS:
+        columns = (getattr(models.Report, name) for name in fieldset.fields)
+        options += (load_only(*columns, raiseload=True),)
+    return db.query(models.Report).options(*options)
+
+
+def list_reports(
+    db: Session,
+    skip: int,
+    limit: int,
+    policy: Optional[LoaderPolicy] = None,
+    fieldset: ReportFieldset = FULL_REPORT,
+) -> List[models.Report]:
+    """Load one page of reports, ordered by ID, with their reporter, disease, and patients.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        skip (int): Number of reports to skip.
+        limit (int): Maximum number of reports to return.
+        policy (Optional[LoaderPolicy]): Loader policy to apply. Defaults to `LOADER_POLICY`.
+        fieldset (ReportFieldset): Fields to load. Defaults to all of them.
+
+    Returns:
+        List[models.Report]: The page of reports.
+    """
+    return (
+        report_details(db, policy, fieldset)
+        .order_by(models.Report.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def get_report_validators(db: Session, report_id: int) -> Optional[Row]:
+    """Read the conditional request validators of one report, by primary key.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        report_id (int): ID of the report.
+
+    Returns:
+        Optional[Row]: Row with the `version`, `modified_at` (last update, or creation), and `status` of
+            the report, or None if it does not exist.
+    """
+    return (
+        db.query(
+            models.Report.version,
+            func.coalesce(models.Report.updated_at, models.Report.created_at).label(
+                "modified_at"
+            ),
+            models.Report.status,
+        )
+        .filter(models.Report.id == report_id)
+        .first()
+    )
+
+
+def list_report_versions(db: Session, skip: int, limit: int) -> List[Row]:
+    """Read the IDs and versions of the reports on one page of `list_reports`.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        skip (int): Number of reports to skip.
+        limit (int): Maximum number of reports to return.
+
+    Returns:
+        List[Row]: Rows with the `report_id` and `version` of each report on the page, in page order.
+    """
+    # Read from `reports` rather than `report_search`, which is only maintained on PostgreSQL.
+    return (
+        db.query(models.Report.id.label("report_id"), models.Report.version)
+        .order_by(models.Report.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def get_report(
+    db: Session, report_id: int, fieldset: ReportFieldset = FULL_REPORT
+) -> Optional[models.Report]:
+    """Load one report with its reporter, disease, and patients.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        report_id (int): ID of the report.
+        fieldset (ReportFieldset): Fields to load. Defaults to all of them.
+
+    Returns:
+        Optional[models.Report]: The report, or None if it does not exist.
+    """
+    return (
+        report_details(db, fieldset=fieldset)
+        .filter(models.Report.id == report_id)
+        .first()
+    )
+
+
+def get_reports_in_order(
+    db: Session, report_ids: Sequence[int], fieldset: ReportFieldset = FULL_REPORT
+) -> List[models.Report]:
+    """Load the given reports with their reporter, disease, and patients, in the order of `report_ids`.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        report_ids (Sequence[int]): IDs of the reports, in the order they should be returned.
+        fieldset (ReportFieldset): Fields to load. Defaults to all of them.
+
+    Returns:
+        List[models.Report]: The reports that exist, ordered as `report_ids`.
+    """
+    if not report_ids:
+        return []
+
+    reports = (
+        report_details(db, fieldset=fieldset)
+        .filter(models.Report.id.in_(report_ids))
+        .all()
+    )
+    position = {report_id: index for index, report_id in enumerate(report_ids)}
+    return sorted(reports, key=lambda report: position[report.id])
+
+
+def get_report_disease(
+    db: Session, report_id: int
+) -> tuple[bool, Optional[models.Disease]]:
+    """Load the disease of a report in one query, without loading the report.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        report_id (int): ID of the report.
+
+    Returns:
+        tuple[bool, Optional[models.Disease]]: Whether the report exists, and its disease if it has one.
+    """
+    row = (
+        db.query(models.Report.id, models.Disease)
+        .outerjoin(models.Disease, models.Disease.report_id == models.Report.id)
+        .filter(models.Report.id == report_id)
+        .first()
+    )
+    if row is None:
+        return False, None
+    return True, row.Disease
+
+
+def get_report_reporter(
+    db: Session, report_id: int
+) -> tuple[bool, Optional[models.Reporter]]:
+    """Load the reporter of a report in one query, without loading the report.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        report_id (int): ID of the report.
+
+    Returns:
+        tuple[bool, Optional[models.Reporter]]: Whether the report exists, and its reporter if it has one.
+    """
+    row = (
+        db.query(models.Report.id, models.Reporter)
+        .outerjoin(models.Reporter, models.Reporter.id == models.Report.reporter_id)
+        .filter(models.Report.id == report_id)
+        .first()
+    )
+    if row is None:
+        return False, None
+    return True, row.Reporter
+
+
+def get_report_patients(
+    db: Session, report_id: int
+) -> tuple[bool, List[models.Patient]]:
+    """Load the patients of a report in one query, without loading the report.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        report_id (int): ID of the report.
+
+    Returns:
+        tuple[bool, List[models.Patient]]: Whether the report exists, and its patients ordered by ID.
+    """
+    rows = (
+        db.query(models.Report.id, models.Patient)
+        .outerjoin(
+            models.patient_reports,
+            models.patient_reports.c.report_id == models.Report.id,
+        )
+        .outerjoin(
+            models.Patient, models.Patient.id == models.patient_reports.c.patient_id
+        )
+        .filter(models.Report.id == report_id)
+        .order_by(models.Patient.id)
+        .all()
+    )
+    if not rows:
+        return False, []
+    return True, [row.Patient for row in rows if row.Patient is not None]
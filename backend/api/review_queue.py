@@ -0,0 +1,149 @@
+"""
+Review Queue
+
+This module hands submitted reports out to senior reviewers, so that several reviewers can work through
+the backlog at the same time without ever being given the same report.
+
+A claim moves the oldest unclaimed reports to `under_review` and records the reviewer (`claimed_by`) and
+the end of their lease (`claim_expires_at`). Claims are taken with a single statement:
+
+    UPDATE reports SET status = 'under_review', claimed_by = ..., claim_expires_at = now() + <lease>
+    FROM (SELECT id, status FROM reports WHERE <claimable> ORDER BY created_at, id LIMIT n
+          FOR UPDATE SKIP LOCKED) AS claimable
+    WHERE reports.id = claimable.id
+    RETURNING ...
+
+`SKIP LOCKED` makes concurrent claims pass over the rows another claim is locking instead of waiting
+for it, then finding them taken. The candidates are read from the partial `ix_reports_review_queue`
+index.
+
+Claimable reports are submitted reports, and under review reports whose lease has expired (a reviewer
+who stopped without approving or releasing them). A reviewer finishes a claim by moving the report on
+(`POST /api/reports/transitions`), or hands it back by releasing it.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from api import models
+from api.enums import ReportStateEnum
+from api.state_machine import record_transitions
+
+# How long a reviewer keeps the reports they claimed before other reviewers can claim them.
+CLAIM_LEASE = timedelta(seconds=int(os.getenv("REVIEW_CLAIM_LEASE_SECONDS", "1800")))
+
+
+def claimable():
+    """Build the condition matching reports that can be claimed now."""
+    return or_(
+        models.Report.status == ReportStateEnum.submitted,
+        and_(
+            models.Report.status == ReportStateEnum.under_review,
+            models.Report.claim_expires_at < func.now(),
+        ),
+    )
+
+
+def claim_reports(
+    db: Session, user: models.User, limit: int
+) -> tuple[List[int], datetime | None]:
+    """Claim the oldest claimable reports for a reviewer, moving them to `under_review`.
+
+    Each claimed report gets an audit entry (action `UPDATE`) with its previous status and the claimant.
+    The caller commits.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user (models.User): Reviewer claiming the reports.
+        limit (int): Most reports to claim.
+
+    Returns:
+        tuple[List[int], datetime | None]: IDs of the claimed reports, oldest first, and the end of their
+            lease. Empty and None if no report could be claimed.
+    """
+    candidates = (
+        select(models.Report.id, models.Report.status, models.Report.created_at)
+        .where(claimable())
+        .order_by(models.Report.created_at, models.Report.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        # Materialized so that the candidates are selected once. Inlined as a subquery, the planner may
+        # rescan it for every updated row, each rescan locking the next reports past the limit.
+        .cte("candidates")
+        .prefix_with("MATERIALIZED")
+    )
+    statement = (
+        update(models.Report.__table__)
+        .where(models.Report.id == candidates.c.id)
+        .values(
+            status=ReportStateEnum.under_review,
+            claimed_by=user.id,
+            claim_expires_at=func.now() + CLAIM_LEASE,
+            updated_at=func.now(),
+            version=models.Report.version + 1,
+        )
+        .returning(
+            models.Report.id,
+            candidates.c.status,
+            candidates.c.created_at,
+            models.Report.claim_expires_at,
+        )
+    )
+    # Executed on the connection, as in `state_machine.transition_reports`.
+    rows = sorted(
+        db.connection().execute(statement).all(), key=lambda row: (row[2], row[0])
+    )
+    if not rows:
+        return [], None
+
+    moved: Dict[int, ReportStateEnum] = {row[0]: row[1] for row in rows}
+    record_transitions(
+        db, moved, ReportStateEnum.under_review, user, claimed_by=user.id
+    )
+    return list(moved), rows[0][3]
+
+
+def release_reports(
+    db: Session, user: models.User, report_ids: Iterable[int]
+) -> List[int]:
+    """Hand reports claimed by a reviewer back to the queue, moving them to `submitted`.
+
+    Only reports the reviewer still holds are released: reports whose expired claim another reviewer
+    took over are left alone. The caller commits.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user (models.User): Reviewer releasing the reports.
+        report_ids (Iterable[int]): IDs of the reports to release.
+
+    Returns:
+        List[int]: IDs of the released reports.
+    """
+    statement = (
+        update(models.Report.__table__)
+        .where(
+            models.Report.id.in_(list(report_ids)),
+            models.Report.status == ReportStateEnum.under_review,
+            models.Report.claimed_by == user.id,
+        )
+        .values(
+            status=ReportStateEnum.submitted,
+            claimed_by=None,
+            claim_expires_at=None,
+            updated_at=func.now(),
+            version=models.Report.version + 1,
+        )
+        .returning(models.Report.id)
+    )
+    released = list(db.connection().execute(statement).scalars())
+    record_transitions(
+        db,
+        dict.fromkeys(released, ReportStateEnum.under_review),
+        ReportStateEnum.submitted,
+        user,
+    )
+    return released
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict
+from pydantic import BaseModel, EmailStr, Field, WithJsonSchema
+from typing import Annotated, Optional, List, Dict
 from datetime import date, datetime, timezone
 from api.enums import (
     GenderEnum,
@@ -7,9 +7,15 @@ from api.enums import (
     SeverityLevelEnum,
     TreatmentStatusEnum,
     ReportStateEnum,
+    TransitionOutcomeEnum,
     UserRoleEnum,
 )
 
+# Email read back from the database, validated as an `EmailStr` when it was written.
+# Response models use it instead of `EmailStr`, whose validation would otherwise run again on every
+# response and dominate the serialization of reports (see `benchmarks/serialization_benchmark.py`).
+StoredEmail = Annotated[str, WithJsonSchema({"type": "string", "format": "email"})]
+
 
 # Reporter Schemas
 class ReporterBase(BaseModel):
@@ -39,6 +45,7 @@ class ReporterCreate(ReporterBase):
 
 class Reporter(ReporterBase):
     id: int
+    email: StoredEmail
     registration_date: datetime
 
     model_config = {"from_attributes": True}
@@ -143,6 +150,7 @@ class DiseaseCreate(DiseaseBase):
 
 class Disease(DiseaseBase):
     id: int
+    version: int
 
     model_config = {"from_attributes": True}
 
@@ -260,6 +268,7 @@ class Report(ReportBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int
 
     reporter: Optional[Reporter]
     patients: List[Patient] = []
@@ -268,6 +277,160 @@ class Report(ReportBase):
     model_config = {"from_attributes": True}
 
 
+class ReportSummary(BaseModel):
+    """Flat summary of a report, read from the denormalized `report_search` table.
+
+    Carries the fields list and search views display, without the nested reporter, patient, and disease
+    objects of `Report`. Disease and hospital fields are None until they are attached to the report.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    id: int = Field(validation_alias="report_id")
+    status: ReportStateEnum
+    created_at: datetime
+    updated_at: Optional[datetime]
+    created_by: int
+    reporter_id: Optional[int]
+    hospital_name: Optional[str]
+    disease_name: Optional[str]
+    disease_category: Optional[DiseaseCategoryEnum]
+    severity_level: Optional[SeverityLevelEnum]
+    treatment_status: Optional[TreatmentStatusEnum]
+    date_detected: Optional[date]
+    patient_count: int
+
+    model_config = {"from_attributes": True}
+
+
+class SearchFacets(BaseModel):
+    """Number of reports matching a search per value of each facet, keyed by value.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    status: Dict[str, int]
+    disease_category: Dict[str, int]
+    severity_level: Dict[str, int]
+    hospital_name: Dict[str, int]
+
+
+class FacetedSearchResults(BaseModel):
+    """A page of search results with the total number of matches and their facet counts.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    total: int
+    results: List[Report]
+    facets: SearchFacets
+
+
+# Maximum number of reports requested by one `POST /api/reports/batch`.
+REPORT_BATCH_LIMIT = 100
+
+
+class ReportBatchRequest(BaseModel):
+    """IDs of the reports to fetch with `POST /api/reports/batch`.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    ids: List[int] = Field(..., min_length=1, max_length=REPORT_BATCH_LIMIT)
+
+    class Config:
+        json_schema_extra = {"example": {"ids": [1, 2, 3]}}
+
+
+class ReportBatch(BaseModel):
+    """Reports fetched by `POST /api/reports/batch`, in request order, and the requested IDs not found.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    reports: List[Report]
+    missing: List[int]
+
+
+REPORT_TRANSITION_LIMIT = 1000
+
+
+class ReportTransitionRequest(BaseModel):
+    """Reports to move to a new state with `POST /api/reports/transitions`.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    ids: List[int] = Field(..., min_length=1, max_length=REPORT_TRANSITION_LIMIT)
+    status: ReportStateEnum
+
+    class Config:
+        json_schema_extra = {"example": {"ids": [1, 2, 3], "status": "Approved"}}
+
+
+class ReportTransitionResult(BaseModel):
+    """Outcome of a state transition for one report.
+
+    `status` is the report's state after the request: the requested state if it was moved, its unchanged
+    state otherwise, and None if the report does not exist.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    id: int
+    outcome: TransitionOutcomeEnum
+    status: Optional[ReportStateEnum]
+
+    model_config = {"from_attributes": True}
+
+
+REVIEW_CLAIM_LIMIT = 50
+
+
+class ReviewClaim(BaseModel):
+    """Reports claimed from the review queue by `POST /api/review-queue/claim`.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    lease_expires_at: Optional[datetime] = Field(
+        ...,
+        description="End of the reviewer's lease on the reports, None if no report was claimed.",
+    )
+    reports: List[Report]
+
+
+class ReportIds(BaseModel):
+    """A list of report IDs.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    ids: List[int]
+
+
+class ReviewRelease(BaseModel):
+    """IDs of claimed reports to hand back to the review queue.
+
+    Args:
+        BaseModel (BaseModel): Base model for all Pydantic models.
+    """
+
+    ids: List[int] = Field(..., min_length=1, max_length=REVIEW_CLAIM_LIMIT)
+
+    class Config:
+        json_schema_extra = {"example": {"ids": [1, 2, 3]}}
+
+
 class StatisticsSummary(BaseModel):
     total_reports: int
     reports_by_status: Dict[str, int]
@@ -337,6 +500,7 @@ class UserLogin(BaseModel):
 # For safe user data exposure.
 class UserRead(UserBase):
     id: int
+    email: StoredEmail
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime]
@@ -0,0 +1,295 @@
+"""
+Report Search Index
+
+This module maintains the denormalized `report_search` read table (`models.ReportSearch`) and builds the
+full-text queries used by the search endpoints.
+
+Each `report_search` row copies, for one report:
+- The report's status, dates, and creator.
+- Its reporter's ID and hospital name.
+- Its disease's name, category, severity, treatment status, and detection date.
+- The number of linked patients.
+- A full-text search document (`search_vector`), weighted as follows:
+    - `diseases.disease_name` (weight A)
+    - `reporters.hospital_name` (weight B)
+    - `diseases.symptoms` (weight C)
+    - `diseases.lab_results` (weight D)
+
+Every refresh of a row increments its `version` and resets its `modified_at`, which identify the
+current state of the report and its children.
+
+Rows are kept current by ORM flush hooks. After every flush, the rows of all reports touched by it (the
+report itself, its disease, its reporter, or a deleted patient linked to it) are upserted from the source
+tables, inside the same transaction as the change that caused it. Writes that bypass the ORM unit of work
+(bulk `UPDATE` statements, raw SQL) must call `sync_report_search` themselves.
+
+The same hooks advance `Report.version` (and `updated_at`) when a report's disease, reporter, or patients
+change, which the ORM only does for changes to the report row itself. The version then identifies the
+state of the whole representation, and is the validator of conditional requests (see
+`api/conditional.py`).
+
+Only PostgreSQL is supported (`tsvector`, `ON CONFLICT`), on any other dialect the `report_search` rows are
+not maintained. Report versions are advanced on every dialect.
+"""
+
+from itertools import chain
+from typing import Iterable, List
+
+from sqlalchemy import (
+    Connection,
+    Row,
+    Text,
+    cast,
+    event,
+    func,
+    inspect,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import TSQUERY, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from api import models
+
+# The `simple` configuration lowercases but does not stem, which suits disease names, hospital names,
+# and the prefix matching performed by `prefix_tsquery`.
+TEXT_SEARCH_CONFIG = "simple"
+
+# Key in `Session.info` holding report IDs collected before a flush, for the hook that runs after it.
+_PENDING_KEY = "report_search_pending"
+
+# Key in `Session.info` accumulating the IDs of all reports changed (refreshed or deleted) by the flushes
+# of the current transaction. Consumed on commit by `api/cache.py` to invalidate cached representations.
+CHANGED_REPORTS_KEY = "report_search_changed"
+
+
+def _weighted(column, weight: str):
+    return func.setweight(
+        func.to_tsvector(TEXT_SEARCH_CONFIG, func.coalesce(column, "")), weight
+    )
+
+
+def report_search_select():
+    """Build a select producing one `report_search` row per report from the source tables.
+
+    Returns:
+        Select: The select statement, to be filtered by the caller. Column labels match the
+            column names of `models.ReportSearch`.
+    """
+    document = (
+        _weighted(models.Disease.disease_name, "A")
+        .op("||")(_weighted(models.Reporter.hospital_name, "B"))
+        .op("||")(_weighted(cast(models.Disease.symptoms, Text), "C"))
+        .op("||")(_weighted(models.Disease.lab_results, "D"))
+    )
+    patient_count = (
+        select(func.count())
+        .select_from(models.patient_reports)
+        .where(models.patient_reports.c.report_id == models.Report.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            models.Report.id.label("report_id"),
+            models.Report.status,
+            models.Report.created_at,
+            models.Report.updated_at,
+            models.Report.created_by,
+            models.Report.reporter_id,
+            models.Reporter.hospital_name,
+            models.Disease.disease_name,
+            models.Disease.disease_category,
+            models.Disease.severity_level,
+            models.Disease.treatment_status,
+            models.Disease.date_detected,
+            patient_count.label("patient_count"),
+            document.label("search_vector"),
+        )
+        .outerjoin(models.Disease, models.Disease.report_id == models.Report.id)
+        .outerjoin(models.Reporter, models.Reporter.id == models.Report.reporter_id)
+    )
+
+
+def sync_report_search(
+    connection: Connection,
+    report_ids: Iterable[int] = (),
+    reporter_ids: Iterable[int] = (),
+) -> List[int]:
+    """Upsert the `report_search` rows of the given reports from the source tables.
+
+    Rows of deleted reports are removed by the foreign key cascade, not by this function.
+
+    Args:
+        connection (Connection): Connection to execute on, normally `session.connection()`.
+        report_ids (Iterable[int]): IDs of reports to refresh.
+        reporter_ids (Iterable[int]): IDs of reporters whose reports should all be refreshed.
+
+    Returns:
+        List[int]: IDs of the reports whose rows were refreshed.
+    """
+    if connection.dialect.name != "postgresql":
+        return []
+
+    report_ids, reporter_ids = list(report_ids), list(reporter_ids)
+    if not report_ids and not reporter_ids:
+        return []
+
+    source = report_search_select().where(
+        or_(
+            models.Report.id.in_(report_ids),
+            models.Report.reporter_id.in_(reporter_ids),
+        )
+    )
+    columns = [column.name for column in source.selected_columns]
+    stmt = insert(models.ReportSearch).from_select(columns, source)
+    upsert = stmt.on_conflict_do_update(
+        index_elements=[models.ReportSearch.report_id],
+        set_={
+            **{name: stmt.excluded[name] for name in columns[1:]},
+            "version": models.ReportSearch.version + 1,
+            "modified_at": func.now(),
+        },
+    )
+    return list(
+        connection.execute(upsert.returning(models.ReportSearch.report_id)).scalars()
+    )
+
+
+def advance_report_versions(
+    connection: Connection,
+    report_ids: Iterable[int] = (),
+    reporter_ids: Iterable[int] = (),
+    patient_ids: Iterable[int] = (),
+    exclude: Iterable[int] = (),
+) -> List[Row]:
+    """Increment the `version` of reports whose children changed, and set their `updated_at`.
+
+    Args:
+        connection (Connection): Connection to execute on, normally `session.connection()`.
+        report_ids (Iterable[int]): IDs of reports to advance.
+        reporter_ids (Iterable[int]): IDs of reporters whose reports should all be advanced.
+        patient_ids (Iterable[int]): IDs of patients whose linked reports should all be advanced.
+        exclude (Iterable[int]): IDs of reports not to advance, as their version is already current.
+
+    Returns:
+        List[Row]: The `id`, `version`, and `updated_at` of every advanced report.
+    """
+    report_ids, reporter_ids, patient_ids = (
+        list(report_ids),
+        list(reporter_ids),
+        list(patient_ids),
+    )
+    if not report_ids and not reporter_ids and not patient_ids:
+        return []
+
+    linked = select(models.patient_reports.c.report_id).where(
+        models.patient_reports.c.patient_id.in_(patient_ids)
+    )
+    stmt = (
+        update(models.Report)
+        .where(
+            or_(
+                models.Report.id.in_(report_ids),
+                models.Report.reporter_id.in_(reporter_ids),
+                models.Report.id.in_(linked),
+            ),
+            models.Report.id.not_in(list(exclude)),
+        )
+        .values(version=models.Report.version + 1, updated_at=func.now())
+        .returning(models.Report.id, models.Report.version, models.Report.updated_at)
+    )
+    return connection.execute(stmt).all()
+
+
+def prefix_tsquery(text: str):
+    """Build a tsquery SQL expression where every term of `text` is prefix matched.
+
+    The text is tokenized by PostgreSQL itself (`to_tsvector`) rather than in Python, so the query terms
+    are always exactly the lexemes the search documents were built from, and tsquery operators typed by
+    the user are treated as plain text.
+
+    Example:
+        `"influ city"` becomes `'influ':* & 'city':*`.
+
+    Args:
+        text (str): Free text entered by the user.
+
+    Returns:
+        ColumnElement: The tsquery expression. NULL (matching nothing) if the text has no searchable terms.
+    """
+    lexeme = func.unnest(
+        func.tsvector_to_array(func.to_tsvector(TEXT_SEARCH_CONFIG, text))
+    ).column_valued("lexeme")
+    query_text = select(
+        func.string_agg(func.quote_literal(lexeme).concat(":*"), " & ")
+    ).scalar_subquery()
+    # Cast rather than `to_tsquery`, which would run the lexemes through the parser a second time and
+    # could split them differently (e.g. `467e133ca088` into `467e133 <-> ca088`).
+    return cast(query_text, TSQUERY)
+
+
+def _row_changed(obj) -> bool:
+    """Whether a column of `obj` changed, so that the flush updated its row (relationships alone do not)."""
+    state = inspect(obj)
+    return any(
+        state.attrs[column.key].history.has_changes()
+        for column in state.mapper.column_attrs
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_before_flush(session: Session, flush_context, instances) -> None:
+    # The flush removes a deleted patient's links, so its reports must be read while they still exist.
+    # A deleted reporter's reports are removed by the database cascade, unseen by the unit of work.
+    for obj in session.deleted:
+        if isinstance(obj, models.Patient):
+            session.info.setdefault(_PENDING_KEY, set()).update(
+                report.id for report in obj.reports
+            )
+        elif isinstance(obj, models.Reporter):
+            session.info.setdefault(CHANGED_REPORTS_KEY, set()).update(
+                report.id for report in obj.reports
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_after_flush(session: Session, flush_context) -> None:
+    # `new`, `dirty` and `deleted` still hold their pre-flush contents at this point.
+    report_ids: set[int] = session.info.pop(_PENDING_KEY, set())
+    reporter_ids: set[int] = set()
+    patient_ids: set[int] = set()
+    # Reports whose row this flush inserted or updated, which the ORM has versioned already.
+    versioned: set[int] = set()
+    deleted: set[int] = set()
+    changed: set[int] = session.info.setdefault(CHANGED_REPORTS_KEY, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, models.Report) and obj in session.deleted:
+            deleted.add(obj.id)
+        elif isinstance(obj, models.Report):
+            report_ids.add(obj.id)
+            if obj in session.new or _row_changed(obj):
+                versioned.add(obj.id)
+        elif isinstance(obj, models.Disease) and obj.report_id is not None:
+            report_ids.add(obj.report_id)
+        elif isinstance(obj, models.Reporter) and obj not in session.new:
+            reporter_ids.add(obj.id)
+        elif isinstance(obj, models.Patient) and obj in session.dirty:
+            patient_ids.add(obj.id)
+
+    # The children of a deleted report are deleted with it.
+    report_ids -= deleted
+    changed.update(deleted, report_ids)
+    connection = session.connection()
+    for report_id, version, updated_at in advance_report_versions(
+        connection, report_ids, reporter_ids, patient_ids, exclude=versioned | deleted
+    ):
+        changed.add(report_id)
+        # Keep loaded reports in step, or their next update would not match the version column.
+        report = session.identity_map.get(identity_key(models.Report, report_id))
+        if report is not None:
+            set_committed_value(report, "version", version)
+            set_committed_value(report, "updated_at", updated_at)
+    changed.update(sync_report_search(connection, report_ids, reporter_ids))
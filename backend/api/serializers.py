@@ -0,0 +1,151 @@
+"""
+Serializers
+
+This module holds the pre-built Pydantic `TypeAdapter`s of the hot response models, and the response class
+used by endpoints that build their JSON responses themselves.
+
+Endpoints declaring a `response_model` need neither: FastAPI validates their return value with the model and
+serializes it straight to JSON bytes in pydantic-core. Setting an app wide `default_response_class` would
+turn that off, replacing it by a conversion to Python objects followed by a second JSON encoding pass (see
+`benchmarks/serialization_benchmark.py`), so the app keeps FastAPI's default.
+
+The serializers below take the same path for the responses the API builds by hand (exports, cached
+representations): ORM objects are validated from their attributes and dumped to bytes in one call, instead
+of `model_dump()` into dictionaries re-encoded by the standard library `json` module.
+
+Sparse representations (`ReportFieldset`, the `fields` and `include` query parameters) are serialized with
+a model restricted to the requested fields, built on first use and cached.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter, create_model
+from pydantic_core import to_json
+
+from api import models, schemas
+from api.instrumentation import timed_serialization
+from api.queries import FULL_REPORT, ReportFieldset
+
+# Built once at import: building an adapter compiles the validator and serializer of the whole nested model.
+report_adapter: TypeAdapter[schemas.Report] = TypeAdapter(schemas.Report)
+report_list_adapter: TypeAdapter[List[schemas.Report]] = TypeAdapter(
+    List[schemas.Report]
+)
+
+
+def report_model(fieldset: ReportFieldset) -> Type[BaseModel]:
+    """Return the model serializing the given fields of a report.
+
+    Args:
+        fieldset (ReportFieldset): Requested fields.
+
+    Returns:
+        Type[BaseModel]: `schemas.Report` itself for the full fieldset, otherwise a model with only the
+            requested fields of `schemas.Report`, declared identically.
+    """
+    if fieldset.is_full:
+        return schemas.Report
+    return _sparse_adapters(fieldset)[0]
+
+
+@lru_cache(maxsize=None)
+def _sparse_adapters(
+    fieldset: ReportFieldset,
+) -> tuple[Type[BaseModel], TypeAdapter, TypeAdapter]:
+    # At most 2^3 scalar field sets times 2^3 relationship sets exist, so the cache stays small.
+    model = create_model(
+        "SparseReport",
+        __config__=schemas.Report.model_config,
+        **{
+            name: (schemas.Report.model_fields[name].annotation, field)
+            for name, field in schemas.Report.model_fields.items()
+            if name in fieldset.names
+        },
+    )
+    return model, TypeAdapter(model), TypeAdapter(List[model])
+
+
+@lru_cache(maxsize=None)
+def _batch_adapter(fieldset: ReportFieldset) -> TypeAdapter:
+    if fieldset.is_full:
+        return TypeAdapter(schemas.ReportBatch)
+    model = create_model(
+        "SparseReportBatch",
+        reports=(List[_sparse_adapters(fieldset)[0]], ...),
+        missing=(List[int], ...),
+    )
+    return TypeAdapter(model)
+
+
+def dump_report(report: models.Report, fieldset: ReportFieldset = FULL_REPORT) -> bytes:
+    """Serialize a report, with its reporter, disease, and patients, to JSON bytes.
+
+    Args:
+        report (models.Report): The report, with the fields of `fieldset` loaded.
+        fieldset (ReportFieldset): Fields to serialize. Defaults to all of them.
+
+    Returns:
+        bytes: The `schemas.Report` JSON representation, restricted to `fieldset`.
+    """
+    adapter = report_adapter if fieldset.is_full else _sparse_adapters(fieldset)[1]
+    with timed_serialization():
+        return adapter.dump_json(adapter.validate_python(report, from_attributes=True))
+
+
+def dump_reports(
+    reports: Iterable[models.Report], fieldset: ReportFieldset = FULL_REPORT
+) -> bytes:
+    """Serialize reports, with their reporter, disease, and patients, to a JSON array.
+
+    Args:
+        reports (Iterable[models.Report]): The reports, with the fields of `fieldset` loaded.
+        fieldset (ReportFieldset): Fields to serialize. Defaults to all of them.
+
+    Returns:
+        bytes: The JSON array of `schemas.Report` representations, restricted to `fieldset`.
+    """
+    adapter = report_list_adapter if fieldset.is_full else _sparse_adapters(fieldset)[2]
+    with timed_serialization():
+        return adapter.dump_json(
+            adapter.validate_python(list(reports), from_attributes=True)
+        )
+
+
+def dump_report_batch(
+    reports: List[models.Report],
+    missing: List[int],
+    fieldset: ReportFieldset = FULL_REPORT,
+) -> bytes:
+    """Serialize the result of a batch fetch (`schemas.ReportBatch`) to JSON bytes.
+
+    Args:
+        reports (List[models.Report]): The reports found, with the fields of `fieldset` loaded.
+        missing (List[int]): The requested IDs that were not found.
+        fieldset (ReportFieldset): Fields of the reports to serialize. Defaults to all of them.
+
+    Returns:
+        bytes: The `schemas.ReportBatch` JSON representation, with reports restricted to `fieldset`.
+    """
+    adapter = _batch_adapter(fieldset)
+    with timed_serialization():
+        return adapter.dump_json(
+            adapter.validate_python(
+                {"reports": reports, "missing": missing}, from_attributes=True
+            )
+        )
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core, accepting pre-serialized bytes.
+
+    Renders the same compact UTF-8 JSON as `JSONResponse`, and also encodes the types Pydantic models
+    contain (datetimes, dates, enums, models) without a `jsonable_encoder` pass. Bytes are sent unchanged.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        with timed_serialization():
+            return to_json(content)
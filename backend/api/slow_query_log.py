@@ -0,0 +1,184 @@
+"""
+Slow Query Log
+
+This module logs the SQL statements that take longer than `SLOW_QUERY_MS` milliseconds, as one JSON line
+on the `api.slow_queries` logger:
+
+    {"ms": 412.7, "route": "GET /api/reports/search", "endpoint": "search_reports",
+     "statement": "SELECT ...", "parameters": {"q_1": "str", "param_1": "int"}}
+
+Parameter values are never logged, only their shapes (type names, and lengths of lists), so the log
+holds no patient data and statements differing only by their values group together.
+
+A sampled subset of the slow statements (`SLOW_QUERY_EXPLAIN_RATE`, from 0 to 1) is run again under
+`EXPLAIN (ANALYZE, BUFFERS)`, and the entry is written, with the plan, to `SLOW_QUERY_EXPLAIN_PATH`, a
+local file rotated at 10 MB with 5 backups. Plans show where a query spends its time: sequential scans,
+row estimates far from the actual counts, buffers read from disk rather than found in shared memory.
+
+Only read-only statements (`SELECT`) are explained, as `ANALYZE` executes the statement. The plan is
+taken on the connection that ran the statement, in a savepoint, so that it sees the same data and never
+disturbs the transaction.
+
+Disabled unless `SLOW_QUERY_MS` is set. Installed on the application engine by `api/database.py`.
+"""
+
+import json
+import logging
+import os
+import random
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from api.instrumentation import current_metrics, route_template
+
+logger = logging.getLogger("api.slow_queries")
+
+SLOW_QUERY_MS: Optional[float] = (
+    float(os.environ["SLOW_QUERY_MS"]) if os.getenv("SLOW_QUERY_MS") else None
+)
+EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+EXPLAIN_PATH = os.getenv("SLOW_QUERY_EXPLAIN_PATH", "slow_query_plans.log")
+EXPLAIN_FILE_MAX_BYTES = 10 * 1024 * 1024
+EXPLAIN_FILE_BACKUPS = 5
+
+_START_KEY = "slow_query_start"
+
+
+def parameter_shape(parameters: Any) -> Any:
+    """Describe bound parameters without their values.
+
+    Args:
+        parameters: The parameters of a statement as passed to the DBAPI cursor: a dictionary, a
+            sequence, or a list of them for an `executemany`.
+
+    Returns:
+        The same structure with values replaced by their type names. Lists are described with their
+        length (`list[3]`), and `executemany` parameters as `{"rows": n, "each": <shape of the first>}`.
+    """
+    if isinstance(parameters, list) and parameters:
+        if isinstance(parameters[0], (dict, list, tuple)):
+            return {"rows": len(parameters), "each": parameter_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {name: _value_shape(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return _value_shape(parameters)
+
+
+def _value_shape(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, datetime):
+        return "datetime"
+    if isinstance(value, date):
+        return "date"
+    return type(value).__name__
+
+
+def _request() -> tuple[Optional[str], Optional[str]]:
+    """The route (`METHOD /template`) and endpoint function name of the current request."""
+    metrics = current_metrics()
+    if metrics is None or metrics.scope is None:
+        return None, None
+    scope = metrics.scope
+    template = route_template(scope)
+    endpoint = scope.get("endpoint")
+    return (
+        f"{scope['method']} {template}" if template else None,
+        getattr(endpoint, "__name__", None),
+    )
+
+
+@lru_cache(maxsize=None)
+def _plan_logger(path: str) -> logging.Logger:
+    # Created on the first plan, so that no file is created while nothing is slow.
+    plan_logger = logging.getLogger(f"api.slow_queries.plans.{path}")
+    handler = RotatingFileHandler(
+        path, maxBytes=EXPLAIN_FILE_MAX_BYTES, backupCount=EXPLAIN_FILE_BACKUPS
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    plan_logger.addHandler(handler)
+    plan_logger.setLevel(logging.INFO)
+    plan_logger.propagate = False
+    return plan_logger
+
+
+def explain(dbapi_connection, statement: str, parameters: Any) -> Optional[str]:
+    """Return the `EXPLAIN (ANALYZE, BUFFERS)` plan of a statement, in text format.
+
+    Args:
+        dbapi_connection: The DBAPI (psycopg2) connection the statement was executed on.
+        statement (str): The statement, with DBAPI placeholders.
+        parameters: Its bound parameters.
+
+    Returns:
+        str | None: The plan, or None if it could not be taken.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) " + statement, parameters
+            )
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            logger.warning("Could not explain slow query", exc_info=True)
+            return None
+        cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    finally:
+        cursor.close()
+
+
+def log_slow_queries(engine: Engine) -> None:
+    """Log the statements of `engine` slower than `SLOW_QUERY_MS`, explaining a sample of them.
+
+    Args:
+        engine (Engine): The engine to watch.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info[_START_KEY].pop()) * 1000
+        if SLOW_QUERY_MS is None or elapsed_ms < SLOW_QUERY_MS:
+            return
+        route, endpoint = _request()
+        entry = {
+            "ms": round(elapsed_ms, 2),
+            "route": route,
+            "endpoint": endpoint,
+            "statement": statement,
+            "parameters": parameter_shape(parameters),
+        }
+        logger.warning(json.dumps(entry))
+
+        if (
+            executemany
+            or conn.dialect.name != "postgresql"
+            or not statement.lstrip().upper().startswith("SELECT")
+            or random.random() >= EXPLAIN_RATE
+        ):
+            return
+        plan = explain(conn.connection.dbapi_connection, statement, parameters)
+        if plan is not None:
+            _plan_logger(EXPLAIN_PATH).info(json.dumps({**entry, "plan": plan}))
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        starts = context.connection.info.get(_START_KEY) if context.connection else None
+        if starts:
+            starts.pop()
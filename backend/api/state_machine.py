@@ -0,0 +1,258 @@
+"""
+Report State Machine
+
+This module defines the allowed transitions between report states (`ReportStateEnum`), who may perform
+them, and applies them to many reports at once.
+
+Transitions:
+- Draft -> Submitted: any user. The report becomes read-only.
+- Submitted -> Under Review: seniors only.
+- Submitted -> Approved: seniors only (the review step is optional).
+- Under Review -> Approved: seniors only.
+- Under Review -> Submitted: seniors only, handing the report back to the review queue.
+- Under Review -> Draft: seniors only, returning the report to its author for changes.
+
+Approved reports are final.
+
+`transition_reports` applies one transition to a set of reports with a single conditional
+`UPDATE ... WHERE status IN (<allowed sources>) RETURNING`, so that reports changed concurrently by
+another request are never moved from a state they are no longer in, and writes one audit entry per
+moved report in the same transaction. Moving a report releases any review queue claim on it (see
+`api/review_queue.py`).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from api import models
+from api.audit_log import log_audit_events
+from api.enums import ReportStateEnum, TransitionOutcomeEnum, UserRoleEnum
+from api.metrics import count_transitions
+from api.search_index import CHANGED_REPORTS_KEY, sync_report_search
+
+
+@dataclass(frozen=True)
+class Transition:
+    """An allowed move of a report from one state to another.
+
+    Attributes:
+        source (ReportStateEnum): State the report must be in.
+        target (ReportStateEnum): State the report is moved to.
+        roles (FrozenSet[UserRoleEnum]): Roles of the users allowed to perform it.
+    """
+
+    source: ReportStateEnum
+    target: ReportStateEnum
+    roles: FrozenSet[UserRoleEnum]
+
+
+ANY_ROLE = frozenset(UserRoleEnum)
+SENIOR_ONLY = frozenset({UserRoleEnum.senior})
+
+TRANSITIONS = (
+    Transition(ReportStateEnum.draft, ReportStateEnum.submitted, ANY_ROLE),
+    Transition(ReportStateEnum.submitted, ReportStateEnum.under_review, SENIOR_ONLY),
+    Transition(ReportStateEnum.submitted, ReportStateEnum.approved, SENIOR_ONLY),
+    Transition(ReportStateEnum.under_review, ReportStateEnum.approved, SENIOR_ONLY),
+    Transition(ReportStateEnum.under_review, ReportStateEnum.submitted, SENIOR_ONLY),
+    Transition(ReportStateEnum.under_review, ReportStateEnum.draft, SENIOR_ONLY),
+)
+
+
+@dataclass(frozen=True)
+class TransitionResult:
+    """Outcome of a transition for one report.
+
+    Attributes:
+        id (int): ID of the report.
+        outcome (TransitionOutcomeEnum): Whether the report was moved, and why not.
+        status (ReportStateEnum | None): State of the report after the transition, or None if it does
+            not exist.
+    """
+
+    id: int
+    outcome: TransitionOutcomeEnum
+    status: ReportStateEnum | None
+
+
+def allowed_sources(
+    target: ReportStateEnum, role: UserRoleEnum
+) -> FrozenSet[ReportStateEnum]:
+    """Return the states from which a user with `role` may move reports to `target`.
+
+    Args:
+        target (ReportStateEnum): State to move reports to.
+        role (UserRoleEnum): Role of the user.
+
+    Returns:
+        FrozenSet[ReportStateEnum]: The allowed source states, empty if the user may not move any report
+            to `target`.
+    """
+    return frozenset(
+        transition.source
+        for transition in TRANSITIONS
+        if transition.target == target and role in transition.roles
+    )
+
+
+def can_transition(
+    source: ReportStateEnum, target: ReportStateEnum, role: UserRoleEnum
+) -> bool:
+    """Return whether a user with `role` may move a report from `source` to `target`."""
+    return source in allowed_sources(target, role)
+
+
+def check_transition(
+    source: ReportStateEnum, target: ReportStateEnum, role: UserRoleEnum
+) -> None:
+    """Check that a user with `role` may move a report from `source` to `target`.
+
+    Args:
+        source (ReportStateEnum): Current state of the report.
+        target (ReportStateEnum): State to move the report to.
+        role (UserRoleEnum): Role of the user.
+
+    Raises:
+        ValueError: If no transition leads from `source` to `target`.
+        PermissionError: If the transition exists, but not for `role`.
+    """
+    if can_transition(source, target, role):
+        return
+    if any(
+        transition.source == source and transition.target == target
+        for transition in TRANSITIONS
+    ):
+        raise PermissionError(
+            f"Role '{role.value}' may not move reports from '{source.value}' to '{target.value}'"
+        )
+    raise ValueError(f"Reports cannot move from '{source.value}' to '{target.value}'")
+
+
+def transition_reports(
+    db: Session,
+    report_ids: Iterable[int],
+    target: ReportStateEnum,
+    user: models.User,
+) -> List[TransitionResult]:
+    """Move reports to `target`, where the state machine and the user's role allow it.
+
+    Runs one `UPDATE` for the reports in an allowed source state, one `SELECT` for the states of the
+    others, and one batched `INSERT` of the audit entries (action `UPDATE`, with the previous and new
+    status as changes). The `report_search` rows of the moved reports are refreshed, and their cached
+    representations invalidated on commit. The caller commits.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        report_ids (Iterable[int]): IDs of the reports to move. Duplicates are processed once.
+        target (ReportStateEnum): State to move the reports to.
+        user (models.User): User performing the transition.
+
+    Raises:
+        PermissionError: If the user's role may not move any report to `target`.
+
+    Returns:
+        List[TransitionResult]: One result per distinct report ID, in request order.
+    """
+    report_ids = list(dict.fromkeys(report_ids))
+    sources = allowed_sources(target, user.role)
+    if not sources:
+        raise PermissionError(
+            f"Role '{user.role.value}' may not move reports to '{target.value}'"
+        )
+
+    # The previous status is read in the same statement, from the rows locked by the update.
+    previous = (
+        select(models.Report.id, models.Report.status)
+        .where(models.Report.id.in_(report_ids), models.Report.status.in_(sources))
+        .with_for_update()
+        .subquery()
+    )
+    statement = (
+        update(models.Report.__table__)
+        .where(models.Report.id == previous.c.id)
+        .values(
+            status=target,
+            updated_at=func.now(),
+            version=models.Report.version + 1,
+            claimed_by=None,
+            claim_expires_at=None,
+        )
+        .returning(models.Report.id, previous.c.status)
+    )
+    # Executed on the connection: the session's bulk update hooks would clear the whole report cache,
+    # where only the moved reports need invalidating.
+    moved: Dict[int, ReportStateEnum] = dict(db.connection().execute(statement).all())
+    record_transitions(db, moved, target, user)
+
+    others = [report_id for report_id in report_ids if report_id not in moved]
+    current: Dict[int, ReportStateEnum] = {}
+    if others:
+        current = dict(
+            db.execute(
+                select(models.Report.id, models.Report.status).where(
+                    models.Report.id.in_(others)
+                )
+            ).all()
+        )
+
+    results = []
+    for report_id in report_ids:
+        if report_id in moved:
+            results.append(
+                TransitionResult(report_id, TransitionOutcomeEnum.transitioned, target)
+            )
+        elif report_id in current:
+            results.append(
+                TransitionResult(
+                    report_id, TransitionOutcomeEnum.not_allowed, current[report_id]
+                )
+            )
+        else:
+            results.append(
+                TransitionResult(report_id, TransitionOutcomeEnum.not_found, None)
+            )
+    return results
+
+
+def record_transitions(
+    db: Session,
+    moved: Dict[int, ReportStateEnum],
+    target: ReportStateEnum,
+    user: models.User,
+    **changes,
+) -> None:
+    """Record reports moved by a statement executed outside the ORM unit of work.
+
+    Refreshes their `report_search` rows, marks them for cache invalidation and counting in the
+    `report_transitions_total` metric on commit, and writes one audit entry per report (action `UPDATE`)
+    with its previous and new status.
+
+    Args:
+        db (Session): SQLAlchemy database session the statement was executed in.
+        moved (Dict[int, ReportStateEnum]): Previous status of each moved report, by ID.
+        target (ReportStateEnum): Status the reports were moved to.
+        user (models.User): User who moved them.
+        **changes: Other changes to record in every audit entry.
+    """
+    if not moved:
+        return
+    db.info.setdefault(CHANGED_REPORTS_KEY, set()).update(
+        sync_report_search(db.connection(), moved)
+    )
+    count_transitions(db, target, len(moved))
+    log_audit_events(
+        db,
+        user.id,
+        "UPDATE",
+        "Report",
+        {
+            report_id: {
+                "status": {"from": source.value, "to": target.value},
+                **changes,
+            }
+            for report_id, source in moved.items()
+        },
+    )
@@ -0,0 +1,26 @@
+"""Benchmarks for the Disease Outbreak Reporting System backend.
+
+Benchmarks are standalone scripts, run from the `backend/` directory with `python -m benchmarks.<name>`.
+Those that need a database read `BENCHMARK_DATABASE_URL`, which must point at a dedicated, migrated
+database (`DATABASE_URL=<benchmark url> alembic upgrade head`), never at the development database.
+"""
+
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+
+def benchmark_engine() -> Engine:
+    """Create an engine for the benchmark database.
+
+    Raises:
+        ValueError: If `BENCHMARK_DATABASE_URL` is not set.
+
+    Returns:
+        Engine: SQLAlchemy engine bound to the benchmark database.
+    """
+    url = os.getenv("BENCHMARK_DATABASE_URL")
+    if not url:
+        raise ValueError("BENCHMARK_DATABASE_URL environment variable is not set.")
+    return create_engine(url, future=True)
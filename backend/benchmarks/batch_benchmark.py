@@ -0,0 +1,123 @@
+"""
+Batch Fetch Benchmark
+
+Compares fetching N reports by ID with N sequential `GET /api/reports/{id}` requests against one
+`POST /api/reports/batch` request, for several N. Requests go through the whole application (routing,
+validation, loading, serialization) in process with a `TestClient`, with `get_db` pointed at the benchmark
+database, so the timings leave out the network but include every per-request cost a client pays N times.
+
+For each N the benchmark reports the median wall time of both ways, and the number of SQL statements each
+runs. The report cache is cleared before every run so that both load from the database.
+
+Usage (from `backend/`):
+
+    BENCHMARK_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.batch_benchmark --sizes 1 10 100
+
+Reports are seeded as by the loader benchmark, and removed afterwards unless `--keep` is given.
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.cache import report_cache
+from api.dependencies import get_db
+from api.main import app
+from benchmarks import benchmark_engine
+from benchmarks.loader_benchmark import cleanup, first_report_id, seed
+
+
+def time_requests(send: Callable[[], None], runs: int) -> float:
+    """Median wall time in milliseconds of `runs` calls of `send()`, each with an empty report cache."""
+    timings = []
+    for _ in range(runs):
+        report_cache.clear()
+        start = time.perf_counter()
+        send()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def count_statements(engine, send: Callable[[], None]) -> int:
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    report_cache.clear()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        send()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(executed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--patients", type=int, default=3, help="Patients per report.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="Keep seeded rows.")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse kept rows.")
+    args = parser.parse_args()
+
+    engine = benchmark_engine()
+    if not args.skip_seed:
+        with engine.connect() as connection:
+            cleanup(connection)
+            seed(connection, max(args.sizes), args.patients)
+
+    BenchmarkSession = sessionmaker(bind=engine)
+
+    def benchmark_db():
+        with BenchmarkSession() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = benchmark_db
+    with Session(engine) as session:
+        first_id = first_report_id(session)
+
+    print(
+        f"{'reports':>8}  {'requests':<22}{'median ms':>10}{'statements':>12}{'speedup':>9}"
+    )
+    try:
+        with TestClient(app) as client:
+            for size in args.sizes:
+                ids: List[int] = list(range(first_id, first_id + size))
+
+                def sequential():
+                    for report_id in ids:
+                        client.get(f"/api/reports/{report_id}").raise_for_status()
+
+                def batch():
+                    client.post(
+                        "/api/reports/batch", json={"ids": ids}
+                    ).raise_for_status()
+
+                baseline = None
+                for name, send in (
+                    (f"{size} x GET", sequential),
+                    ("1 x POST batch", batch),
+                ):
+                    median = time_requests(send, args.runs)
+                    statements = count_statements(engine, send)
+                    baseline = baseline or median
+                    print(
+                        f"{size:>8}  {name:<22}{median:>10.1f}{statements:>12}"
+                        f"{baseline / median:>8.1f}x"
+                    )
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        if not args.keep:
+            with engine.connect() as connection:
+                cleanup(connection)
+
+
+if __name__ == "__main__":
+    main()
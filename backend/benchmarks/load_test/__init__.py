@@ -0,0 +1,26 @@
+"""
+Load Test
+
+Drives the application with concurrent virtual users following the frontend's flows, and reports the
+throughput and latency percentiles of every endpoint:
+
+- Clinicians (`--clinicians`) log in, then repeatedly create a draft report, attach a reporter, a
+  disease, and new patients to it, and submit it, pausing between steps (`--think-time`).
+- Dashboard users (`--dashboards`) log in, then poll the report list, the statistics, and a search
+  every `--poll-interval` seconds.
+
+The application runs in process (the default: requests go through the ASGI app without a network), in
+`--uvicorn` worker processes started on a local port, or is any server already running at `--url`. In
+process and under `--uvicorn`, the application uses `BENCHMARK_DATABASE_URL`.
+
+Virtual users log in as the users of `benchmarks.synthetic_data`, which must have been loaded first:
+
+    BENCHMARK_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.synthetic_data --truncate
+    BENCHMARK_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.load_test --duration 60
+
+Give it the same `--reports` (and `--users`, `--reporters`, `--hospitals`, if they were overridden) as the
+dataset, from which it derives who to log in as and which reporters to attach.
+
+Results are saved as JSON under `load_test_results/`, named after the current commit, and
+`--compare <results.json>` prints the change of every endpoint against an earlier run.
+"""
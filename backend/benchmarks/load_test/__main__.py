@@ -0,0 +1,240 @@
+"""Command line entry point of the load test: `python -m benchmarks.load_test --help`."""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import partial
+from typing import AsyncIterator
+
+import httpx
+
+from benchmarks.load_test import __doc__ as package_doc
+from benchmarks.load_test.results import (
+    RESULTS_DIRECTORY,
+    Recorder,
+    current_commit,
+    format_comparison,
+    format_results,
+    save,
+)
+from benchmarks.load_test.scenarios import (
+    VirtualUser,
+    clinician_workflow,
+    dashboard_poll,
+    run_scenario,
+)
+from benchmarks.synthetic_data import DatasetSpec
+
+SERVER_START_TIMEOUT = 30
+
+
+@asynccontextmanager
+async def in_process_client(connections: int) -> AsyncIterator[httpx.AsyncClient]:
+    """Client sending requests straight to the ASGI app, with its lifespan running."""
+    # Imported here, after `DATABASE_URL` is pointed at the benchmark database.
+    from api.main import app
+
+    # One log line per request would cost more than some of the requests themselves.
+    logging.getLogger("api.requests").disabled = True
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://load-test",
+            limits=httpx.Limits(max_connections=connections),
+            timeout=60,
+        ) as client:
+            yield client
+
+
+@asynccontextmanager
+async def server_client(url: str, connections: int) -> AsyncIterator[httpx.AsyncClient]:
+    async with httpx.AsyncClient(
+        base_url=url, limits=httpx.Limits(max_connections=connections), timeout=60
+    ) as client:
+        yield client
+
+
+@asynccontextmanager
+async def uvicorn_client(
+    workers: int, port: int, connections: int
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Client of a uvicorn server started for the run, with its output in the results directory."""
+    os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+    log_path = os.path.join(RESULTS_DIRECTORY, "uvicorn.log")
+    with open(log_path, "w") as log:
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "api.main:app",
+                "--port",
+                str(port),
+                "--workers",
+                str(workers),
+                "--no-access-log",
+            ],
+            stdout=log,
+            stderr=log,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}"
+            async with server_client(url, connections) as client:
+                deadline = time.perf_counter() + SERVER_START_TIMEOUT
+                while True:
+                    try:
+                        (await client.get("/openapi.json")).raise_for_status()
+                        break
+                    except httpx.HTTPError:
+                        if server.poll() is not None or time.perf_counter() > deadline:
+                            raise RuntimeError(f"uvicorn did not start, see {log_path}")
+                        await asyncio.sleep(0.2)
+                yield client
+        finally:
+            server.terminate()
+            server.wait()
+
+
+async def run(args: argparse.Namespace, spec: DatasetSpec) -> dict:
+    """Run the virtual users for `args.duration` seconds, and return the results."""
+    connections = args.clinicians + args.dashboards
+    if args.url:
+        client_context = server_client(args.url, connections)
+    elif args.uvicorn:
+        client_context = uvicorn_client(args.uvicorn, args.port, connections)
+    else:
+        client_context = in_process_client(connections)
+
+    recorder = Recorder()
+    async with client_context as client:
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        deadline = start + args.duration
+        tasks = []
+        for index in range(args.clinicians):
+            user = VirtualUser(
+                client,
+                recorder,
+                random.Random(f"{args.seed}/clinician/{index}"),
+                deadline,
+                args.think_time,
+            )
+            tasks.append(
+                run_scenario(
+                    user,
+                    {"user": index % spec.users, "password": spec.password},
+                    "clinician_workflow",
+                    partial(clinician_workflow, user, spec),
+                )
+            )
+        for index in range(args.dashboards):
+            user = VirtualUser(
+                client,
+                recorder,
+                random.Random(f"{args.seed}/dashboard/{index}"),
+                deadline,
+                args.poll_interval,
+            )
+            tasks.append(
+                run_scenario(
+                    user,
+                    {
+                        "user": (args.clinicians + index) % spec.users,
+                        "password": spec.password,
+                    },
+                    "dashboard_poll",
+                    partial(dashboard_poll, user),
+                )
+            )
+        await asyncio.gather(*tasks)
+        duration = time.perf_counter() - start
+
+    return {
+        "commit": current_commit(),
+        "started_at": started_at.isoformat(),
+        "target": args.url or (f"uvicorn x{args.uvicorn}" if args.uvicorn else "asgi"),
+        "config": {
+            "clinicians": args.clinicians,
+            "dashboards": args.dashboards,
+            "think_time": args.think_time,
+            "poll_interval": args.poll_interval,
+            "seed": args.seed,
+        },
+        "duration_s": round(duration, 2),
+        **recorder.summary(duration),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=package_doc.strip().split("\n\n")[0],
+        epilog="See the docstring of benchmarks/load_test/__init__.py.",
+    )
+    defaults = DatasetSpec()
+    parser.add_argument("--clinicians", type=int, default=20)
+    parser.add_argument("--dashboards", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=60, help="Seconds.")
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=1.0,
+        help="Mean pause of clinicians between steps, in seconds.",
+    )
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--uvicorn",
+        type=int,
+        default=0,
+        metavar="WORKERS",
+        help="Run the application in a local uvicorn server with this many workers.",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="Load test a server already running here.")
+    parser.add_argument(
+        "--reports",
+        type=int,
+        default=defaults.reports,
+        help="Reports of the synthetic dataset, from which the numbers of users, reporters, and "
+        "hospitals follow, as when it was generated.",
+    )
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--reporters", type=int)
+    parser.add_argument("--hospitals", type=int)
+    parser.add_argument("--password", default=defaults.password)
+    parser.add_argument("--output-dir", default=RESULTS_DIRECTORY)
+    parser.add_argument("--compare", help="Results file of an earlier run.")
+    args = parser.parse_args()
+
+    if not args.url:
+        url = os.getenv("BENCHMARK_DATABASE_URL")
+        if not url:
+            raise ValueError("BENCHMARK_DATABASE_URL environment variable is not set.")
+        # Read by `api.database` when the engine is created, here or in uvicorn.
+        os.environ["DATABASE_URL"] = url
+
+    spec = DatasetSpec.scaled(
+        args.reports,
+        users=args.users,
+        reporters=args.reporters,
+        hospitals=args.hospitals,
+        password=args.password,
+    )
+    results = asyncio.run(run(args, spec))
+    print(format_results(results))
+    print(f"Saved {save(results, args.output_dir)}")
+    if args.compare:
+        with open(args.compare) as file:
+            print(format_comparison(results, json.load(file)))
+
+
+if __name__ == "__main__":
+    main()
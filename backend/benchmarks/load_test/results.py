@@ -0,0 +1,155 @@
+"""
+Load Test Results
+
+Collects the latency of every request, by endpoint, and summarizes a run as JSON:
+
+    {"commit": "1a2b3c4", "config": {...}, "duration_s": 60.0,
+     "scenarios": {"clinician_workflow": 212, "dashboard_poll": 1170},
+     "endpoints": {"GET /api/statistics": {"requests": 1170, "errors": 0, "throughput_rps": 19.5,
+                                           "mean_ms": 20.4, "p50_ms": 18.1, ..., "max_ms": 95.2}, ...}}
+
+Endpoints are named by method and route template, so that requests for different reports add up.
+"""
+
+import json
+import os
+import subprocess
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+PERCENTILES = (50, 90, 95, 99)
+
+RESULTS_DIRECTORY = "load_test_results"
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+class Recorder:
+    """Latencies and errors of the requests of a run, by endpoint, and completed scenario iterations."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.scenarios: Dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.latencies[endpoint].append(seconds * 1000)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def completed(self, scenario: str) -> None:
+        self.scenarios[scenario] += 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        """Throughput and latency statistics of every endpoint, and of all requests together.
+
+        Args:
+            duration (float): Length of the measured run, in seconds.
+
+        Returns:
+            Dict[str, Any]: The `endpoints` and `scenarios` parts of the results.
+        """
+        endpoints = {
+            endpoint: _statistics(latencies, self.errors[endpoint], duration)
+            for endpoint, latencies in sorted(self.latencies.items())
+        }
+        every_request = [
+            ms for latencies in self.latencies.values() for ms in latencies
+        ]
+        if every_request:
+            endpoints["all"] = _statistics(
+                every_request, sum(self.errors.values()), duration
+            )
+        return {"scenarios": dict(self.scenarios), "endpoints": endpoints}
+
+
+def _statistics(latencies: List[float], errors: int, duration: float) -> Dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / duration, 2),
+        "mean_ms": round(sum(ordered) / len(ordered), 2),
+        **{f"p{p}_ms": round(percentile(ordered, p), 2) for p in PERCENTILES},
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+def current_commit() -> Optional[str]:
+    """Short hash of the checked out commit, suffixed with `-dirty` if the tree has changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def save(results: Dict[str, Any], directory: str = RESULTS_DIRECTORY) -> str:
+    """Write results to `<directory>/<commit>-<UTC time>.json`, and return the path."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(directory, f"{results.get('commit') or 'unknown'}-{stamp}.json")
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+    return path
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    """Table of the endpoints' request counts, throughput, and latency percentiles."""
+    header = f"{'endpoint':<48}{'requests':>9}{'errors':>7}{'rps':>8}" + "".join(
+        f"{f'p{p} ms':>9}" for p in PERCENTILES
+    )
+    lines = [header]
+    for endpoint, stats in results["endpoints"].items():
+        lines.append(
+            f"{endpoint:<48}{stats['requests']:>9}{stats['errors']:>7}"
+            f"{stats['throughput_rps']:>8.1f}"
+            + "".join(f"{stats[f'p{p}_ms']:>9.1f}" for p in PERCENTILES)
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(results: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+    """Table of the change of every endpoint's throughput and p50 and p95 latencies against a baseline.
+
+    Throughputs only compare between runs with the same virtual users and think times.
+    """
+    lines = [
+        f"Against {baseline.get('commit')} ({baseline.get('started_at')}):",
+        f"{'endpoint':<48}{'rps':>9}{'p50':>9}{'p95':>9}",
+    ]
+    for endpoint, stats in results["endpoints"].items():
+        before = baseline["endpoints"].get(endpoint)
+        if before is None:
+            lines.append(f"{endpoint:<48}{'new':>9}")
+            continue
+        lines.append(
+            f"{endpoint:<48}"
+            + "".join(
+                f"{_change(stats[key], before[key]):>9}"
+                for key in ("throughput_rps", "p50_ms", "p95_ms")
+            )
+        )
+    return "\n".join(lines)
+
+
+def _change(value: float, before: float) -> str:
+    if not before:
+        return "-"
+    return f"{(value - before) / before:+.0%}"
@@ -0,0 +1,245 @@
+"""
+Load Test Scenarios
+
+The flows of the frontend, as run by one virtual user. Each scenario logs in, then repeats its iteration
+until the run's deadline. A request with an unexpected status ends the iteration (it is counted as an
+error of its endpoint), and the next one starts after a pause.
+"""
+
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from api.enums import DiseaseCategoryEnum, SeverityLevelEnum
+from benchmarks.load_test.results import Recorder
+from benchmarks.synthetic_data import (
+    DISEASES,
+    FIRST_NAMES,
+    LAST_NAMES,
+    SEVERITIES,
+    DatasetSpec,
+    hospital_name,
+    user_email,
+)
+
+
+class RequestFailed(Exception):
+    """A request of a scenario returned an unexpected status."""
+
+
+class VirtualUser:
+    """An authenticated client of the application, recording the latency of its requests.
+
+    Args:
+        client (httpx.AsyncClient): Client sending the requests.
+        recorder (Recorder): Where request latencies are recorded.
+        rng (random.Random): The user's own random generator.
+        deadline (float): `time.perf_counter()` value at which the user stops.
+        think_time (float): Mean pause between steps, in seconds.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        rng: random.Random,
+        deadline: float,
+        think_time: float,
+    ) -> None:
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.deadline = deadline
+        self.think_time = think_time
+        self.headers: Dict[str, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return time.perf_counter() < self.deadline
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        path: Optional[str] = None,
+        expected: int = 200,
+        **kwargs,
+    ) -> Any:
+        """Send a request, record its latency under `endpoint`, and return its JSON body.
+
+        Args:
+            method (str): HTTP method.
+            endpoint (str): Route template the request is recorded under, e.g. `/api/reports/{report_id}`.
+            path (str | None): Request path, if it differs from `endpoint`.
+            expected (int): Expected status code.
+            **kwargs: Passed to `httpx.AsyncClient.request`.
+
+        Raises:
+            RequestFailed: If the response does not have the expected status.
+        """
+        start = time.perf_counter()
+        response = await self.client.request(
+            method, path or endpoint, headers=self.headers, **kwargs
+        )
+        ok = response.status_code == expected
+        self.recorder.record(f"{method} {endpoint}", time.perf_counter() - start, ok)
+        if not ok:
+            raise RequestFailed(f"{method} {path or endpoint}: {response.status_code}")
+        return response.json()
+
+    async def think(self, mean: Optional[float] = None) -> None:
+        """Pause for an exponentially distributed time, as a person between two actions."""
+        mean = self.think_time if mean is None else mean
+        if mean > 0:
+            await asyncio.sleep(
+                min(self.rng.expovariate(1 / mean), self.deadline - time.perf_counter())
+            )
+
+    async def login(self, user: int, password: str) -> None:
+        body = await self.request(
+            "POST",
+            "/api/auth/login",
+            json={"email": user_email(user), "password": password},
+        )
+        self.headers = {"Authorization": f"Bearer {body['access_token']}"}
+
+
+def disease_payload(rng: random.Random) -> Dict[str, Any]:
+    name, category, symptoms, _ = rng.choices(
+        DISEASES, [weight for *_, weight in DISEASES]
+    )[0]
+    return {
+        "disease_name": name,
+        "disease_category": DiseaseCategoryEnum[category].value,
+        "date_detected": (date.today() - timedelta(days=rng.randint(0, 3))).isoformat(),
+        "symptoms": rng.sample(symptoms, rng.randint(1, len(symptoms))),
+        "severity_level": SeverityLevelEnum[rng.choices(*SEVERITIES)[0]].value,
+        "lab_results": f"Sample positive for {name}",
+        "treatment_status": "Ongoing",
+    }
+
+
+def patient_payload(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "first_name": rng.choice(FIRST_NAMES),
+        "last_name": rng.choice(LAST_NAMES),
+        "date_of_birth": (
+            date.today() - timedelta(days=rng.randrange(365 * 95))
+        ).isoformat(),
+        "gender": rng.choice(["Male", "Female"]),
+        "medical_record_number": f"LOAD-{rng.getrandbits(48):012x}",
+        "patient_address": f"{rng.randint(1, 400)} {rng.choice(LAST_NAMES)} Street",
+    }
+
+
+def reporter_payload(spec: DatasetSpec, reporter: int) -> Dict[str, Any]:
+    """Details of a synthetic reporter, the same every time it is sent."""
+    rng = random.Random(f"{spec.seed}/load-test-reporter/{reporter}")
+    hospital = reporter % spec.hospitals
+    return {
+        "first_name": rng.choice(FIRST_NAMES),
+        "last_name": rng.choice(LAST_NAMES),
+        "email": f"synthetic-reporter-{reporter}@example.com",
+        "job_title": "Doctor",
+        "phone_number": "+447911123456",
+        "hospital_name": hospital_name(hospital),
+        "hospital_address": f"{hospital + 1} Hospital Road, City {hospital % 50}",
+    }
+
+
+async def clinician_workflow(user: VirtualUser, spec: DatasetSpec) -> None:
+    """Create and submit a report, as on the frontend's new report page.
+
+    Args:
+        user (VirtualUser): Logged in virtual user.
+        spec (DatasetSpec): Sizes of the synthetic dataset: the clinician reports as one of its
+            reporters.
+    """
+    rng = user.rng
+    report = await user.request(
+        "POST", "/api/reports/", json={"status": "Draft"}, expected=201
+    )
+    path = f"/api/reports/{report['id']}"
+    await user.think()
+
+    # The reporter's details are sent again with every report, and update the existing reporter.
+    await user.request(
+        "POST",
+        "/api/reports/{report_id}/reporter",
+        f"{path}/reporter",
+        json=reporter_payload(spec, rng.randrange(spec.reporters)),
+        expected=201,
+    )
+    await user.think()
+
+    await user.request(
+        "POST",
+        "/api/reports/{report_id}/disease",
+        f"{path}/disease",
+        json=disease_payload(rng),
+        expected=201,
+    )
+    await user.think()
+
+    patient_ids = []
+    for _ in range(rng.choices([1, 2, 3, 4], [45, 30, 15, 10])[0]):
+        patient = await user.request(
+            "POST", "/api/reports/patient", json=patient_payload(rng), expected=201
+        )
+        patient_ids.append(patient["id"])
+        await user.think()
+    await user.request(
+        "POST",
+        "/api/reports/{report_id}/patient",
+        f"{path}/patient",
+        json={"patient_ids": patient_ids},
+        expected=201,
+    )
+    await user.think()
+
+    await user.request(
+        "PUT", "/api/reports/{report_id}", path, json={"status": "Submitted"}
+    )
+
+
+async def dashboard_poll(user: VirtualUser) -> None:
+    """Refresh the dashboard: the report list, the statistics, and a search."""
+    await user.request("GET", "/api/reports/", params={"limit": 20})
+    await user.request("GET", "/api/statistics")
+    name = user.rng.choice(DISEASES)[0]
+    await user.request(
+        "GET", "/api/reports/search", params={"q": name.split()[0], "limit": 20}
+    )
+
+
+async def run_scenario(
+    user: VirtualUser,
+    login: Dict[str, Any],
+    name: str,
+    iteration: Callable[[], Awaitable[None]],
+) -> None:
+    """Log in, then run iterations of a scenario until the deadline, pausing between them.
+
+    Args:
+        user (VirtualUser): The virtual user.
+        login (Dict[str, Any]): Arguments of `VirtualUser.login`.
+        name (str): Name of the scenario, under which completed iterations are counted.
+        iteration (Callable[[], Awaitable[None]]): Runs one iteration.
+    """
+    # Users start over the first think time, not all at once.
+    await user.think()
+    try:
+        await user.login(**login)
+    except RequestFailed:
+        return
+    while user.running:
+        try:
+            await iteration()
+            user.recorder.completed(name)
+        except RequestFailed:
+            pass
+        await user.think()
@@ -0,0 +1,225 @@
+"""
+Loader Benchmark
+
+Compares the report loader policies of `api/queries.py` on pages of reports that each have many patients:
+
+- `joined/joined`: every relationship joined eagerly, the loading `list_reports` used originally. The
+  patients join returns one row per patient, repeating the report, reporter, and disease columns, and
+  `LIMIT` forces a subquery around the paginated reports.
+- `joined/selectin`: the default policy. Patients are loaded by one extra `IN` query for the whole page.
+- `joined/subquery`: patients loaded by one extra query re-running the page query as a subquery.
+
+For each policy the benchmark reports the median wall time of loading one page, the number of SQL
+statements, the number of rows fetched, and the number of bytes fetched. Bytes are the size of the result
+values as text, which tracks what is sent over the wire from the database.
+
+Usage (from `backend/`):
+
+    BENCHMARK_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.loader_benchmark --patients 50
+
+Seeded rows are removed afterwards unless `--keep` is given, and `--skip-seed` reuses kept rows.
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import Connection, event, text
+from sqlalchemy.orm import Session
+
+from api import models
+from api.queries import LoaderPolicy, report_details
+from benchmarks import benchmark_engine
+
+BENCHMARK_EMAIL = "loader-benchmark@example.com"
+
+REPORTERS = 20
+
+POLICIES = [
+    LoaderPolicy(scalar="joined", collection="joined"),
+    LoaderPolicy(scalar="joined", collection="selectin"),
+    LoaderPolicy(scalar="joined", collection="subquery"),
+]
+
+
+def seed(connection: Connection, reports: int, patients: int) -> None:
+    """Insert `reports` reports over `REPORTERS` reporters, each with a disease and `patients` patients."""
+    user_id = connection.execute(
+        text(
+            "INSERT INTO users (email, hashed_password, full_name, is_active, role) "
+            "VALUES (:email, 'not-a-hash', 'Loader Benchmark', true, 'senior') RETURNING id"
+        ),
+        {"email": BENCHMARK_EMAIL},
+    ).scalar_one()
+    connection.execute(
+        text(
+            "INSERT INTO reporters (first_name, last_name, email, job_title, phone_number, "
+            "hospital_name, hospital_address) "
+            "SELECT 'Reporter', 'Benchmark', 'loader-benchmark-' || g || '@example.com', 'Epidemiologist', "
+            "'+440000000000', 'General Hospital ' || g, g || ' Benchmark Street' "
+            "FROM generate_series(1, :n) AS g"
+        ),
+        {"n": REPORTERS},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO reports (status, created_by, reporter_id) "
+            "SELECT 'draft'::reportstateenum, :user_id, r.first_id + g % :reporters "
+            "FROM generate_series(1, :n) AS g, "
+            "(SELECT min(id) AS first_id FROM reporters WHERE email LIKE 'loader-benchmark-%') AS r"
+        ),
+        {"n": reports, "reporters": REPORTERS, "user_id": user_id},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO diseases (disease_name, disease_category, date_detected, symptoms, severity_level, "
+            "lab_results, treatment_status, report_id) "
+            "SELECT 'Influenza', 'viral'::diseasecategoryenum, current_date, "
+            '\'["fever", "cough", "headache"]\'::json, \'high\'::severitylevelenum, '
+            "'Sample ' || id || ' positive for influenza A', 'ongoing'::treatmentstatusenum, id "
+            "FROM reports WHERE created_by = :user_id"
+        ),
+        {"user_id": user_id},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO patients (first_name, last_name, date_of_birth, gender, medical_record_number, "
+            "patient_address, emergency_contact) "
+            "SELECT 'Patient', 'Benchmark ' || g, date '1980-01-01' + g % 10000, 'female'::genderenum, "
+            "'loader-benchmark-' || g, g || ' Benchmark Road', 'Next of kin, +440000000000' "
+            "FROM generate_series(1, :n) AS g"
+        ),
+        {"n": reports * patients},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO patient_reports (patient_id, report_id) "
+            "SELECT p.id, r.ids[1 + (p.id - p_min.id) / :patients] "
+            "FROM patients p, "
+            "(SELECT min(id) AS id FROM patients WHERE medical_record_number LIKE 'loader-benchmark-%') p_min, "
+            "(SELECT array_agg(id ORDER BY id) AS ids FROM reports WHERE created_by = :user_id) r "
+            "WHERE p.medical_record_number LIKE 'loader-benchmark-%'"
+        ),
+        {"patients": patients, "user_id": user_id},
+    )
+    connection.commit()
+    for table in ("reporters", "reports", "diseases", "patients", "patient_reports"):
+        connection.execute(text(f"ANALYZE {table}"))
+
+
+def cleanup(connection: Connection) -> None:
+    """Remove all seeded rows. Reports, diseases, and patient links are removed by cascade."""
+    connection.execute(
+        text("DELETE FROM reporters WHERE email LIKE 'loader-benchmark-%'")
+    )
+    connection.execute(
+        text(
+            "DELETE FROM patients WHERE medical_record_number LIKE 'loader-benchmark-%'"
+        )
+    )
+    connection.execute(
+        text("DELETE FROM users WHERE email = :email"), {"email": BENCHMARK_EMAIL}
+    )
+    connection.commit()
+
+
+def first_report_id(session: Session) -> int:
+    return session.execute(
+        text(
+            "SELECT min(r.id) FROM reports r JOIN users u ON u.id = r.created_by "
+            "WHERE u.email = :email"
+        ),
+        {"email": BENCHMARK_EMAIL},
+    ).scalar_one()
+
+
+def measure_transfer(session: Session, load) -> tuple[int, int, int]:
+    """Run `load()` once and return the statements, rows, and bytes it fetched from the database."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        load()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    session.rollback()
+
+    # Re-run the captured statements on a raw DBAPI cursor to size their results.
+    rows = size = 0
+    cursor = session.connection().connection.cursor()
+    for statement, parameters in executed:
+        cursor.execute(statement, parameters)
+        for row in cursor.fetchall():
+            rows += 1
+            size += sum(len(str(value)) for value in row if value is not None)
+    cursor.close()
+    session.rollback()
+    return len(executed), rows, size
+
+
+def time_load(session: Session, load, runs: int) -> float:
+    """Median wall time in milliseconds of `runs` executions of `load()`, each in a fresh session state."""
+    timings = []
+    for _ in range(runs):
+        session.expunge_all()
+        start = time.perf_counter()
+        load()
+        timings.append((time.perf_counter() - start) * 1000)
+        session.rollback()
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reports", type=int, default=2_000)
+    parser.add_argument("--patients", type=int, default=50, help="Patients per report.")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="Keep seeded rows.")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse kept rows.")
+    args = parser.parse_args()
+
+    engine = benchmark_engine()
+    if not args.skip_seed:
+        with engine.connect() as connection:
+            cleanup(connection)
+            start = time.perf_counter()
+            seed(connection, args.reports, args.patients)
+            print(
+                f"Seeded {args.reports} reports with {args.patients} patients each "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+    print(f"{'policy':<20}{'median ms':>10}{'statements':>12}{'rows':>10}{'bytes':>12}")
+    with Session(engine) as session:
+        # Same query as `list_reports`, but starting at the first seeded report, whatever else the
+        # database holds.
+        first_id = first_report_id(session)
+        session.rollback()
+        for policy in POLICIES:
+
+            def load():
+                return (
+                    report_details(session, policy)
+                    .filter(models.Report.id >= first_id)
+                    .order_by(models.Report.id)
+                    .limit(args.page_size)
+                    .all()
+                )
+
+            median = time_load(session, load, args.runs)
+            statements, rows, size = measure_transfer(session, load)
+            name = f"{policy.scalar}/{policy.collection}"
+            print(f"{name:<20}{median:>10.1f}{statements:>12}{rows:>10}{size:>12}")
+
+    if not args.keep:
+        with engine.connect() as connection:
+            cleanup(connection)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Microbenchmarks
+
+Times the hot paths every request, or every large response, goes through, and compares them with the
+baselines stored in `benchmarks/baselines/microbenchmarks.json`:
+
+- `create_access_token`, and `decode_access_token` (the token check of `get_current_user`).
+- `hash_password` and `verify_password` (bcrypt, deliberately slow: a regression here is a change of
+  cost factor).
+- Validation of 100 nested ORM reports into `schemas.Report` models, and their serialization to JSON.
+- The CSV export writer, on 1,000 reports.
+- `get_statistics`, on the benchmark database (skipped unless `BENCHMARK_DATABASE_URL` is set).
+
+Each benchmark is timed `timeit` style, in runs of as many calls as take at least 0.2 seconds. Times
+are per call.
+
+Baselines only compare on similar machines, and a shared or throttled machine changes speed from one
+second to the next. So every run of a benchmark is preceded by a run of a fixed pure Python loop (the
+calibration), and the benchmark is measured relative to it: a slow moment of the machine slows both.
+The benchmarks are run in `--repeats` rounds, each timing every benchmark once, and compared with
+their baselines by the median of their relative times over the rounds, which a few disturbed runs do
+not move. `get_statistics` depends on the data: it is only compared with a baseline taken on a
+database with the same number of reports.
+
+Even so, take the baselines on the machine the comparisons run on (`--update`), and compare on an
+otherwise idle machine.
+
+Usage (from `backend/`):
+
+    python -m benchmarks.microbenchmarks                    # compare with the baselines
+    python -m benchmarks.microbenchmarks --tolerance 0.1    # fail beyond a 10% slowdown (default 25%)
+    python -m benchmarks.microbenchmarks --update           # store the results as the new baselines
+
+Exits with status 1 if a benchmark is slower than its baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from statistics import median
+from typing import Callable, Dict, List, Optional, Tuple
+
+from api import schemas
+from api.serializers import report_list_adapter
+from benchmarks.serialization_benchmark import build_reports
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(__file__), "baselines", "microbenchmarks.json"
+)
+
+MIN_RUN_SECONDS = 0.2
+
+
+@dataclass
+class Benchmark:
+    """A function to time, and the data it runs on.
+
+    Attributes:
+        name (str): Name the benchmark is reported and stored under.
+        setup (Callable[[], Optional[Callable[[], object]]]): Prepares the benchmark and returns the
+            function to time, or None to skip it.
+        dataset (Callable[[], object] | None): Returns a description of the data the benchmark runs on,
+            stored with its baseline: results only compare with a baseline on the same data.
+    """
+
+    name: str
+    setup: Callable[[], Optional[Callable[[], object]]]
+    dataset: Optional[Callable[[], object]] = None
+
+
+def calibration() -> int:
+    """A fixed amount of pure Python work, timed to compare the speed of two machines."""
+    total = 0
+    for index in range(20_000):
+        total += index * index % 7
+    return total
+
+
+def setup_create_access_token():
+    from api.endpoints.auth import create_access_token
+
+    return lambda: create_access_token({"sub": "benchmark@example.com"})
+
+
+def setup_decode_access_token():
+    from api.dependencies import decode_access_token
+    from api.endpoints.auth import create_access_token
+
+    token = create_access_token({"sub": "benchmark@example.com"})
+    return lambda: decode_access_token(token)
+
+
+def setup_hash_password():
+    from api.endpoints.auth import hash_password
+
+    return lambda: hash_password("benchmark-password")
+
+
+def setup_verify_password():
+    from api.endpoints.auth import hash_password, verify_password
+
+    hashed = hash_password("benchmark-password")
+    return lambda: verify_password("benchmark-password", hashed)
+
+
+def setup_validate_reports():
+    reports = build_reports(100, 3)
+    return lambda: report_list_adapter.validate_python(reports, from_attributes=True)
+
+
+def setup_serialize_reports():
+    validated: List[schemas.Report] = report_list_adapter.validate_python(
+        build_reports(100, 3), from_attributes=True
+    )
+    return lambda: report_list_adapter.dump_json(validated)
+
+
+def setup_csv_export():
+    from api.endpoints.export import write_csv
+
+    reports = build_reports(1000, 3)
+    return lambda: write_csv(reports)
+
+
+def _benchmark_session():
+    from sqlalchemy.orm import Session
+
+    from benchmarks import benchmark_engine
+
+    if not os.getenv("BENCHMARK_DATABASE_URL"):
+        return None
+    return Session(benchmark_engine())
+
+
+def setup_statistics():
+    from api.endpoints.statistics import get_statistics
+
+    session = _benchmark_session()
+    if session is None:
+        return None
+    return lambda: get_statistics(db=session, _=None)
+
+
+def statistics_dataset():
+    from sqlalchemy import func, select
+
+    from api import models
+
+    session = _benchmark_session()
+    if session is None:
+        return None
+    with session:
+        return {"reports": session.scalar(select(func.count(models.Report.id)))}
+
+
+BENCHMARKS = [
+    Benchmark("create_access_token", setup_create_access_token),
+    Benchmark("decode_access_token", setup_decode_access_token),
+    Benchmark("hash_password", setup_hash_password),
+    Benchmark("verify_password", setup_verify_password),
+    Benchmark("validate_100_reports", setup_validate_reports),
+    Benchmark("serialize_100_reports", setup_serialize_reports),
+    Benchmark("csv_export_1000_reports", setup_csv_export),
+    Benchmark("get_statistics", setup_statistics, statistics_dataset),
+]
+
+
+def prepare(function: Callable[[], object]) -> Tuple[timeit.Timer, int]:
+    """A timer of `function`, and the number of calls of a run: enough to last 0.2s."""
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    if elapsed < MIN_RUN_SECONDS:
+        number = max(1, int(number * MIN_RUN_SECONDS / max(elapsed, 1e-9)))
+    return timer, number
+
+
+def time_run(timer: timeit.Timer, number: int) -> float:
+    """Seconds per call of one run of `number` calls."""
+    return timer.timeit(number) / number
+
+
+def run(names: List[str], repeats: int) -> Dict:
+    """Run the selected benchmarks, and return their results, in the format of the baselines file.
+
+    Each benchmark's entry has its median time per call (`seconds`), and its median time relative to
+    the calibration run before it (`relative`), over `repeats` rounds.
+    """
+    results: Dict = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": f"{platform.machine()} {platform.processor() or platform.system()}",
+        "python": platform.python_version(),
+        "benchmarks": {},
+    }
+    selected = []
+    for benchmark in BENCHMARKS:
+        if names and benchmark.name not in names:
+            continue
+        function = benchmark.setup()
+        if function is None:
+            print(f"{benchmark.name}: skipped")
+            continue
+        selected.append((benchmark, prepare(function)))
+
+    reference = prepare(calibration)
+    calibrations: List[float] = []
+    samples: Dict[str, List[Tuple[float, float]]] = {b.name: [] for b, _ in selected}
+    # Interleaved, so that a slow moment of the machine disturbs one run of every benchmark rather
+    # than every run of one.
+    for _ in range(repeats):
+        for benchmark, timer in selected:
+            calibration_s = time_run(*reference)
+            seconds = time_run(*timer)
+            calibrations.append(calibration_s)
+            samples[benchmark.name].append((seconds, seconds / calibration_s))
+
+    for benchmark, _ in selected:
+        entry = {
+            "seconds": median(seconds for seconds, _ in samples[benchmark.name]),
+            "relative": median(relative for _, relative in samples[benchmark.name]),
+        }
+        if benchmark.dataset is not None:
+            entry["dataset"] = benchmark.dataset()
+        results["benchmarks"][benchmark.name] = entry
+    results["calibration_s"] = median(calibrations or [time_run(*reference)])
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Print every benchmark against its baseline, and return the names of those that regressed.
+
+    Benchmarks are compared by their times relative to the calibration. The baseline time printed is
+    the baseline's relative time on this run's calibration.
+    """
+    scale = results["calibration_s"] / baseline["calibration_s"]
+    print(f"Machine speed against the baseline's: {1 / scale:.2f}x")
+    print(f"{'benchmark':<28}{'time':>12}{'baseline':>12}{'change':>9}")
+    regressions = []
+    for name, entry in results["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        line = f"{name:<28}{_format_seconds(entry['seconds']):>12}"
+        if before is None or "relative" not in before:
+            print(f"{line}{'none':>12}")
+            continue
+        if before.get("dataset") != entry.get("dataset"):
+            print(f"{line}{'other data':>12}")
+            continue
+        expected = before["relative"] * results["calibration_s"]
+        change = entry["relative"] / before["relative"] - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{line}{_format_seconds(expected):>12}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, factor in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help=f"Benchmarks to run (default: all): {', '.join(b.name for b in BENCHMARKS)}.",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=15,
+        help="Rounds of runs of every benchmark (default: 15).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Slowdown beyond which a benchmark fails, as a fraction (default: 0.25).",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Store the results as the baselines of the benchmarks run.",
+    )
+    args = parser.parse_args()
+
+    results = run(args.names, args.repeats)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    if args.update:
+        if baseline is not None and args.names:
+            # Keep the baselines of the benchmarks not run, rescaled to this machine.
+            scale = results["calibration_s"] / baseline["calibration_s"]
+            for name, entry in baseline["benchmarks"].items():
+                if name not in results["benchmarks"]:
+                    entry["seconds"] *= scale
+                    results["benchmarks"][name] = entry
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+        print(f"Stored {len(results['benchmarks'])} baselines in {args.baseline}")
+        return
+
+    if baseline is None:
+        sys.exit(f"No baselines in {args.baseline}: run with --update first.")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        sys.exit(
+            f"Slower than their baseline by more than {args.tolerance:.0%}: "
+            + ", ".join(regressions)
+        )
+
+
+if __name__ == "__main__":
+    main()
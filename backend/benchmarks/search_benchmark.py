@@ -0,0 +1,220 @@
+"""
+Search Benchmark
+
+Compares the report search strategies on a large synthetic dataset:
+
+- `ilike (joined)`: the original `ILIKE '%term%'` query, joining `reports` to `diseases` or `reporters`,
+  with index scans disabled, i.e. the plan the search endpoint had before this search subsystem existed.
+- `ilike (report_search)`: the same filter on the denormalized `report_search` table, which uses the
+  `pg_trgm` GIN indexes when the server has the extension.
+- `full text`: the ranked, prefix matched `q=` query on `report_search.search_vector`.
+
+Usage (from `backend/`):
+
+    BENCHMARK_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.search_benchmark --reports 1000000
+
+Seeding is done server side with `generate_series` and takes one to two minutes per million reports.
+Seeded rows are removed afterwards unless `--keep` is given, and `--skip-seed` reuses kept rows.
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import Connection, func, insert, text
+from sqlalchemy.orm import Session
+
+from api import models
+from api.search_index import prefix_tsquery, report_search_select
+from benchmarks import benchmark_engine
+
+BENCHMARK_EMAIL = "search-benchmark@example.com"
+
+DISEASE_NAMES = [
+    "Influenza",
+    "Cholera",
+    "Measles",
+    "Malaria",
+    "Dengue",
+    "Tuberculosis",
+    "Ebola",
+    "Typhoid",
+    "Mpox",
+    "Rubella",
+]
+
+
+def seed(connection: Connection, reports: int, reporters: int) -> None:
+    """Insert `reports` reports, each with a disease, spread over `reporters` reporters."""
+    user_id = connection.execute(
+        text(
+            "INSERT INTO users (email, hashed_password, full_name, is_active, role) "
+            "VALUES (:email, 'not-a-hash', 'Search Benchmark', true, 'senior') RETURNING id"
+        ),
+        {"email": BENCHMARK_EMAIL},
+    ).scalar_one()
+    connection.execute(
+        text(
+            "INSERT INTO reporters (first_name, last_name, email, job_title, phone_number, "
+            "hospital_name, hospital_address) "
+            "SELECT 'Reporter', 'Benchmark', 'search-benchmark-' || g || '@example.com', 'Epidemiologist', "
+            "'+440000000000', (ARRAY['St Mary', 'Royal Infirmary', 'General', 'Memorial', 'University'])[1 + g % 5] "
+            "|| ' Hospital ' || g, g || ' Benchmark Street' FROM generate_series(1, :n) AS g"
+        ),
+        {"n": reporters},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO reports (status, created_by, reporter_id, created_at) "
+            "SELECT (ARRAY['draft', 'submitted', 'under_review', 'approved'])[1 + g % 4]::reportstateenum, "
+            ":user_id, r.first_id + g % :reporters, now() - g * interval '1 minute' "
+            "FROM generate_series(1, :n) AS g, "
+            "(SELECT min(id) AS first_id FROM reporters WHERE email LIKE 'search-benchmark-%') AS r"
+        ),
+        {"n": reports, "reporters": reporters, "user_id": user_id},
+    )
+    connection.execute(
+        text(
+            "INSERT INTO diseases (disease_name, disease_category, date_detected, symptoms, severity_level, "
+            "lab_results, treatment_status, report_id) "
+            "SELECT (:names)[1 + id % 10] || ' ' || (id % 97), "
+            "(ARRAY['bacterial', 'viral', 'parasitic', 'other'])[1 + id % 4]::diseasecategoryenum, "
+            'current_date - (id % 365), \'["fever", "cough"]\'::json, '
+            "(ARRAY['low', 'medium', 'high', 'critical'])[1 + id % 4]::severitylevelenum, "
+            "'Sample ' || id || ' positive', 'ongoing'::treatmentstatusenum, id "
+            "FROM reports WHERE created_by = :user_id"
+        ),
+        {"names": DISEASE_NAMES, "user_id": user_id},
+    )
+
+    source = report_search_select().where(models.Report.created_by == user_id)
+    connection.execute(
+        insert(models.ReportSearch).from_select(
+            [column.name for column in source.selected_columns], source
+        )
+    )
+    connection.commit()
+    for table in ("users", "reporters", "reports", "diseases", "report_search"):
+        connection.execute(text(f"ANALYZE {table}"))
+
+
+def cleanup(connection: Connection) -> None:
+    """Remove all seeded rows. Reports and diseases are removed by cascade."""
+    connection.execute(
+        text("DELETE FROM reporters WHERE email LIKE 'search-benchmark-%'")
+    )
+    connection.execute(
+        text("DELETE FROM users WHERE email = :email"), {"email": BENCHMARK_EMAIL}
+    )
+    connection.commit()
+
+
+def joined_ilike_query(session: Session, column, substring: str, limit: int):
+    return (
+        session.query(models.Report.id)
+        .join(column.class_)
+        .filter(column.ilike(f"%{substring}%"))
+        .order_by(models.Report.id)
+        .limit(limit)
+    )
+
+
+def report_search_ilike_query(session: Session, column, substring: str, limit: int):
+    return (
+        session.query(models.ReportSearch.report_id)
+        .filter(column.ilike(f"%{substring}%"))
+        .order_by(models.ReportSearch.report_id)
+        .limit(limit)
+    )
+
+
+def full_text_query(session: Session, q: str, limit: int):
+    ts_query = prefix_tsquery(q)
+    return (
+        session.query(models.ReportSearch.report_id)
+        .filter(models.ReportSearch.search_vector.op("@@")(ts_query))
+        .order_by(
+            func.ts_rank_cd(models.ReportSearch.search_vector, ts_query).desc(),
+            models.ReportSearch.report_id,
+        )
+        .limit(limit)
+    )
+
+
+def time_query(session: Session, build, runs: int, settings: tuple = ()) -> float:
+    """Median wall time in milliseconds of `runs` executions of the query returned by `build()`."""
+    timings = []
+    for _ in range(runs):
+        for setting in settings:
+            session.execute(text(f"SET LOCAL {setting}"))
+        start = time.perf_counter()
+        build().all()
+        timings.append((time.perf_counter() - start) * 1000)
+        session.rollback()
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--reporters", type=int, default=2_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Keep seeded rows.")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse kept rows.")
+    args = parser.parse_args()
+
+    engine = benchmark_engine()
+    if not args.skip_seed:
+        with engine.connect() as connection:
+            cleanup(connection)
+            start = time.perf_counter()
+            seed(connection, args.reports, args.reporters)
+            print(
+                f"Seeded {args.reports} reports in {time.perf_counter() - start:.1f}s"
+            )
+
+    # A selective term (one hospital) and a broad one (a tenth of all diseases).
+    cases = [
+        (
+            models.Reporter.hospital_name,
+            models.ReportSearch.hospital_name,
+            "Hospital 1234",
+        ),
+        (models.Disease.disease_name, models.ReportSearch.disease_name, "Cholera"),
+    ]
+    print(f"{'query':<24}{'term':<20}{'median ms':>10}")
+    with Session(engine) as session:
+        for source_column, search_column, term in cases:
+            results = {
+                "ilike (joined)": time_query(
+                    session,
+                    lambda: joined_ilike_query(
+                        session, source_column, term, args.limit
+                    ),
+                    args.runs,
+                    ("enable_indexscan = off", "enable_bitmapscan = off"),
+                ),
+                "ilike (report_search)": time_query(
+                    session,
+                    lambda: report_search_ilike_query(
+                        session, search_column, term, args.limit
+                    ),
+                    args.runs,
+                ),
+                "full text": time_query(
+                    session,
+                    lambda: full_text_query(session, term, args.limit),
+                    args.runs,
+                ),
+            }
+            for name, median in results.items():
+                print(f"{name:<24}{term:<20}{median:>10.1f}")
+
+    if not args.keep:
+        with engine.connect() as connection:
+            cleanup(connection)
+
+
+if __name__ == "__main__":
+    main()
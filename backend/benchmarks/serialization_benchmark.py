@@ -0,0 +1,183 @@
+"""
+Serialization Benchmark
+
+Measures the serialization of lists of nested reports (`schemas.Report`, with reporter, disease, and
+patients) from ORM objects to JSON bytes, as the API does for list pages and exports. Serialization has
+two steps, timed separately:
+
+- Validation of the ORM objects into response models (`from_attributes`), common to all paths.
+- Encoding of the validated models to JSON bytes:
+    - `stdlib json`: `model_dump(mode="json")` per report, then `json.dumps`, i.e. the original export
+      path and what `JSONResponse` does with the dictionaries it is given.
+    - `response class`: `dump_python(mode="json")` by a `TypeAdapter`, then `FastJSONResponse` rendering.
+      This is what every `response_model` endpoint would do if an app wide `default_response_class` were
+      set.
+    - `orjson`: the same with `orjson.dumps` (the `ORJSONResponse` rendering), if orjson is installed.
+    - `dump_json`: straight to bytes by the pre-built `TypeAdapter` of `api/serializers.py`, the path
+      FastAPI takes for `response_model` endpoints by default.
+
+`dump_reports` is both steps as the API runs them. No database is needed: reports are built in memory as
+transient ORM objects, so only serialization is measured.
+
+Usage (from `backend/`):
+
+    python -m benchmarks.serialization_benchmark --reports 1000 10000
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, List
+
+from api import models, schemas
+from api.enums import (
+    DiseaseCategoryEnum,
+    GenderEnum,
+    ReportStateEnum,
+    SeverityLevelEnum,
+    TreatmentStatusEnum,
+)
+from api.serializers import FastJSONResponse, dump_reports, report_list_adapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def build_reports(count: int, patients: int) -> List[models.Report]:
+    """Build `count` transient reports, each with a reporter, a disease, and `patients` patients."""
+    now = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+    reporters = [
+        models.Reporter(
+            id=index,
+            first_name="Reporter",
+            last_name=f"Benchmark {index}",
+            email=f"reporter-{index}@example.com",
+            job_title="Epidemiologist",
+            phone_number="+440000000000",
+            hospital_name=f"General Hospital {index}",
+            hospital_address=f"{index} Benchmark Street",
+            registration_date=now,
+        )
+        for index in range(20)
+    ]
+    reports = []
+    for index in range(count):
+        report = models.Report(
+            id=index,
+            status=ReportStateEnum.submitted,
+            created_at=now,
+            updated_at=now,
+            version=1,
+            created_by=1,
+        )
+        report.reporter = reporters[index % len(reporters)]
+        report.disease = models.Disease(
+            id=index,
+            disease_name="Influenza",
+            disease_category=DiseaseCategoryEnum.viral,
+            date_detected=date(2024, 2, 1),
+            symptoms=["fever", "cough", "headache"],
+            severity_level=SeverityLevelEnum.high,
+            lab_results=f"Sample {index} positive for influenza A",
+            treatment_status=TreatmentStatusEnum.ongoing,
+            version=1,
+        )
+        report.patients = [
+            models.Patient(
+                id=index * patients + offset,
+                first_name="Patient",
+                last_name=f"Benchmark {offset}",
+                date_of_birth=date(1980, 1, 1),
+                gender=GenderEnum.female,
+                medical_record_number=f"MRN-{index}-{offset}",
+                patient_address=f"{offset} Benchmark Road",
+                emergency_contact="Next of kin, +440000000000",
+            )
+            for offset in range(patients)
+        ]
+        reports.append(report)
+    return reports
+
+
+def validate(reports: List[models.Report]) -> List[schemas.Report]:
+    return report_list_adapter.validate_python(reports, from_attributes=True)
+
+
+def stdlib_json(validated: List[schemas.Report]) -> bytes:
+    data = [report.model_dump(mode="json") for report in validated]
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def response_class(validated: List[schemas.Report]) -> bytes:
+    data = report_list_adapter.dump_python(validated, mode="json")
+    return FastJSONResponse(data).body
+
+
+def orjson_dumps(validated: List[schemas.Report]) -> bytes:
+    return orjson.dumps(report_list_adapter.dump_python(validated, mode="json"))
+
+
+def dump_json(validated: List[schemas.Report]) -> bytes:
+    return report_list_adapter.dump_json(validated)
+
+
+ENCODERS: List[tuple[str, Callable[[List[schemas.Report]], bytes]]] = [
+    ("stdlib json", stdlib_json),
+    ("response class", response_class),
+    ("orjson", orjson_dumps),
+    ("dump_json", dump_json),
+]
+
+
+def median_ms(function: Callable, argument, runs: int) -> tuple[float, object]:
+    """Median wall time in milliseconds of `runs` calls of `function(argument)`, and the last result.
+
+    The garbage collector is paused while timing, as `timeit` does, so that collections triggered by
+    earlier runs do not land in later ones.
+    """
+    timings = []
+    for _ in range(runs):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = function(argument)
+            timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reports", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--patients", type=int, default=3, help="Patients per report.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'reports':>8}  {'step':<24}{'median ms':>10}{'MB':>8}{'speedup':>9}")
+    for count in args.reports:
+        reports = build_reports(count, args.patients)
+        median, validated = median_ms(validate, reports, args.runs)
+        print(f"{count:>8}  {'validate (from ORM)':<24}{median:>10.1f}")
+        baseline = None
+        for name, encoder in ENCODERS:
+            if encoder is orjson_dumps and orjson is None:
+                continue
+            median, output = median_ms(encoder, validated, args.runs)
+            baseline = baseline or median
+            print(
+                f"{count:>8}  {'encode: ' + name:<24}{median:>10.1f}"
+                f"{len(output) / 1e6:>8.2f}{baseline / median:>8.1f}x"
+            )
+        median, _ = median_ms(dump_reports, reports, args.runs)
+        print(f"{count:>8}  {'dump_reports (total)':<24}{median:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
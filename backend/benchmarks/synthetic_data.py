@@ -0,0 +1,797 @@
+"""
+Synthetic Data Generator
+
+Fills the benchmark database with a large, realistic dataset for load tests and benchmarks: users,
+reporters, patients, reports, their diseases and patient links, the audit entries their history would
+have written, and their `report_search` rows.
+
+Distributions:
+
+- Outbreak time clustering: `--outbreak-share` of the reports belong to one of `--outbreaks` outbreaks.
+  An outbreak has a disease, a handful of hospitals, and a peak date; its reports are normally
+  distributed around the peak (standard deviation up to `--outbreak-days`). The other reports are
+  spread uniformly over the `--days` before `--end-date`, with endemic diseases.
+- Hospital skew: reporters are spread evenly over `--hospitals` hospitals, but reports come from them
+  following a Zipf law of exponent `--hospital-skew` (0 for uniform): a few large hospitals report
+  most cases.
+- Patients per report: Poisson distributed with mean `--patients-per-report`, at least one, at most
+  `--max-patients-per-report`, drawn from the `--patients` patients.
+- Statuses follow age: most reports older than a month are approved, recent ones are spread over the
+  workflow. Each report has a `CREATE` audit entry and one `UPDATE` entry per transition it went through.
+
+The numbers of users, reporters, hospitals, and patients follow `--reports` (see `PER_REPORT`: 1,000 users,
+20,000 reporters, 500 hospitals, and 2,000,000 patients per million reports); `--users`, `--reporters`,
+`--hospitals`, and `--patients` override them.
+
+Rows are generated in fixed-size chunks, each from its own random generator seeded by `--seed`, the
+table, and the chunk number, and loaded with `COPY` by `--workers` processes, one transaction per chunk.
+The same seed, sizes, and end date produce the same rows whatever the number of workers. IDs are
+allocated after the largest existing ones; `--truncate` empties the tables first, so that they start
+at 1. Audit entry IDs are left to their sequence, so their order depends on the load.
+
+Every user can log in with `--password`, as `synthetic-user-<n>@example.com` (every fifth user,
+starting with the first, is a senior).
+
+Usage (from `backend/`):
+
+    BENCHMARK_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.synthetic_data --reports 5000000
+
+A chunk of 10,000 reports, with its diseases, links, and audit entries, takes about 3 seconds of CPU,
+shared between its worker and the database server: loads scale with the number of cores.
+"""
+
+import argparse
+import bisect
+import csv
+import io
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
+
+from api import models
+from api.search_index import report_search_select
+from benchmarks import benchmark_engine
+
+# Rows per chunk. Part of the seed: changing it changes the generated rows.
+CHUNK_SIZE = 10_000
+
+SENIOR_EVERY = 5
+
+# Rows of the tables referenced by reports, per report, unless their number is given.
+PER_REPORT = {
+    "users": 0.001,
+    "reporters": 0.02,
+    "hospitals": 0.0005,
+    "patients": 2.0,
+}
+
+FIRST_NAMES = [
+    "Olivia",
+    "Amelia",
+    "Isla",
+    "Ava",
+    "Mia",
+    "Noah",
+    "Oliver",
+    "George",
+    "Leo",
+    "Arthur",
+    "Aisha",
+    "Mohammed",
+    "Priya",
+    "Chen",
+    "Sofia",
+    "Kwame",
+]
+LAST_NAMES = [
+    "Smith",
+    "Jones",
+    "Taylor",
+    "Brown",
+    "Williams",
+    "Wilson",
+    "Johnson",
+    "Davies",
+    "Patel",
+    "Khan",
+    "Nguyen",
+    "Okafor",
+    "Evans",
+    "Thomas",
+    "Roberts",
+    "Walker",
+]
+HOSPITAL_NAMES = [
+    "St Mary",
+    "Royal Infirmary",
+    "General",
+    "Memorial",
+    "University",
+    "Children's",
+    "Princess Alexandra",
+    "Queen Elizabeth",
+]
+JOB_TITLES = ["Epidemiologist", "Doctor", "Nurse", "Microbiologist", "Pharmacist"]
+
+# Disease name, category, symptoms, and weight among endemic (non-outbreak) reports.
+DISEASES = [
+    ("Influenza", "viral", ["fever", "cough", "sore throat", "fatigue"], 30),
+    ("COVID-19", "viral", ["fever", "cough", "loss of smell", "fatigue"], 20),
+    ("Norovirus", "viral", ["vomiting", "diarrhoea", "nausea"], 12),
+    ("Measles", "viral", ["fever", "rash", "cough", "conjunctivitis"], 4),
+    ("Dengue", "viral", ["fever", "headache", "joint pain", "rash"], 3),
+    ("Mpox", "viral", ["fever", "rash", "swollen lymph nodes"], 2),
+    ("Salmonellosis", "bacterial", ["diarrhoea", "fever", "abdominal cramps"], 8),
+    ("Tuberculosis", "bacterial", ["cough", "night sweats", "weight loss"], 6),
+    ("Cholera", "bacterial", ["diarrhoea", "vomiting", "dehydration"], 2),
+    ("Legionnaires' disease", "bacterial", ["cough", "fever", "breathlessness"], 2),
+    ("Malaria", "parasitic", ["fever", "chills", "headache"], 5),
+    ("Giardiasis", "parasitic", ["diarrhoea", "bloating", "fatigue"], 3),
+    ("Unexplained fever", "other", ["fever", "fatigue"], 3),
+]
+SEVERITIES = (["low", "medium", "high", "critical"], [40, 35, 18, 7])
+
+GENDERS = ["male", "female", "other"]
+
+# Statuses of reports created within the last month, and of older ones.
+RECENT_STATUSES = (["draft", "submitted", "under_review", "approved"], [20, 25, 20, 35])
+OLD_STATUSES = (["draft", "submitted", "under_review", "approved"], [3, 3, 4, 90])
+
+# Transitions a report went through to reach its status (see `api/state_machine.py`).
+STATUS_PATHS = {
+    "draft": [],
+    "submitted": ["submitted"],
+    "under_review": ["submitted", "under_review"],
+    "approved": ["submitted", "under_review", "approved"],
+}
+
+# Tables filled by the generator, in load order.
+TABLES = [
+    "users",
+    "reporters",
+    "patients",
+    "reports",
+    "diseases",
+    "patient_reports",
+    "audit_logs",
+    "report_search",
+]
+
+COLUMNS = {
+    "users": (
+        "id",
+        "email",
+        "hashed_password",
+        "full_name",
+        "is_active",
+        "created_at",
+        "role",
+    ),
+    "reporters": (
+        "id",
+        "first_name",
+        "last_name",
+        "email",
+        "job_title",
+        "phone_number",
+        "hospital_name",
+        "hospital_address",
+        "registration_date",
+    ),
+    "patients": (
+        "id",
+        "first_name",
+        "last_name",
+        "date_of_birth",
+        "gender",
+        "medical_record_number",
+        "patient_address",
+        "emergency_contact",
+    ),
+    "reports": (
+        "id",
+        "status",
+        "created_at",
+        "updated_at",
+        "created_by",
+        "reporter_id",
+    ),
+    "diseases": (
+        "id",
+        "disease_name",
+        "disease_category",
+        "date_detected",
+        "symptoms",
+        "severity_level",
+        "lab_results",
+        "treatment_status",
+        "report_id",
+    ),
+    "patient_reports": ("patient_id", "report_id"),
+    "audit_logs": (
+        "timestamp",
+        "user_id",
+        "action",
+        "entity_type",
+        "entity_id",
+        "changes",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Sizes and distributions of a synthetic dataset. See the module docstring."""
+
+    seed: int = 0
+    users: int = 1_000
+    reporters: int = 20_000
+    hospitals: int = 500
+    patients: int = 2_000_000
+    reports: int = 1_000_000
+    end_date: date = field(default_factory=date.today)
+    days: int = 730
+    outbreaks: int = 40
+    outbreak_share: float = 0.3
+    outbreak_days: float = 14.0
+    hospital_skew: float = 1.1
+    patients_per_report: float = 2.0
+    max_patients_per_report: int = 20
+    password: str = "synthetic-password"
+
+    @classmethod
+    def scaled(
+        cls,
+        reports: int,
+        users: Optional[int] = None,
+        reporters: Optional[int] = None,
+        hospitals: Optional[int] = None,
+        patients: Optional[int] = None,
+        **options,
+    ) -> "DatasetSpec":
+        """Spec of `reports` reports, with as many users, reporters, hospitals, and patients as `PER_REPORT`.
+
+        Args:
+            reports (int): Number of reports.
+            users, reporters, hospitals, patients (Optional[int]): Sizes overriding the derived ones.
+            **options: Other fields of the spec.
+
+        Returns:
+            DatasetSpec: The spec. There are at least one user, hospital, and patient, and at least as
+            many reporters as hospitals.
+        """
+
+        def derived(table: str, given: Optional[int], minimum: int = 1) -> int:
+            if given is not None:
+                return given
+            return max(round(reports * PER_REPORT[table]), minimum)
+
+        hospitals = derived("hospitals", hospitals)
+        return cls(
+            reports=reports,
+            users=derived("users", users),
+            reporters=derived("reporters", reporters, hospitals),
+            hospitals=hospitals,
+            patients=derived("patients", patients),
+            **options,
+        )
+
+
+@dataclass(frozen=True)
+class Outbreak:
+    """A cluster of reports of one disease, from a few hospitals, around a peak date."""
+
+    disease: int
+    hospitals: Tuple[int, ...]
+    peak: float
+    spread: float
+
+
+@dataclass(frozen=True)
+class Plan:
+    """What every worker needs to generate its chunks: the spec, and the first ID of each table."""
+
+    spec: DatasetSpec
+    first_ids: Dict[str, int]
+    hashed_password: str
+    outbreaks: Tuple[Outbreak, ...]
+
+
+def chunk_rng(spec: DatasetSpec, table: str, chunk: int) -> random.Random:
+    """The random generator of a chunk, independent of every other chunk."""
+    return random.Random(f"{spec.seed}/{table}/{chunk}")
+
+
+def chunks(total: int) -> range:
+    return range(math.ceil(total / CHUNK_SIZE))
+
+
+def chunk_range(total: int, chunk: int) -> range:
+    return range(chunk * CHUNK_SIZE, min((chunk + 1) * CHUNK_SIZE, total))
+
+
+@lru_cache(maxsize=None)
+def zipf_cum_weights(n: int, exponent: float) -> List[float]:
+    """Cumulative weights of ranks 1 to `n` under a Zipf law, for `random.choices` or `bisect`."""
+    return list(accumulate(1 / rank**exponent for rank in range(1, n + 1)))
+
+
+def weighted_choice(rng: random.Random, cum_weights: Sequence[float]) -> int:
+    """Index drawn with the given cumulative weights."""
+    return bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    """Poisson distributed integer (Knuth's method, fine for small means)."""
+    limit, count, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def make_outbreaks(spec: DatasetSpec) -> Tuple[Outbreak, ...]:
+    """Draw the outbreaks of a dataset. Outbreak diseases favour the less common ones."""
+    rng = random.Random(f"{spec.seed}/outbreaks")
+    hospitals = zipf_cum_weights(spec.hospitals, spec.hospital_skew)
+    return tuple(
+        Outbreak(
+            disease=rng.randrange(len(DISEASES)),
+            hospitals=tuple(
+                weighted_choice(rng, hospitals) for _ in range(rng.randint(1, 6))
+            ),
+            peak=rng.uniform(0, spec.days),
+            spread=rng.uniform(1, spec.outbreak_days),
+        )
+        for _ in range(spec.outbreaks)
+    )
+
+
+def hospital_name(hospital: int) -> str:
+    return f"{HOSPITAL_NAMES[hospital % len(HOSPITAL_NAMES)]} Hospital {hospital}"
+
+
+def user_email(index: int) -> str:
+    """Email of the user of the given index (0-based) of a synthetic dataset."""
+    return f"synthetic-user-{index}@example.com"
+
+
+def generate_users(plan: Plan, chunk: int) -> Dict[str, list]:
+    spec = plan.spec
+    rng = chunk_rng(spec, "users", chunk)
+    start = datetime.combine(
+        spec.end_date - timedelta(days=spec.days), dtime(), timezone.utc
+    )
+    rows = [
+        (
+            plan.first_ids["users"] + index,
+            user_email(index),
+            plan.hashed_password,
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "true",
+            (start + timedelta(seconds=rng.randrange(86400 * 30))).isoformat(),
+            "senior" if index % SENIOR_EVERY == 0 else "junior",
+        )
+        for index in chunk_range(spec.users, chunk)
+    ]
+    return {"users": rows}
+
+
+def generate_reporters(plan: Plan, chunk: int) -> Dict[str, list]:
+    spec = plan.spec
+    rng = chunk_rng(spec, "reporters", chunk)
+    start = datetime.combine(
+        spec.end_date - timedelta(days=spec.days), dtime(), timezone.utc
+    )
+    rows = []
+    for index in chunk_range(spec.reporters, chunk):
+        # Reporter `index` works at hospital `index % hospitals`.
+        hospital = index % spec.hospitals
+        rows.append(
+            (
+                plan.first_ids["reporters"] + index,
+                rng.choice(FIRST_NAMES),
+                rng.choice(LAST_NAMES),
+                f"synthetic-reporter-{index}@example.com",
+                rng.choice(JOB_TITLES),
+                f"+44{7000000000 + rng.randrange(1000000000)}",
+                hospital_name(hospital),
+                f"{hospital + 1} Hospital Road, City {hospital % 50}",
+                (start + timedelta(seconds=rng.randrange(86400 * 30))).isoformat(),
+            )
+        )
+    return {"reporters": rows}
+
+
+def generate_patients(plan: Plan, chunk: int) -> Dict[str, list]:
+    spec = plan.spec
+    rng = chunk_rng(spec, "patients", chunk)
+    rows = []
+    for index in chunk_range(spec.patients, chunk):
+        last_name = rng.choice(LAST_NAMES)
+        rows.append(
+            (
+                plan.first_ids["patients"] + index,
+                rng.choice(FIRST_NAMES),
+                last_name,
+                (spec.end_date - timedelta(days=rng.randrange(365 * 95))).isoformat(),
+                rng.choices(GENDERS, [49, 49, 2])[0],
+                f"SYN-{index:09d}",
+                f"{rng.randint(1, 400)} {rng.choice(LAST_NAMES)} Street",
+                f"{rng.choice(FIRST_NAMES)} {last_name}",
+            )
+        )
+    return {"patients": rows}
+
+
+def generate_reports(plan: Plan, chunk: int) -> Dict[str, list]:
+    """Reports of a chunk, with their disease, patient links, and audit entries."""
+    spec = plan.spec
+    rng = chunk_rng(spec, "reports", chunk)
+    hospitals = zipf_cum_weights(spec.hospitals, spec.hospital_skew)
+    endemic = list(accumulate(weight for *_, weight in DISEASES))
+    end = datetime.combine(spec.end_date, dtime(), timezone.utc)
+    start = end - timedelta(days=spec.days)
+    seniors = math.ceil(spec.users / SENIOR_EVERY)
+    first = plan.first_ids
+    tables: Dict[str, list] = {
+        "reports": [],
+        "diseases": [],
+        "patient_reports": [],
+        "audit_logs": [],
+    }
+
+    for index in chunk_range(spec.reports, chunk):
+        report_id = first["reports"] + index
+        if plan.outbreaks and rng.random() < spec.outbreak_share:
+            outbreak = rng.choice(plan.outbreaks)
+            disease = outbreak.disease
+            hospital = rng.choice(outbreak.hospitals)
+            day = min(max(rng.gauss(outbreak.peak, outbreak.spread), 0), spec.days)
+        else:
+            disease = weighted_choice(rng, endemic)
+            hospital = weighted_choice(rng, hospitals)
+            day = rng.uniform(0, spec.days)
+        created_at = start + timedelta(days=day)
+        age = end - created_at
+
+        # The reporters of hospital `h` are `h`, `h + hospitals`, `h + 2 * hospitals`, ...
+        reporter = hospital + spec.hospitals * rng.randrange(
+            math.ceil((spec.reporters - hospital) / spec.hospitals)
+        )
+        creator = first["users"] + rng.randrange(spec.users)
+        statuses = OLD_STATUSES if age > timedelta(days=30) else RECENT_STATUSES
+        status = rng.choices(*statuses)[0]
+
+        # Audit entries of the report's history: created, then one entry per transition, hours apart.
+        # Submission is done by the creator, review by a senior.
+        audit = [(created_at, creator, "CREATE", None)]
+        at, previous = created_at, "draft"
+        for target in STATUS_PATHS[status]:
+            at = min(at + timedelta(hours=rng.uniform(1, 72)), end)
+            user = (
+                creator
+                if target == "submitted"
+                else first["users"] + SENIOR_EVERY * rng.randrange(seniors)
+            )
+            changes = {"status": {"from": previous, "to": target}}
+            audit.append((at, user, "UPDATE", changes))
+            previous = target
+
+        name, category, symptoms, _ = DISEASES[disease]
+        severity = rng.choices(*SEVERITIES)[0]
+        treatment = "completed" if age > timedelta(days=60) else "ongoing"
+
+        count = min(
+            max(poisson(rng, spec.patients_per_report), 1),
+            spec.max_patients_per_report,
+            spec.patients,
+        )
+        patients = set()
+        while len(patients) < count:
+            patients.add(first["patients"] + rng.randrange(spec.patients))
+
+        tables["reports"].append(
+            (
+                report_id,
+                status,
+                created_at.isoformat(),
+                at.isoformat() if status != "draft" else None,
+                creator,
+                first["reporters"] + reporter,
+            )
+        )
+        tables["diseases"].append(
+            (
+                first["diseases"] + index,
+                name,
+                category,
+                (created_at.date() - timedelta(days=rng.randint(0, 3))).isoformat(),
+                json.dumps(rng.sample(symptoms, rng.randint(1, len(symptoms)))),
+                severity,
+                f"Sample {report_id} positive for {name}",
+                treatment,
+                report_id,
+            )
+        )
+        tables["patient_reports"].extend(
+            (patient, report_id) for patient in sorted(patients)
+        )
+        tables["audit_logs"].extend(
+            (
+                timestamp.isoformat(),
+                user,
+                action,
+                "Report",
+                report_id,
+                json.dumps(changes) if changes is not None else None,
+            )
+            for timestamp, user, action, changes in audit
+        )
+    return tables
+
+
+GENERATORS = {
+    "users": generate_users,
+    "reporters": generate_reporters,
+    "patients": generate_patients,
+    "reports": generate_reports,
+}
+
+
+def copy_rows(cursor, table: str, rows: list) -> None:
+    """Load rows into a table with `COPY ... FROM STDIN` (CSV, empty unquoted fields are NULL)."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(COLUMNS[table])}) FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+
+
+_worker_engine: Optional[Engine] = None
+
+
+def _init_worker(url: str) -> None:
+    global _worker_engine
+    _worker_engine = create_engine(url, future=True, pool_size=1)
+
+
+def load_chunk(plan: Plan, generator: str, chunk: int) -> Dict[str, int]:
+    """Generate one chunk and load it in its own transaction. Runs in a worker process.
+
+    Returns:
+        Dict[str, int]: Number of rows loaded, by table.
+    """
+    tables = GENERATORS[generator](plan, chunk)
+    connection = _worker_engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            for table, rows in tables.items():
+                copy_rows(cursor, table, rows)
+        connection.commit()
+    finally:
+        connection.close()
+    return {table: len(rows) for table, rows in tables.items()}
+
+
+def load_report_search(first_report: int, last_report: int) -> Dict[str, int]:
+    """Build the `report_search` rows of a range of report IDs. Runs in a worker process."""
+    source = report_search_select().where(
+        models.Report.id.between(first_report, last_report)
+    )
+    with _worker_engine.begin() as connection:
+        result = connection.execute(
+            insert(models.ReportSearch).from_select(
+                [column.name for column in source.selected_columns], source
+            )
+        )
+    return {"report_search": result.rowcount}
+
+
+def first_ids(engine: Engine) -> Dict[str, int]:
+    """First free ID of every table with an ID, after the largest existing one."""
+    with engine.connect() as connection:
+        return {
+            table: connection.execute(
+                text(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")
+            ).scalar_one()
+            for table in ("users", "reporters", "patients", "reports", "diseases")
+        }
+
+
+def truncate(engine: Engine) -> None:
+    """Empty every table the generator fills, and those referencing them, and restart their IDs."""
+    with engine.begin() as connection:
+        connection.execute(
+            text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+        )
+
+
+def finish(engine: Engine) -> None:
+    """Move ID sequences past the loaded rows, and refresh the planner statistics."""
+    with engine.connect() as connection:
+        for table in ("users", "reporters", "patients", "reports", "diseases"):
+            connection.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 1) FROM {table}))"
+                )
+            )
+        connection.commit()
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        for table in TABLES:
+            connection.execute(text(f"VACUUM ANALYZE {table}"))
+
+
+def _tasks(plan: Plan) -> Iterator[Tuple[str, List[tuple]]]:
+    """The phases of a load, in dependency order, each with the arguments of its chunks."""
+    spec = plan.spec
+    yield "users, reporters, patients", [
+        (plan, generator, chunk)
+        for generator, total in (
+            ("users", spec.users),
+            ("reporters", spec.reporters),
+            ("patients", spec.patients),
+        )
+        for chunk in chunks(total)
+    ]
+    yield "reports", [(plan, "reports", chunk) for chunk in chunks(spec.reports)]
+
+
+def generate(engine: Engine, spec: DatasetSpec, workers: int = 4) -> Dict[str, int]:
+    """Generate and load a synthetic dataset.
+
+    Args:
+        engine (Engine): Engine of the target database, which must be migrated.
+        spec (DatasetSpec): Sizes and distributions of the dataset.
+        workers (int): Number of loading processes.
+
+    Raises:
+        ValueError: If there are fewer reporters than hospitals, or no user or patient.
+
+    Returns:
+        Dict[str, int]: Number of rows loaded, by table.
+    """
+    if spec.reporters < spec.hospitals:
+        raise ValueError("Every hospital needs a reporter: reporters < hospitals.")
+    if spec.users < 1 or spec.patients < 1:
+        raise ValueError("At least one user and one patient are needed.")
+
+    # Imported here: it brings in the application's own engine configuration.
+    from api.endpoints.auth import hash_password
+
+    ids = first_ids(engine)
+    plan = Plan(
+        spec=spec,
+        first_ids=ids,
+        hashed_password=hash_password(spec.password),
+        outbreaks=make_outbreaks(spec),
+    )
+    counts = dict.fromkeys(TABLES, 0)
+    url = engine.url.render_as_string(hide_password=False)
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(url,)
+    ) as executor:
+        for phase, arguments in _tasks(plan):
+            start = time.perf_counter()
+            for loaded in executor.map(load_chunk, *zip(*arguments)):
+                for table, rows in loaded.items():
+                    counts[table] += rows
+            print(f"Loaded {phase} in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        ranges = [chunk_range(spec.reports, chunk) for chunk in chunks(spec.reports)]
+        for loaded in executor.map(
+            load_report_search,
+            [ids["reports"] + chunk[0] for chunk in ranges],
+            [ids["reports"] + chunk[-1] for chunk in ranges],
+        ):
+            counts["report_search"] += loaded["report_search"]
+        print(f"Built report_search in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    finish(engine)
+    print(f"Analyzed in {time.perf_counter() - start:.1f}s")
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    defaults = DatasetSpec()
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--reports", type=int, default=defaults.reports)
+    for table in PER_REPORT:
+        parser.add_argument(
+            f"--{table}",
+            type=int,
+            help=f"Number of {table} (default: {PER_REPORT[table]:g} per report).",
+        )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=defaults.end_date,
+        help="Date of the most recent reports (default: today).",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=defaults.days,
+        help="Days covered by the reports.",
+    )
+    parser.add_argument("--outbreaks", type=int, default=defaults.outbreaks)
+    parser.add_argument(
+        "--outbreak-share",
+        type=float,
+        default=defaults.outbreak_share,
+        help="Fraction of the reports belonging to an outbreak.",
+    )
+    parser.add_argument(
+        "--outbreak-days",
+        type=float,
+        default=defaults.outbreak_days,
+        help="Largest standard deviation of an outbreak's report dates, in days.",
+    )
+    parser.add_argument(
+        "--hospital-skew",
+        type=float,
+        default=defaults.hospital_skew,
+        help="Zipf exponent of the number of reports per hospital (0: uniform).",
+    )
+    parser.add_argument(
+        "--patients-per-report", type=float, default=defaults.patients_per_report
+    )
+    parser.add_argument(
+        "--max-patients-per-report",
+        type=int,
+        default=defaults.max_patients_per_report,
+    )
+    parser.add_argument("--password", default=defaults.password)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="Empty the tables first (all their rows, not only synthetic ones).",
+    )
+    args = parser.parse_args()
+
+    spec = DatasetSpec.scaled(
+        args.reports,
+        users=args.users,
+        reporters=args.reporters,
+        hospitals=args.hospitals,
+        patients=args.patients,
+        seed=args.seed,
+        end_date=args.end_date,
+        days=args.days,
+        outbreaks=args.outbreaks,
+        outbreak_share=args.outbreak_share,
+        outbreak_days=args.outbreak_days,
+        hospital_skew=args.hospital_skew,
+        patients_per_report=args.patients_per_report,
+        max_patients_per_report=args.max_patients_per_report,
+        password=args.password,
+    )
+    engine = benchmark_engine()
+    if args.truncate:
+        truncate(engine)
+    start = time.perf_counter()
+    counts = generate(engine, spec, workers=args.workers)
+    print(f"Generated in {time.perf_counter() - start:.1f}s:")
+    for table, rows in counts.items():
+        print(f"  {table:<16}{rows:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,11 +24,7 @@ def seeded_audit_logs(db_session, test_user):
         logs.append(log)
 
     db_session.commit()
-    yield logs
-
-    # Cleanup
-    db_session.query(AuditLog).filter(AuditLog.user_id == test_user.id).delete()
-    db_session.commit()
+    return logs
 
 
 def test_get_audit_logs_success(client, auth_headers, seeded_audit_logs):
@@ -47,6 +43,8 @@ def test_audit_logs_pagination(client, auth_headers, seeded_audit_logs):
     assert len(data) == 2
 
 
+# SQLite drops the offset of stored timestamps, so the date filters are checked on PostgreSQL.
+@pytest.mark.postgres
 def test_audit_logs_filter_start_date(client, auth_headers, seeded_audit_logs):
     now = datetime.now(timezone.utc)
     start_date = (now - timedelta(days=2)).isoformat()
@@ -63,6 +61,7 @@ def test_audit_logs_filter_start_date(client, auth_headers, seeded_audit_logs):
         assert timestamp >= datetime.fromisoformat(start_date)
 
 
+@pytest.mark.postgres
 def test_audit_logs_filter_end_date(client, auth_headers, seeded_audit_logs):
     now = datetime.now(timezone.utc)
     end_date = (now - timedelta(days=3)).isoformat()
@@ -80,6 +79,7 @@ def test_audit_logs_filter_end_date(client, auth_headers, seeded_audit_logs):
         assert timestamp <= datetime.fromisoformat(end_date)
 
 
+@pytest.mark.postgres
 def test_audit_logs_filter_start_and_end_date(client, auth_headers, seeded_audit_logs):
     now = datetime.now(timezone.utc)
     start_date = (now - timedelta(days=4)).isoformat()
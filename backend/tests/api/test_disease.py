@@ -15,9 +15,7 @@ def draft_report(db_session, test_user):
     )
     db_session.add(report)
     db_session.commit()
-    yield report
-    db_session.delete(report)
-    db_session.commit()
+    return report
 
 
 @pytest.fixture(scope="function")
@@ -193,3 +191,35 @@ def test_delete_disease_non_draft(
     db_session.delete(disease)
     db_session.delete(report)
     db_session.commit()
+
+
+def test_update_disease_if_match(
+    client, auth_headers, db_session, draft_report, disease_payload
+):
+    url = f"/api/reports/{draft_report.id}/disease"
+    response = client.post(
+        url, headers={**auth_headers, "If-Match": '"1"'}, json=disease_payload
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Disease does not exist"
+
+    created = client.post(url, headers=auth_headers, json=disease_payload).json()
+    assert created["version"] == 1
+
+    updated = {**disease_payload, "severity_level": "High"}
+    response = client.post(
+        url, headers={**auth_headers, "If-Match": '"1"'}, json=updated
+    )
+    assert response.status_code == 201
+    assert response.json()["version"] == 2
+
+    # A second tab still holding version 1.
+    response = client.post(
+        url, headers={**auth_headers, "If-Match": '"1"'}, json=disease_payload
+    )
+    assert response.status_code == 409
+    response = client.delete(url, headers={**auth_headers, "If-Match": '"1"'})
+    assert response.status_code == 409
+
+    response = client.delete(url, headers={**auth_headers, "If-Match": '"2"'})
+    assert response.status_code == 200
@@ -0,0 +1,186 @@
+# tests/api/test_idempotency.py
+
+import asyncio
+import uuid
+from datetime import timedelta
+
+import httpx
+import pytest
+from sqlalchemy import delete, func
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from api.database import get_engine
+from api.idempotency import IdempotencyMiddleware, purge_expired_keys, scoped_key
+from api.models import IdempotencyKey, Report
+
+# Keys are claimed with `INSERT ... ON CONFLICT` and waited on with PostgreSQL row locks.
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture(scope="function")
+def idempotency_key():
+    """A fresh Idempotency-Key, whose rows are removed after the test.
+
+    The middleware commits the rows on its own connection, outside of the test's transaction.
+    """
+    key = str(uuid.uuid4())
+    authorizations = []
+
+    def header(authorization: str = "") -> str:
+        authorizations.append(authorization)
+        return key
+
+    yield header
+
+    with get_engine().begin() as connection:
+        connection.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key.in_(
+                    [scoped_key(auth, key) for auth in authorizations]
+                )
+            )
+        )
+
+
+def test_retried_post_is_replayed(client, auth_headers, db_session, idempotency_key):
+    headers = {
+        **auth_headers,
+        "Idempotency-Key": idempotency_key(auth_headers["Authorization"]),
+    }
+    first = client.post("/api/reports/", json={"status": "Draft"}, headers=headers)
+    retry = client.post("/api/reports/", json={"status": "Draft"}, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    created_by = db_session.get(Report, first.json()["id"]).created_by
+    assert db_session.query(Report).filter(Report.created_by == created_by).count() == 1
+
+
+def test_key_reused_for_another_request(client, auth_headers, idempotency_key):
+    headers = {
+        **auth_headers,
+        "Idempotency-Key": idempotency_key(auth_headers["Authorization"]),
+    }
+    client.post("/api/reports/", json={"status": "Draft"}, headers=headers)
+    response = client.post(
+        "/api/reports/", json={"status": "Submitted"}, headers=headers
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith("Idempotency-Key was already used")
+
+
+def test_authentication_responses_are_not_recorded(
+    client, signup_payload, db_session, idempotency_key
+):
+    client.post("/api/auth/signup", json=signup_payload)
+    credentials = {key: signup_payload[key] for key in ("email", "password")}
+    headers = {"Idempotency-Key": idempotency_key()}
+    first = client.post("/api/auth/login", json=credentials, headers=headers)
+    retry = client.post("/api/auth/login", json=credentials, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert "idempotent-replayed" not in retry.headers
+    key = scoped_key("", headers["Idempotency-Key"])
+    assert db_session.get(IdempotencyKey, key) is None
+
+
+def test_invalid_key(client, auth_headers):
+    response = client.post(
+        "/api/reports/",
+        json={"status": "Draft"},
+        headers={**auth_headers, "Idempotency-Key": "x" * 256},
+    )
+    assert response.status_code == 400
+
+
+def run_concurrently(app, requests: int, key: str) -> list[httpx.Response]:
+    async def send_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            return await asyncio.gather(
+                *(
+                    c.post("/", json={"n": 1}, headers={"Idempotency-Key": key})
+                    for _ in range(requests)
+                )
+            )
+
+    return asyncio.run(send_all())
+
+
+def test_concurrent_duplicates_wait_for_the_first(idempotency_key):
+    calls = []
+
+    async def create(request):
+        calls.append(await request.json())
+        await asyncio.sleep(0.3)
+        return JSONResponse({"id": len(calls)}, status_code=201)
+
+    app = IdempotencyMiddleware(
+        Starlette(routes=[Route("/", create, methods=["POST"])])
+    )
+    responses = run_concurrently(app, 3, idempotency_key())
+
+    assert len(calls) == 1
+    assert [response.json() for response in responses] == [{"id": 1}] * 3
+    assert sorted("idempotent-replayed" in r.headers for r in responses) == [
+        False,
+        True,
+        True,
+    ]
+
+
+def test_claims_do_not_use_the_application_pool(idempotency_key):
+    checked_out = []
+
+    async def create(request):
+        checked_out.append(get_engine().pool.checkedout())
+        await asyncio.sleep(0.1)
+        return JSONResponse({}, status_code=201)
+
+    app = IdempotencyMiddleware(
+        Starlette(routes=[Route("/", create, methods=["POST"])])
+    )
+    before = get_engine().pool.checkedout()
+    responses = run_concurrently(app, 3, idempotency_key())
+
+    assert [response.status_code for response in responses] == [201] * 3
+    assert checked_out == [before]
+
+
+def test_server_errors_are_not_recorded(idempotency_key):
+    calls = []
+
+    async def create(request):
+        calls.append(1)
+        return JSONResponse({}, status_code=503 if len(calls) == 1 else 201)
+
+    app = IdempotencyMiddleware(
+        Starlette(routes=[Route("/", create, methods=["POST"])])
+    )
+    key = idempotency_key()
+    statuses = [run_concurrently(app, 1, key)[0].status_code for _ in range(3)]
+
+    assert statuses == [503, 201, 201]
+    assert len(calls) == 2
+
+
+def test_purge_expired_keys(db_session):
+    expired = uuid.uuid4().bytes * 2
+    db_session.add(
+        IdempotencyKey(
+            key=expired,
+            fingerprint=expired,
+            # Relative to `now()`, the start of the test's transaction, which the purge compares with.
+            expires_at=func.now() - timedelta(seconds=1),
+        )
+    )
+    db_session.commit()
+
+    assert purge_expired_keys(db_session.connection()) >= 1
+    db_session.expire_all()
+    assert db_session.get(IdempotencyKey, expired) is None
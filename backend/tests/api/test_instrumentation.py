@@ -0,0 +1,95 @@
+# tests/api/test_instrumentation.py
+
+import json
+import logging
+import re
+
+import pytest
+
+from api.enums import ReportStateEnum
+from api.instrumentation import ServerTimingMiddleware
+from api.main import app
+from api.models import Report
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", pool;dur=[\d.]+, '
+    r"serialize;dur=([\d.]+), app;dur=[\d.]+"
+)
+
+
+@pytest.fixture(scope="function")
+def last_request_log(caplog):
+    """Returns the last request log message, decoded. The request log does not propagate to caplog."""
+    logger = logging.getLogger("api.requests")
+    logger.addHandler(caplog.handler)
+    try:
+        yield lambda: json.loads(caplog.records[-1].getMessage())
+    finally:
+        logger.removeHandler(caplog.handler)
+
+
+def slow_request_threshold(milliseconds):
+    """Set the statement capture threshold of the app's `ServerTimingMiddleware`."""
+    app.middleware_stack = None
+    for middleware in app.user_middleware:
+        if middleware.cls is ServerTimingMiddleware:
+            middleware.kwargs["slow_request_ms"] = milliseconds
+
+
+def test_server_timing_header(
+    client, db_session, test_user, query_counter, last_request_log
+):
+    """Test that responses report their query count and timings, and are logged."""
+    reports = [
+        Report(status=ReportStateEnum.draft, created_by=test_user.id) for _ in range(2)
+    ]
+    db_session.add_all(reports)
+    db_session.commit()
+    ids = [report.id for report in reports]
+
+    with query_counter() as statements:
+        response = client.post("/api/reports/batch", json={"ids": ids})
+    assert response.status_code == 200
+    timing = SERVER_TIMING.fullmatch(response.headers["server-timing"])
+    assert timing is not None
+    assert int(timing.group(1)) == len(statements)
+    assert float(timing.group(2)) > 0
+
+    record = last_request_log()
+    assert record["method"] == "POST"
+    assert record["route"] == "/api/reports/batch"
+    assert record["status"] == 200
+    assert record["queries"] == len(statements)
+    assert "statements" not in record
+
+
+def test_slow_request_statements(client, last_request_log):
+    """Test that statements are logged only for requests over the threshold."""
+    try:
+        slow_request_threshold(0)
+        client.get("/api/reports/0")
+        record = last_request_log()
+        assert record["route"] == "/api/reports/{report_id}"
+        assert record["status"] == 404
+        assert len(record["statements"]) == record["queries"] > 0
+        assert any("FROM reports" in s["sql"] for s in record["statements"])
+
+        slow_request_threshold(60_000)
+        client.get("/api/reports/0")
+        assert "statements" not in last_request_log()
+    finally:
+        slow_request_threshold(None)
+
+
+def test_response_model_encoding_is_timed(
+    client, db_session, test_user, last_request_log
+):
+    """Test that responses encoded by FastAPI from the endpoint's return value count as serialization."""
+    report = Report(status=ReportStateEnum.draft, created_by=test_user.id)
+    db_session.add(report)
+    db_session.commit()
+
+    # `get_patients_for_report` returns ORM objects, validated against its `response_model`.
+    response = client.get(f"/api/reports/{report.id}/patient")
+    assert response.status_code == 200
+    assert last_request_log()["serialize_ms"] > 0
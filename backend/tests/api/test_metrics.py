@@ -0,0 +1,59 @@
+# tests/api/test_metrics.py
+
+from prometheus_client import REGISTRY
+
+from api.enums import ReportStateEnum
+from api.models import Report
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_endpoint(client):
+    """Test that the metrics are exposed in the Prometheus text format, by route template."""
+    client.get("/api/reports/0")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/api/reports/{report_id}",status="404"}'
+        in response.text
+    )
+    for name in (
+        "http_requests_in_progress",
+        "db_pool_checked_out_connections",
+        "db_pool_wait_seconds_count",
+        'cache_reads_total{cache="reports",result="miss"}',
+    ):
+        assert name in response.text
+
+
+def test_report_counters(client, auth_headers):
+    """Test that created and transitioned reports are counted."""
+    created = sample("reports_created_total")
+    submitted = sample("report_transitions_total", status="Submitted")
+    audit_writes = sample("audit_log_write_seconds_count", mode="batch")
+
+    report_id = client.post(
+        "/api/reports/", json={"status": "Draft"}, headers=auth_headers
+    ).json()["id"]
+    response = client.post(
+        "/api/reports/transitions",
+        json={"ids": [report_id], "status": "Submitted"},
+        headers=auth_headers,
+    )
+    assert response.json()[0]["outcome"] == "Transitioned"
+
+    assert sample("reports_created_total") == created + 1
+    assert sample("report_transitions_total", status="Submitted") == submitted + 1
+    assert sample("audit_log_write_seconds_count", mode="batch") == audit_writes + 1
+
+
+def test_rolled_back_changes_are_not_counted(db_session, test_user):
+    """Test that reports are counted only when their transaction commits."""
+    created = sample("reports_created_total")
+    db_session.add(Report(status=ReportStateEnum.draft, created_by=test_user.id))
+    db_session.flush()
+    db_session.rollback()
+    assert sample("reports_created_total") == created
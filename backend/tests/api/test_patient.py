@@ -151,3 +151,29 @@ def test_get_patients_for_nonexistent_report(client, auth_headers):
     response = client.get("/api/reports/99999/patient", headers=auth_headers)
     assert response.status_code == 404
     assert response.json()["detail"] == "Report not found"
+
+
+def test_patient_writes_if_match(client, auth_headers, patient_payload, test_report):
+    report_url = f"/api/reports/{test_report['id']}"
+    loaded = {**auth_headers, "If-Match": f'"{test_report["version"]}"'}
+    response = client.post("/api/reports/patient", headers=loaded, json=patient_payload)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Patient does not exist"
+
+    patient = client.post(
+        "/api/reports/patient", headers=auth_headers, json=patient_payload
+    ).json()
+    link = {"patient_ids": [patient["id"]]}
+    response = client.post(f"{report_url}/patient", headers=loaded, json=link)
+    assert response.status_code == 201
+
+    # A second tab still holding the report's version from before the link.
+    response = client.post(f"{report_url}/patient", headers=loaded, json=link)
+    assert response.status_code == 409
+    patient_url = f"/api/reports/patient/{patient['id']}"
+    response = client.delete(patient_url, headers=loaded)
+    assert response.status_code == 409
+
+    current = client.get(report_url).headers["ETag"]
+    response = client.delete(patient_url, headers={**auth_headers, "If-Match": current})
+    assert response.status_code == 204
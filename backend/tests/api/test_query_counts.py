@@ -0,0 +1,365 @@
+# tests/api/test_query_counts.py
+
+from datetime import date
+
+import pytest
+from api.cache import SharedStore, report_cache
+from api.models import Report, Disease, Reporter, Patient
+from api.enums import (
+    ReportStateEnum,
+    DiseaseCategoryEnum,
+    SeverityLevelEnum,
+    TreatmentStatusEnum,
+    GenderEnum,
+)
+
+
+@pytest.fixture(scope="function")
+def full_reports(db_session, test_user, test_run_id):
+    """Creates reports that each have a reporter, a disease, and two patients."""
+    reporter = Reporter(
+        first_name="Alice",
+        last_name="Smith",
+        email=f"reporter-counts-{test_run_id}@example.com",
+        job_title="Doctor",
+        phone_number="+123456789",
+        hospital_name=f"Hospital {test_run_id}",
+        hospital_address="123 Main Street",
+    )
+    patients = [
+        Patient(
+            first_name="Test",
+            last_name=f"Patient {index}",
+            date_of_birth=date(1990, 1, 1),
+            gender=GenderEnum.female,
+            medical_record_number=f"MRN-{index}-{test_run_id}",
+            patient_address="123 Testing Lane",
+        )
+        for index in range(2)
+    ]
+    reports = [
+        Report(
+            status=ReportStateEnum.draft,
+            created_by=test_user.id,
+            reporter=reporter,
+            patients=patients,
+            disease=Disease(
+                disease_name=f"Disease {index} {test_run_id}",
+                disease_category=DiseaseCategoryEnum.viral,
+                date_detected=date(2024, 1, 1),
+                symptoms=["cough"],
+                severity_level=SeverityLevelEnum.medium,
+                treatment_status=TreatmentStatusEnum.ongoing,
+            ),
+        )
+        for index in range(5)
+    ]
+    db_session.add_all(reports)
+    db_session.commit()
+    report_ids = [report.id for report in reports]
+
+    return report_ids
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/api/reports/{id}", 3),
+        ("/api/reports/{id}/disease", 1),
+        ("/api/reports/{id}/reporter", 1),
+        ("/api/reports/{id}/patient", 1),
+    ],
+)
+def test_report_detail_query_count(client, full_reports, query_counter, path, expected):
+    with query_counter() as statements:
+        response = client.get(path.format(id=full_reports[0]))
+
+    assert response.status_code == 200
+    assert len(statements) == expected
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/reports/{id}/disease",
+        "/api/reports/{id}/reporter",
+        "/api/reports/{id}/patient",
+    ],
+)
+def test_sub_resource_missing_report_query_count(client, query_counter, path):
+    with query_counter() as statements:
+        response = client.get(path.format(id=2_000_000_000))
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Report not found"
+    assert len(statements) == 1
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/api/reports/?limit={limit}", 3),
+        pytest.param(
+            "/api/reports/search?hospital_name={run_id}&limit={limit}",
+            3,
+            marks=pytest.mark.postgres,
+        ),
+        pytest.param(
+            "/api/reports/search/summary?hospital_name={run_id}&limit={limit}",
+            1,
+            marks=pytest.mark.postgres,
+        ),
+        pytest.param(
+            "/api/reports/search/faceted?hospital_name={run_id}&limit={limit}",
+            4,
+            marks=pytest.mark.postgres,
+        ),
+    ],
+)
+@pytest.mark.parametrize("limit", [1, 5])
+def test_report_list_query_count_is_constant(
+    client, full_reports, test_run_id, query_counter, path, expected, limit
+):
+    """The number of queries does not depend on the number of reports returned."""
+    with query_counter() as statements:
+        response = client.get(path.format(run_id=test_run_id, limit=limit))
+
+    assert response.status_code == 200
+    assert len(statements) == expected
+
+
+def test_statistics_query_count(client, auth_headers, full_reports, query_counter):
+    """Statistics are aggregated in one statement, after the user lookup."""
+    with query_counter() as statements:
+        response = client.get("/api/statistics", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(statements) == 2
+
+
+@pytest.mark.parametrize("path", ["/api/reports/{id}", "/api/reports/?limit=5"])
+def test_not_modified_query_count(client, full_reports, query_counter, path):
+    """An unchanged poll costs a single query, however large the report."""
+    path = path.format(id=full_reports[0])
+    etag = client.get(path).headers["etag"]
+
+    with query_counter() as statements:
+        response = client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert len(statements) == 1
+
+
+@pytest.mark.parametrize(
+    "status, coherent, expected",
+    [
+        (ReportStateEnum.draft, True, 1),
+        (ReportStateEnum.submitted, True, 1),
+        (ReportStateEnum.approved, False, 1),
+        (ReportStateEnum.approved, True, 0),
+    ],
+)
+def test_cached_report_query_count(
+    client,
+    db_session,
+    full_reports,
+    query_counter,
+    monkeypatch,
+    tmp_path,
+    status,
+    coherent,
+    expected,
+):
+    """A cached report costs a version check, a cached approved report no query at all when
+    invalidations are broadcast to the other workers.
+    """
+    if coherent:
+        monkeypatch.setattr(
+            report_cache, "broadcast", SharedStore(str(tmp_path / "cache.sqlite3"))
+        )
+    report = db_session.get(Report, full_reports[0])
+    report.status = status
+    db_session.commit()
+    path = f"/api/reports/{report.id}"
+    first = client.get(path)
+
+    with query_counter() as statements:
+        response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.content == first.content
+    assert response.headers["etag"] == first.headers["etag"]
+    assert len(statements) == expected
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/api/reports/?limit=5&fields=id,status,created_at", 2),
+        ("/api/reports/?limit=5&include=reporter", 2),
+        ("/api/reports/?limit=5&fields=id&include=patients", 3),
+        ("/api/reports/{id}?fields=status", 2),
+        pytest.param(
+            "/api/reports/search?hospital_name={run_id}&fields=status",
+            2,
+            marks=pytest.mark.postgres,
+        ),
+    ],
+)
+def test_sparse_fieldset_query_count(
+    client, full_reports, test_run_id, query_counter, path, expected
+):
+    """Sparse fieldsets load only the requested relationships."""
+    with query_counter() as statements:
+        response = client.get(path.format(id=full_reports[0], run_id=test_run_id))
+
+    assert response.status_code == 200
+    assert len(statements) == expected
+    if "fields=" in path:
+        assert "reports.updated_at" not in statements[-1]
+
+
+@pytest.mark.parametrize("count", [1, 5])
+def test_report_batch_query_count_is_constant(
+    client, full_reports, query_counter, count
+):
+    """A batch fetch loads reports in the same queries whatever their number."""
+    ids = full_reports[:count] + [0]
+    with query_counter() as statements:
+        response = client.post("/api/reports/batch", json={"ids": ids})
+
+    assert response.status_code == 200
+    assert len(response.json()["reports"]) == count
+    assert len(statements) == 2
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("count", [1, 5])
+def test_report_transition_query_count_is_constant(
+    client, auth_headers, full_reports, query_counter, count
+):
+    """A bulk transition runs the same statements whatever the number of reports."""
+    with query_counter() as statements:
+        response = client.post(
+            "/api/reports/transitions",
+            json={"ids": full_reports[:count] + [0], "status": "Submitted"},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    assert [result["outcome"] for result in response.json()].count(
+        "Transitioned"
+    ) == count
+    # User lookup, update, search index refresh, audit entries, states of the others.
+    assert len(statements) == 5
+
+
+def make_patients(name, count):
+    return [
+        Patient(
+            first_name="Test",
+            last_name=f"Patient {index}",
+            date_of_birth=date(1990, 1, 1),
+            gender=GenderEnum.female,
+            medical_record_number=f"MRN-{name}-{index}",
+            patient_address="123 Testing Lane",
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.fixture(scope="function")
+def report_with_patients(db_session, test_user, test_run_id, count):
+    """Creates a draft report with a reporter, a disease, and `count` patients."""
+    report = Report(
+        status=ReportStateEnum.draft,
+        created_by=test_user.id,
+        reporter=Reporter(
+            first_name="Alice",
+            last_name="Smith",
+            email=f"reporter-writes-{test_run_id}@example.com",
+            job_title="Doctor",
+            phone_number="+123456789",
+            hospital_name=f"Hospital {test_run_id}",
+            hospital_address="123 Main Street",
+        ),
+        patients=make_patients(f"linked-{test_run_id}", count),
+        disease=Disease(
+            disease_name=f"Disease {test_run_id}",
+            disease_category=DiseaseCategoryEnum.viral,
+            date_detected=date(2024, 1, 1),
+            symptoms=["cough"],
+            severity_level=SeverityLevelEnum.medium,
+            treatment_status=TreatmentStatusEnum.ongoing,
+        ),
+    )
+    db_session.add(report)
+    db_session.commit()
+    return report.id
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        pytest.param("put", "/api/reports/{id}", 12, marks=pytest.mark.postgres),
+        pytest.param(
+            "post", "/api/reports/{id}/patient", 13, marks=pytest.mark.postgres
+        ),
+        ("delete", "/api/reports/{id}", 9),
+    ],
+)
+@pytest.mark.parametrize("count", [1, 5])
+def test_report_write_query_count_is_constant(
+    client,
+    auth_headers,
+    db_session,
+    report_with_patients,
+    test_run_id,
+    query_counter,
+    count,
+    method,
+    path,
+    expected,
+):
+    """Writes to a report run the same statements whatever its number of patients, so that a
+    statement per patient cannot hide in the margin of the endpoint's budget.
+    """
+    payload = {"status": "Submitted"} if method == "put" else None
+    if method == "post":
+        # Replaces every link of the report by as many new ones.
+        patients = make_patients(f"new-{test_run_id}", count)
+        db_session.add_all(patients)
+        db_session.commit()
+        payload = {"patient_ids": [patient.id for patient in patients]}
+    with query_counter() as statements:
+        response = client.request(
+            method,
+            path.format(id=report_with_patients),
+            json=payload,
+            headers=auth_headers,
+        )
+
+    assert response.status_code < 300
+    assert len(statements) == expected
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("count", [1, 3])
+def test_patient_delete_query_count_is_constant(
+    client, auth_headers, db_session, full_reports, query_counter, count
+):
+    """Deleting a patient runs the same statements whatever the number of its reports."""
+    patient = db_session.get(Report, full_reports[0]).patients[0]
+    for report_id in full_reports[1:]:
+        report = db_session.get(Report, report_id)
+        report.patients = [p for p in report.patients if p.id != patient.id]
+    for report_id in full_reports[1:count]:
+        db_session.get(Report, report_id).patients.append(patient)
+    db_session.commit()
+    path = f"/api/reports/patient/{patient.id}"
+
+    with query_counter() as statements:
+        response = client.delete(path, headers=auth_headers)
+
+    assert response.status_code == 204
+    assert len(statements) == 9
@@ -10,6 +10,8 @@ def create_report(db_session, test_user):
     db_session.commit()
     db_session.refresh(report)
     yield report
+    # Reload the report's current version, incremented when a reporter is assigned to it.
+    db_session.refresh(report)
     db_session.delete(report)
     db_session.commit()
 
@@ -139,3 +141,22 @@ def test_get_reporter_invalid_report(client, auth_headers):
     response = client.get("/api/reports/9999/reporter", headers=auth_headers)
     assert response.status_code == 404
     assert response.json()["detail"] == "Report not found"
+
+
+def test_add_reporter_if_match(client, auth_headers, create_report, reporter_payload):
+    url = f"/api/reports/{create_report.id}/reporter"
+    loaded = {**auth_headers, "If-Match": f'"{create_report.version}"'}
+    response = client.post(url, json=reporter_payload, headers=loaded)
+    assert response.status_code == 201
+
+    # A second tab still holding the report's version from before the first edit.
+    updated = {**reporter_payload, "first_name": "Updated"}
+    response = client.post(url, json=updated, headers=loaded)
+    assert response.status_code == 409
+
+    current = client.get(f"/api/reports/{create_report.id}").headers["ETag"]
+    response = client.post(
+        url, json=updated, headers={**auth_headers, "If-Match": current}
+    )
+    assert response.status_code == 201
+    assert response.json()["first_name"] == "Updated"
@@ -1,6 +1,7 @@
 import pytest
-from api.models import Report
+from api.models import AuditLog, Report, Reporter, ReportSearch
 from api.enums import ReportStateEnum
+from sqlalchemy.orm.exc import StaleDataError
 
 
 @pytest.fixture(scope="function")
@@ -21,10 +22,6 @@ def test_create_report_success(
     assert data["patients"] == []
     assert data["disease"] is None
 
-    # Cleanup
-    db_session.query(Report).filter(Report.id == data["id"]).delete()
-    db_session.commit()
-
 
 def test_list_reports(client, auth_headers, db_session, test_user):
     """Test listing reports with pagination."""
@@ -38,10 +35,6 @@ def test_list_reports(client, auth_headers, db_session, test_user):
     data = response.json()
     assert any(r["id"] == report.id for r in data)
 
-    # Cleanup
-    db_session.query(Report).filter(Report.id == report.id).delete()
-    db_session.commit()
-
 
 def test_get_report_success(client, auth_headers, db_session, test_user):
     """Test retrieving a report by ID."""
@@ -55,9 +48,6 @@ def test_get_report_success(client, auth_headers, db_session, test_user):
     data = response.json()
     assert data["id"] == report.id
 
-    db_session.query(Report).filter(Report.id == report.id).delete()
-    db_session.commit()
-
 
 def test_get_report_not_found(client, auth_headers):
     """Test retrieving a non-existent report returns 404."""
@@ -81,9 +71,24 @@ def test_update_report_success(client, auth_headers, db_session, test_user):
     data = response.json()
     assert data["status"] == "Submitted"
 
-    # Cleanup
-    db_session.query(Report).filter(Report.id == report.id).delete()
+
+def test_update_report_follows_state_machine(
+    client, auth_headers, db_session, test_user
+):
+    """Test that a status update cannot skip the report state machine."""
+    report = Report(status=ReportStateEnum.draft, created_by=test_user.id)
+    db_session.add(report)
     db_session.commit()
+    db_session.refresh(report)
+
+    payload = {"status": ReportStateEnum.approved}
+    response = client.put(
+        f"/api/reports/{report.id}", json=payload, headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Reports cannot move from 'Draft' to 'Approved'"
+    db_session.refresh(report)
+    assert report.status == ReportStateEnum.draft
 
 
 def test_update_report_not_found(client, auth_headers):
@@ -108,9 +113,6 @@ def test_update_report_not_draft(client, auth_headers, db_session, test_user):
     assert response.status_code == 400
     assert response.json()["detail"] == "Only draft reports can be edited"
 
-    db_session.query(Report).filter(Report.id == report.id).delete()
-    db_session.commit()
-
 
 def test_delete_report_success(client, auth_headers, db_session, test_user):
     """Test successful deletion of a draft report."""
@@ -144,5 +146,374 @@ def test_delete_report_not_draft(client, auth_headers, db_session, test_user):
     assert response.status_code == 400
     assert response.json()["detail"] == "Only draft reports can be deleted"
 
+
+def test_get_report_conditional(client, auth_headers, db_session, test_user):
+    """Test conditional GET of a report with ETag and Last-Modified."""
+    report = Report(status=ReportStateEnum.draft, created_by=test_user.id)
+    db_session.add(report)
+    db_session.commit()
+    db_session.refresh(report)
+
+    response = client.get(f"/api/reports/{report.id}", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+    assert etag == f'"{report.version}"'
+    assert response.headers["cache-control"] == "no-cache"
+
+    # Unchanged: 304 without a body, by entity tag or by date.
+    for headers in ({"If-None-Match": etag}, {"If-Modified-Since": last_modified}):
+        response = client.get(
+            f"/api/reports/{report.id}", headers={**auth_headers, **headers}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    # A change to a child of the report changes its entity tag.
+    client.post(
+        f"/api/reports/{report.id}/disease",
+        json={
+            "disease_name": "Cholera",
+            "disease_category": "Bacterial",
+            "date_detected": "2024-01-01",
+            "symptoms": ["diarrhea"],
+            "severity_level": "High",
+            "treatment_status": "Ongoing",
+        },
+        headers=auth_headers,
+    )
+    response = client.get(
+        f"/api/reports/{report.id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["disease"]["disease_name"] == "Cholera"
+    assert response.headers["etag"] != etag
+    stale_etag, etag = etag, response.headers["etag"]
+
+    # If-Modified-Since is ignored when If-None-Match is present.
+    response = client.get(
+        f"/api/reports/{report.id}",
+        headers={
+            **auth_headers,
+            "If-None-Match": stale_etag,
+            "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT",
+        },
+    )
+    assert response.status_code == 200
+
+    # The entity tag of a GET is the one writes send back in If-Match, compared strongly.
+    url, payload = f"/api/reports/{report.id}", {"status": "Submitted"}
+    for if_match in (stale_etag, f"W/{etag}"):
+        response = client.put(
+            url, json=payload, headers={**auth_headers, "If-Match": if_match}
+        )
+        assert response.status_code == 409
+    response = client.put(url, json=payload, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 200
+
+
+def test_list_reports_conditional(
+    client, auth_headers, db_session, test_user, test_run_id
+):
+    """Test conditional GET of a page of reports with an ETag."""
+    report = Report(status=ReportStateEnum.draft, created_by=test_user.id)
+    db_session.add(report)
+    db_session.commit()
+    db_session.refresh(report)
+
+    response = client.get("/api/reports/?limit=1000", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert "last-modified" not in response.headers
+
+    response = client.get(
+        "/api/reports/?limit=1000", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    # Changing a child of a listed report changes the entity tag of the page.
+    client.post(
+        f"/api/reports/{report.id}/reporter",
+        json={
+            "first_name": "Alice",
+            "last_name": "Doe",
+            "email": f"reporter-list-{test_run_id}@example.com",
+            "job_title": "Epidemiologist",
+            "phone_number": "+1234567890",
+            "hospital_name": "City Hospital",
+            "hospital_address": "123 Health St, Metropolis",
+        },
+        headers=auth_headers,
+    )
+    response = client.get(
+        "/api/reports/?limit=1000", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    # So does updating a listed report.
+    client.put(
+        f"/api/reports/{report.id}",
+        json={"status": ReportStateEnum.submitted},
+        headers=auth_headers,
+    )
+    response = client.get(
+        "/api/reports/?limit=1000", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    # So does removing a report from the page.
     db_session.query(Report).filter(Report.id == report.id).delete()
     db_session.commit()
+    response = client.get(
+        "/api/reports/?limit=1000", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_get_report_cache_invalidation(
+    client, auth_headers, db_session, test_user, test_run_id
+):
+    """Test that cached reports reflect writes to the report and to shared children."""
+    reporter_payload = {
+        "first_name": "Alice",
+        "last_name": "Doe",
+        "email": f"reporter-cache-{test_run_id}@example.com",
+        "job_title": "Epidemiologist",
+        "phone_number": "+1234567890",
+        "hospital_name": "City Hospital",
+        "hospital_address": "123 Health St, Metropolis",
+    }
+    reporter = Reporter(**reporter_payload)
+    draft = Report(
+        status=ReportStateEnum.draft, created_by=test_user.id, reporter=reporter
+    )
+    submitted = Report(
+        status=ReportStateEnum.submitted, created_by=test_user.id, reporter=reporter
+    )
+    db_session.add_all([draft, submitted])
+    db_session.commit()
+
+    for report in (draft, submitted):
+        response = client.get(f"/api/reports/{report.id}", headers=auth_headers)
+        assert response.json()["reporter"]["first_name"] == "Alice"
+
+    # Updating the shared reporter through the draft invalidates both reports.
+    response = client.post(
+        f"/api/reports/{draft.id}/reporter",
+        json={**reporter_payload, "first_name": "Alicia"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    for report in (draft, submitted):
+        response = client.get(f"/api/reports/{report.id}", headers=auth_headers)
+        assert response.json()["reporter"]["first_name"] == "Alicia"
+
+    # So does a status change.
+    client.put(
+        f"/api/reports/{draft.id}",
+        json={"status": ReportStateEnum.submitted},
+        headers=auth_headers,
+    )
+    response = client.get(f"/api/reports/{draft.id}", headers=auth_headers)
+    assert response.json()["status"] == ReportStateEnum.submitted
+
+    # And deleting the reporter, which deletes its reports.
+    report_ids = [draft.id, submitted.id]
+    db_session.delete(reporter)
+    db_session.commit()
+    for report_id in report_ids:
+        response = client.get(f"/api/reports/{report_id}", headers=auth_headers)
+        assert response.status_code == 404
+
+
+def test_get_reports_sparse_fieldsets(client, auth_headers, db_session, test_user):
+    """Test restricting report representations with `fields` and `include`."""
+    report = Report(status=ReportStateEnum.draft, created_by=test_user.id)
+    db_session.add(report)
+    db_session.commit()
+    db_session.refresh(report)
+
+    response = client.get(
+        f"/api/reports/{report.id}?fields=status,created_at", headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert set(response.json()) == {"id", "status", "created_at"}
+    sparse_etag = response.headers["etag"]
+    assert sparse_etag.startswith(f'"{report.version}-')
+
+    # The partial and full representations never validate each other. Fieldsets are normalized.
+    response = client.get(
+        f"/api/reports/{report.id}?fields=created_at,status",
+        headers={**auth_headers, "If-None-Match": sparse_etag},
+    )
+    assert response.status_code == 304
+    response = client.get(
+        f"/api/reports/{report.id}",
+        headers={**auth_headers, "If-None-Match": sparse_etag},
+    )
+    assert response.status_code == 200
+    full_etag = response.headers["etag"]
+    assert full_etag == f'"{report.version}"'
+    response = client.get(
+        f"/api/reports/{report.id}?fields=status,created_at",
+        headers={**auth_headers, "If-None-Match": full_etag},
+    )
+    assert response.status_code == 200
+
+    response = client.get(
+        f"/api/reports/{report.id}?include=disease", headers=auth_headers
+    )
+    assert set(response.json()) == {
+        "id",
+        "status",
+        "created_at",
+        "updated_at",
+        "version",
+        "disease",
+    }
+
+    response = client.get("/api/reports/?limit=1000&fields=id", headers=auth_headers)
+    assert response.status_code == 200
+    assert {"id": report.id} in response.json()
+
+    # Two projections of the same page have different entity tags.
+    response = client.get(
+        "/api/reports/?limit=1000&fields=status",
+        headers={**auth_headers, "If-None-Match": response.headers["etag"]},
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/reports/?fields=id,creator", headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Unknown field 'creator'")
+
+
+def test_get_reports_batch(client, db_session, test_user):
+    """Test fetching reports by ID in one request."""
+    reports = [
+        Report(status=ReportStateEnum.draft, created_by=test_user.id) for _ in range(3)
+    ]
+    db_session.add_all(reports)
+    db_session.commit()
+    ids = [report.id for report in reports]
+
+    response = client.post(
+        "/api/reports/batch", json={"ids": [ids[2], 0, ids[0], ids[2], ids[1]]}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [report["id"] for report in data["reports"]] == [ids[2], ids[0], ids[1]]
+    assert data["reports"][0]["patients"] == []
+    assert data["missing"] == [0]
+
+    response = client.post(
+        "/api/reports/batch?fields=status&include=patients", json={"ids": ids}
+    )
+    assert response.status_code == 200
+    assert set(response.json()["reports"][0]) == {"id", "status", "patients"}
+
+
+@pytest.mark.parametrize("ids", [[], list(range(1, 102))])
+def test_get_reports_batch_limits(client, ids):
+    """Test that a batch must hold between 1 and REPORT_BATCH_LIMIT IDs."""
+    response = client.post("/api/reports/batch", json={"ids": ids})
+    assert response.status_code == 422
+
+
+@pytest.mark.postgres
+def test_transition_reports(client, auth_headers, db_session, test_user):
+    """Test moving many reports to a new state with per-report outcomes."""
+    reports = [
+        Report(status=status, created_by=test_user.id)
+        for status in (
+            ReportStateEnum.submitted,
+            ReportStateEnum.under_review,
+            ReportStateEnum.draft,
+        )
+    ]
+    db_session.add_all(reports)
+    db_session.commit()
+    ids = [report.id for report in reports]
+    client.get(f"/api/reports/{ids[0]}")
+
+    response = client.post(
+        "/api/reports/transitions",
+        json={"ids": ids + [0], "status": "Approved"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": ids[0], "outcome": "Transitioned", "status": "Approved"},
+        {"id": ids[1], "outcome": "Transitioned", "status": "Approved"},
+        {"id": ids[2], "outcome": "Not Allowed", "status": "Draft"},
+        {"id": 0, "outcome": "Not Found", "status": None},
+    ]
+
+    assert client.get(f"/api/reports/{ids[0]}").json()["status"] == "Approved"
+    search = db_session.query(ReportSearch).filter(ReportSearch.report_id == ids[1])
+    assert search.one().status == ReportStateEnum.approved
+    logs = (
+        db_session.query(AuditLog)
+        .filter(AuditLog.entity_type == "Report", AuditLog.entity_id.in_(ids))
+        .order_by(AuditLog.entity_id)
+        .all()
+    )
+    assert [log.changes for log in logs] == [
+        {"status": {"from": "Submitted", "to": "Approved"}},
+        {"status": {"from": "Under Review", "to": "Approved"}},
+    ]
+
+
+def test_transition_reports_invalid_state(client, auth_headers):
+    """Test that the target state must be a report state."""
+    response = client.post(
+        "/api/reports/transitions",
+        json={"ids": [1], "status": "Archived"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 422
+
+
+def test_update_report_if_match(client, auth_headers, db_session, test_user):
+    """Test that updates with a stale `If-Match` version are refused."""
+    report = Report(status=ReportStateEnum.draft, created_by=test_user.id)
+    db_session.add(report)
+    db_session.commit()
+    version = report.version
+
+    response = client.put(
+        f"/api/reports/{report.id}",
+        json={"status": "Draft"},
+        headers={**auth_headers, "If-Match": f'"{version + 1}"'},
+    )
+    assert response.status_code == 409
+    assert "modified by another request" in response.json()["detail"]
+
+    response = client.put(
+        f"/api/reports/{report.id}",
+        json={"status": "Submitted"},
+        headers={**auth_headers, "If-Match": f'"{version}"'},
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == version + 1
+
+
+def test_concurrent_report_update_is_stale(client, auth_headers, db_session, test_user):
+    """Test that a write based on a report read before another write fails."""
+    report = Report(status=ReportStateEnum.draft, created_by=test_user.id)
+    db_session.add(report)
+    db_session.commit()
+    report_id = report.id  # Loads the report, at version 1.
+
+    client.put(
+        f"/api/reports/{report_id}", json={"status": "Submitted"}, headers=auth_headers
+    )
+    report.status = ReportStateEnum.approved
+    with pytest.raises(StaleDataError):
+        db_session.commit()
+    db_session.rollback()
@@ -0,0 +1,146 @@
+# tests/api/test_review_queue.py
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, or_
+
+from api import review_queue
+from api.database import SessionLocal
+from api.enums import ReportStateEnum, UserRoleEnum
+from api.models import AuditLog, Report, User
+
+# Claims take row locks with `SKIP LOCKED`.
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture(scope="function")
+def queued_reports(db_session, test_user):
+    """Creates submitted reports older than any other, so that they are claimed first."""
+    created_at = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    reports = [
+        Report(
+            status=ReportStateEnum.submitted,
+            created_by=test_user.id,
+            created_at=created_at + timedelta(minutes=index),
+        )
+        for index in range(4)
+    ]
+    db_session.add_all(reports)
+    db_session.commit()
+    return [report.id for report in reports]
+
+
+def test_claim_and_release(client, auth_headers, db_session, queued_reports):
+    response = client.post("/api/review-queue/claim?limit=2", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [report["id"] for report in data["reports"]] == queued_reports[:2]
+    assert all(report["status"] == "Under Review" for report in data["reports"])
+    assert data["lease_expires_at"] is not None
+
+    response = client.post("/api/review-queue/claim?limit=2", headers=auth_headers)
+    assert [report["id"] for report in response.json()["reports"]] == queued_reports[2:]
+
+    response = client.post(
+        "/api/review-queue/release",
+        json={"ids": [queued_reports[0], 0]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"ids": [queued_reports[0]]}
+    report = db_session.get(Report, queued_reports[0])
+    assert report.status == ReportStateEnum.submitted
+    assert report.claimed_by is None
+
+
+def test_transition_completes_claim(client, auth_headers, db_session, queued_reports):
+    client.post("/api/review-queue/claim?limit=1", headers=auth_headers)
+    response = client.post(
+        "/api/reports/transitions",
+        json={"ids": [queued_reports[0]], "status": "Approved"},
+        headers=auth_headers,
+    )
+    assert response.json()[0]["outcome"] == "Transitioned"
+
+    report = db_session.get(Report, queued_reports[0])
+    assert (report.claimed_by, report.claim_expires_at) == (None, None)
+
+
+@pytest.fixture(scope="function")
+def committed_queue(test_run_id):
+    """Creates a reviewer and submitted reports older than any other, committed outside of the test's
+    transaction so that separate connections see them, and deletes them after the test.
+    """
+    with SessionLocal() as session:
+        reviewer = User(
+            email=f"reviewer-{test_run_id}@example.com",
+            hashed_password="unused",
+            full_name="Reviewer",
+            role=UserRoleEnum.senior,
+        )
+        session.add(reviewer)
+        session.flush()
+        created_at = datetime(1999, 1, 1, tzinfo=timezone.utc)
+        reports = [
+            Report(
+                status=ReportStateEnum.submitted,
+                created_by=reviewer.id,
+                created_at=created_at + timedelta(minutes=index),
+            )
+            for index in range(4)
+        ]
+        session.add_all(reports)
+        session.commit()
+        session.refresh(reviewer)
+        report_ids = [report.id for report in reports]
+
+    yield reviewer, report_ids
+
+    with SessionLocal() as session:
+        session.query(AuditLog).filter(
+            or_(AuditLog.entity_id.in_(report_ids), AuditLog.user_id == reviewer.id)
+        ).delete()
+        session.query(Report).filter(Report.id.in_(report_ids)).delete()
+        session.query(User).filter(User.id == reviewer.id).delete()
+        session.commit()
+
+
+def test_concurrent_claims_skip_locked_reports(committed_queue):
+    reviewer, queued_reports = committed_queue
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # The first claim holds its row locks until it commits.
+        claimed, _ = review_queue.claim_reports(first, reviewer, 2)
+        skipped, _ = review_queue.claim_reports(second, reviewer, 2)
+        first.commit()
+        second.commit()
+    finally:
+        first.close()
+        second.close()
+
+    assert claimed == queued_reports[:2]
+    assert skipped == queued_reports[2:]
+
+
+def test_expired_claim_can_be_taken_over(
+    client, auth_headers, db_session, queued_reports, test_user
+):
+    claimed, _ = review_queue.claim_reports(db_session, test_user, 1)
+    # Relative to `now()`, the start of the test's transaction, which the claim compares with.
+    db_session.query(Report).filter(Report.id == claimed[0]).update(
+        {"claim_expires_at": func.now() - timedelta(seconds=1)}
+    )
+    db_session.commit()
+
+    response = client.post("/api/review-queue/claim?limit=1", headers=auth_headers)
+    assert [report["id"] for report in response.json()["reports"]] == claimed
+
+    # The first reviewer no longer holds the report, so cannot release it.
+    assert review_queue.release_reports(db_session, test_user, claimed) == []
+    db_session.rollback()
+
+
+def test_claim_requires_senior(client):
+    response = client.post("/api/review-queue/claim")
+    assert response.status_code == 401
@@ -9,6 +9,9 @@ from api.enums import (
     TreatmentStatusEnum,
 )
 
+# The `report_search` table is only maintained on PostgreSQL (`tsvector`, `ON CONFLICT`).
+pytestmark = pytest.mark.postgres
+
 
 @pytest.fixture(scope="function")
 def seeded_reports(db_session, test_user, test_run_id):
@@ -69,13 +72,7 @@ def seeded_reports(db_session, test_user, test_run_id):
 
         reports.append(report)
 
-    yield reports
-
-    # Cleanup all created data
-    db_session.query(Disease).delete()
-    db_session.query(Report).delete()
-    db_session.query(Reporter).filter(Reporter.email.like(f"%{test_run_id}%")).delete()
-    db_session.commit()
+    return reports
 
 
 def test_search_by_status(client, auth_headers, seeded_reports):
@@ -134,3 +131,239 @@ def test_search_invalid_auth(client):
     response = client.get("/api/reports/search")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+@pytest.fixture(scope="function")
+def full_text_reports(db_session, test_user, test_run_id):
+    """Two reports whose search documents share a term in different fields.
+
+    Terms are chosen to contain non-hex letters so they never prefix-match the run id.
+    """
+    reporter = Reporter(
+        first_name="Carol",
+        last_name="White",
+        email=f"reporter-ft-{test_run_id}@example.com",
+        job_title="Doctor",
+        phone_number="+123456789",
+        hospital_name=f"St Mungo {test_run_id}",
+        hospital_address="1 Diagon Alley",
+    )
+    measles = Report(
+        status=ReportStateEnum.draft, created_by=test_user.id, reporter=reporter
+    )
+    rubella = Report(
+        status=ReportStateEnum.draft, created_by=test_user.id, reporter=reporter
+    )
+    measles.disease = Disease(
+        disease_name=f"Measles {test_run_id}",
+        disease_category=DiseaseCategoryEnum.viral,
+        date_detected="2024-01-01",
+        symptoms=["rash"],
+        severity_level=SeverityLevelEnum.high,
+        treatment_status=TreatmentStatusEnum.ongoing,
+    )
+    rubella.disease = Disease(
+        disease_name=f"Rubella {test_run_id}",
+        disease_category=DiseaseCategoryEnum.viral,
+        date_detected="2024-01-01",
+        symptoms=["fever"],
+        severity_level=SeverityLevelEnum.low,
+        lab_results="Measles serology negative",
+        treatment_status=TreatmentStatusEnum.ongoing,
+    )
+    db_session.add_all([measles, rubella])
+    db_session.commit()
+
+    return measles, rubella
+
+
+def test_search_full_text_prefix(client, auth_headers, full_text_reports, test_run_id):
+    _, rubella = full_text_reports
+
+    response = client.get(
+        f"/api/reports/search?q=rube {test_run_id}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert [r["id"] for r in response.json()] == [rubella.id]
+
+
+def test_search_full_text_matches_hospital(
+    client, auth_headers, full_text_reports, test_run_id
+):
+    response = client.get(
+        f"/api/reports/search?q=mungo {test_run_id}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert {r["id"] for r in response.json()} == {r.id for r in full_text_reports}
+
+
+def test_search_full_text_ranks_disease_name_first(
+    client, auth_headers, full_text_reports, test_run_id
+):
+    measles, rubella = full_text_reports
+
+    # Both reports mention measles, but only one in the disease name.
+    response = client.get(
+        f"/api/reports/search?q=measles {test_run_id}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert [r["id"] for r in response.json()] == [measles.id, rubella.id]
+
+
+def test_search_full_text_follows_disease_updates(
+    client, auth_headers, db_session, full_text_reports, test_run_id
+):
+    measles, _ = full_text_reports
+    measles.disease.symptoms = ["koplik spots"]
+    db_session.commit()
+
+    response = client.get(
+        f"/api/reports/search?q=koplik {test_run_id}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert [r["id"] for r in response.json()] == [measles.id]
+
+
+def test_search_full_text_ignores_operators(client, auth_headers, full_text_reports):
+    response = client.get("/api/reports/search?q=!%26|():*", headers=auth_headers)
+
+    assert response.status_code == 200
+
+
+def test_search_summary_follows_write_endpoints(
+    client, auth_headers, test_user, test_run_id
+):
+    """The denormalized search row is updated by every report write endpoint."""
+
+    def summary():
+        response = client.get(
+            f"/api/reports/search/summary?hospital_name={test_run_id}",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    report_id = client.post(
+        "/api/reports/", json={"status": "Draft"}, headers=auth_headers
+    ).json()["id"]
+    client.post(
+        f"/api/reports/{report_id}/reporter",
+        json={
+            "first_name": "Dana",
+            "last_name": "Scully",
+            "email": f"reporter-summary-{test_run_id}@example.com",
+            "job_title": "Doctor",
+            "phone_number": "+123456789",
+            "hospital_name": f"Hospital {test_run_id}",
+            "hospital_address": "1 Main Street",
+        },
+        headers=auth_headers,
+    )
+    client.post(
+        f"/api/reports/{report_id}/disease",
+        json={
+            "disease_name": "Cholera",
+            "disease_category": "Bacterial",
+            "date_detected": "2024-01-01",
+            "symptoms": ["diarrhea"],
+            "severity_level": "High",
+            "treatment_status": "Ongoing",
+        },
+        headers=auth_headers,
+    )
+    patient_ids = [
+        client.post(
+            "/api/reports/patient",
+            json={
+                "first_name": "Test",
+                "last_name": f"Patient {index}",
+                "date_of_birth": "1990-01-01",
+                "gender": "Female",
+                "medical_record_number": f"MRN-{index}-{test_run_id}",
+                "patient_address": "123 Testing Lane",
+            },
+            headers=auth_headers,
+        ).json()["id"]
+        for index in range(2)
+    ]
+    client.post(
+        f"/api/reports/{report_id}/patient",
+        json={"patient_ids": patient_ids},
+        headers=auth_headers,
+    )
+
+    [row] = summary()
+    assert row["id"] == report_id
+    assert row["status"] == "Draft"
+    assert row["disease_name"] == "Cholera"
+    assert row["severity_level"] == "High"
+    assert row["patient_count"] == 2
+
+    client.delete(f"/api/reports/patient/{patient_ids[0]}", headers=auth_headers)
+    client.delete(f"/api/reports/{report_id}/disease", headers=auth_headers)
+    client.put(
+        f"/api/reports/{report_id}", json={"status": "Submitted"}, headers=auth_headers
+    )
+
+    [row] = summary()
+    assert row["status"] == "Submitted"
+    assert row["disease_name"] is None
+    assert row["patient_count"] == 1
+
+    client.delete(f"/api/reports/patient/{patient_ids[1]}", headers=auth_headers)
+
+
+def test_search_faceted_counts(client, auth_headers, seeded_reports, test_run_id):
+    response = client.get(
+        f"/api/reports/search/faceted?hospital_name={test_run_id}&limit=2",
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert [r["id"] for r in data["results"]] == [r.id for r in seeded_reports[:2]]
+    assert data["facets"]["status"] == {
+        "Draft": 1,
+        "Submitted": 1,
+        "Under Review": 0,
+        "Approved": 1,
+    }
+    assert data["facets"]["disease_category"]["Viral"] == 3
+    assert data["facets"]["severity_level"]["Medium"] == 3
+    assert data["facets"]["hospital_name"] == {
+        f"Hospital A {test_run_id}": 2,
+        f"Hospital B {test_run_id}": 1,
+    }
+
+
+def test_search_faceted_drill_down(client, auth_headers, seeded_reports, test_run_id):
+    response = client.get(
+        f"/api/reports/search/faceted?hospital_name={test_run_id}&status=Approved",
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert [r["id"] for r in data["results"]] == [seeded_reports[2].id]
+    assert data["facets"]["status"]["Approved"] == 1
+    assert data["facets"]["status"]["Draft"] == 0
+    assert data["facets"]["hospital_name"] == {f"Hospital A {test_run_id}": 1}
+
+
+def test_search_faceted_no_matches(client, auth_headers, test_run_id):
+    response = client.get(
+        f"/api/reports/search/faceted?q=nothing-{test_run_id}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 0
+    assert data["results"] == []
+    assert sum(data["facets"]["status"].values()) == 0
+    assert data["facets"]["hospital_name"] == {}
@@ -0,0 +1,82 @@
+# tests/api/test_slow_query_log.py
+
+import json
+import logging
+from datetime import datetime
+
+import pytest
+
+from api import slow_query_log
+from api.slow_query_log import parameter_shape
+
+# Plans are sampled with PostgreSQL's `EXPLAIN (ANALYZE, BUFFERS)`.
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture(scope="function")
+def slow_queries(caplog, monkeypatch, tmp_path):
+    """Logs every statement as slow and explains all of them, into a temporary plan file.
+
+    Returns the decoded slow query log entries and a function reading the plan file entries.
+    """
+    monkeypatch.setattr(slow_query_log, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(slow_query_log, "EXPLAIN_RATE", 1)
+    monkeypatch.setattr(slow_query_log, "EXPLAIN_PATH", str(tmp_path / "plans.log"))
+    logger = logging.getLogger("api.slow_queries")
+    logger.addHandler(caplog.handler)
+
+    def plans():
+        with open(tmp_path / "plans.log") as file:
+            return [json.loads(line) for line in file]
+
+    def entries():
+        return [
+            json.loads(record.getMessage())
+            for record in caplog.records
+            if record.name == "api.slow_queries"
+        ]
+
+    try:
+        yield entries, plans
+    finally:
+        logger.removeHandler(caplog.handler)
+
+
+def test_slow_queries_are_logged_and_explained(client, slow_queries):
+    """Test that slow statements are logged with their route and parameter shapes, and explained."""
+    entries, plans = slow_queries
+    assert client.get("/api/reports/0").status_code == 404
+
+    entry = next(entry for entry in entries() if "FROM reports" in entry["statement"])
+    assert entry["route"] == "GET /api/reports/{report_id}"
+    assert entry["endpoint"] == "get_report"
+    assert entry["parameters"] == {"id_1": "int", "param_1": "int"}
+
+    plan = next(plan for plan in plans() if plan["statement"] == entry["statement"])
+    assert "actual time" in plan["plan"]
+    assert "Buffers" in plan["plan"] or "Planning" in plan["plan"]
+
+
+def test_writes_are_not_explained(client, auth_headers, slow_queries):
+    """Test that statements with side effects are logged but never run again by EXPLAIN ANALYZE."""
+    entries, plans = slow_queries
+    response = client.post(
+        "/api/reports/", json={"status": "Draft"}, headers=auth_headers
+    )
+    assert response.status_code == 201
+
+    inserts = [entry for entry in entries() if entry["statement"].startswith("INSERT")]
+    assert inserts and inserts[0]["route"] == "POST /api/reports/"
+    assert not any(plan["statement"].startswith("INSERT") for plan in plans())
+
+
+def test_parameter_shape():
+    """Test that parameter values are replaced by their shapes."""
+    assert parameter_shape(
+        {"id": 1, "q": "fever", "ids": [1, 2, 3], "at": datetime.now(), "x": None}
+    ) == {"id": "int", "q": "str", "ids": "list[3]", "at": "datetime", "x": "null"}
+    assert parameter_shape([{"id": 1}, {"id": 2}]) == {
+        "rows": 2,
+        "each": {"id": "int"},
+    }
+    assert parameter_shape((1, "a")) == ["int", "str"]
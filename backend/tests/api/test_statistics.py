@@ -46,13 +46,7 @@ def setup_statistics_data(db_session, test_user, test_run_id):
     report.patients.append(patient)
     db_session.commit()
 
-    yield report, disease, patient
-
-    # ✅ Only delete report (handles disease + associations)
-    db_session.query(Report).filter(Report.id == report.id).delete()
-    # ✅ Clean up patient explicitly
-    db_session.query(Patient).filter(Patient.id == patient.id).delete()
-    db_session.commit()
+    return report, disease, patient
 
 
 def test_statistics_authenticated(client, auth_headers, setup_statistics_data):
@@ -78,3 +72,35 @@ def test_statistics_unauthenticated(client):
     response = client.get("/api/statistics")
     assert response.status_code == 401
     assert response.json()["detail"] == "Not authenticated"
+
+
+def test_statistics_match_table_counts(
+    client, auth_headers, db_session, setup_statistics_data
+):
+    """Test that every figure, computed in a single statement, matches a count of its own."""
+    response = client.get("/api/statistics", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["total_reports"] == db_session.query(Report).count()
+    assert sum(data["reports_by_status"].values()) == data["total_reports"]
+    for status in ReportStateEnum:
+        assert (
+            data["reports_by_status"][status.value]
+            == db_session.query(Report).filter(Report.status == status).count()
+        )
+    for category in DiseaseCategoryEnum:
+        assert (
+            data["diseases_by_category"][category.value]
+            == db_session.query(Disease)
+            .filter(Disease.disease_category == category)
+            .count()
+        )
+    for severity in SeverityLevelEnum:
+        assert (
+            data["diseases_by_severity"][severity.value]
+            == db_session.query(Disease)
+            .filter(Disease.severity_level == severity)
+            .count()
+        )
+    assert data["average_patient_age"] is not None
@@ -1,19 +1,94 @@
+import os
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from api.main import app
-from api.database import SessionLocal
-from api.models import User, Report, Reporter, Patient, Disease, AuditLog
+from api.database import SessionLocal, get_engine
+from api.dependencies import get_db
+from api.models import Base, User
 from api.enums import UserRoleEnum
+from api.instrumentation import current_metrics, is_transaction_control
 from api.endpoints.auth import hash_password
+from tests.databases import drop_worker_database, prepare_worker_database
 import uuid
 
+# Database of the fast profile: in memory, shared by every session of the process.
+SQLITE_URL = "sqlite://"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--sqlite",
+        action="store_true",
+        help="Run the tests on an in-memory SQLite database, skipping those marked `postgres`.",
+    )
+
+
+def pytest_configure(config):
+    # Before the first use of the engine, which reads DATABASE_URL.
+    if config.getoption("sqlite"):
+        os.environ["DATABASE_URL"] = SQLITE_URL
+        Base.metadata.create_all(get_engine())
+    else:
+        # Under xdist, each worker has its own database.
+        prepare_worker_database()
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption("sqlite"):
+        return
+    skip = pytest.mark.skip(reason="needs PostgreSQL, skipped by --sqlite")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_sessionfinish(session):
+    if os.getenv("PYTEST_XDIST_WORKER") and not session.config.getoption("sqlite"):
+        get_engine().dispose()
+        drop_worker_database()
+
 
 @pytest.fixture(scope="function")
-def client():
-    """FastAPI test client."""
-    with TestClient(app) as c:
-        yield c
+def connection():
+    """Database connection of the test, in a transaction rolled back after it.
+
+    Sessions of the test and of the requests it sends are bound to this connection, and commit to
+    savepoints: they see each other's changes, and nothing is left in the database after the test.
+    Postgres' `now()` is the start of the transaction, so stays the same for the whole test.
+    """
+    with get_engine().connect() as connection:
+        transaction = connection.begin()
+        try:
+            yield connection
+        finally:
+            transaction.rollback()
+
+
+def bound_session(connection) -> Session:
+    """Session on the test's connection, whose commits release a savepoint instead of committing."""
+    return SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+
+
+@pytest.fixture(scope="function")
+def client(connection):
+    """FastAPI test client, whose requests use the test's connection."""
+
+    def get_test_db():
+        db = bound_session(connection)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.pop(get_db, None)
 
 
 @pytest.fixture(scope="function")
@@ -23,18 +98,137 @@ def test_run_id():
 
 
 @pytest.fixture(scope="function")
-def db_session():
-    """Provides a database session for each test function."""
-    db = SessionLocal()
+def db_session(connection):
+    """Provides a database session for each test function, on the test's connection."""
+    db = bound_session(connection)
     try:
         yield db
     finally:
         db.close()
 
 
+@pytest.fixture(scope="function")
+def query_counter():
+    """Counts the SQL statements executed on the application engine, except savepoint statements.
+
+    Usage:
+        with query_counter() as statements:
+            client.get(...)
+        assert len(statements) == 2
+    """
+
+    @contextmanager
+    def count():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if not is_transaction_control(statement):
+                statements.append(statement)
+
+        event.listen(get_engine(), "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(get_engine(), "before_cursor_execute", record)
+
+    return count
+
+
+# Maximum number of SQL statements per request, by endpoint function, including the lookup of the
+# authenticated user. Reads are bounded whatever the number of rows they return: a budget exceeded by a
+# new test usually means a relationship is loaded row by row (N+1). Every endpoint reached by a test
+# must have one.
+#
+# Budgets are the most statements measured by the test suite (on PostgreSQL and SQLite), with a margin
+# of one statement for writes, whose counts depend on the optional relationships of the rows they change
+# (a created report's reporter is only loaded if it has one), and none for reads. Neither depend on the
+# number of rows: `tests/api/test_query_counts.py` checks that writes with one and several patients
+# run the same statements, so that a statement per row cannot hide in the margin.
+#
+# Comments list the statements of each count: "user" is the authenticated user lookup, "index" the
+# version bump of the changed reports and the refresh of their `report_search` rows (PostgreSQL only),
+# and "audit" the user reload and entry insert of `log_audit_event`, which commits on its own, after
+# which the response is reloaded.
+QUERY_BUDGETS = {
+    # Authentication
+    "signup": 3 + 1,  # email check, insert, refresh
+    "login": 1,  # user
+    # Reports
+    "list_reports": 3,  # page of IDs and versions, reports, patients
+    "get_report": 3,  # validators, report, patients
+    "get_reports_batch": 2,  # reports, patients
+    "search_reports": 3,  # matching IDs, reports, patients
+    "search_report_summaries": 1,  # summaries
+    "search_reports_faceted": 4,  # facet counts, matching IDs, reports, patients
+    # user, insert, index, refresh, audit, report, patients, disease
+    "create_report": 10 + 1,
+    # user, report, update, index, refresh, audit, report, reporter, patients, disease
+    "update_report": 12 + 1,
+    # user, report, disease, patients, delete links, disease and report, audit
+    "delete_report": 9 + 1,
+    # user, update, search rows, audit entries, states of the other reports
+    "transition_reports": 5 + 1,
+    "export_reports": 3,  # user, reports, audit entry
+    # Sub-resources
+    "get_disease": 1,  # report with disease
+    # user, report, insert or update, index, refresh, audit, disease
+    "create_or_update_disease": 9 + 1,
+    "delete_disease": 7 + 1,  # user, report with disease, delete, index, audit
+    "get_reporter_by_report": 1,  # report with reporter
+    # user, report, reporter lookup, insert, report update, index, refresh, audit, reporter
+    "add_or_update_reporter": 11 + 1,
+    "get_patients_for_report": 1,  # report with patients
+    "get_patient_by_id": 1,  # patient
+    "create_patient": 6 + 1,  # user, insert, refresh, audit, patient
+    # user, report, patients, current links, delete and insert links, index, refresh, audit,
+    # report, patients
+    "add_or_update_patients_to_report": 13 + 1,
+    # user, patient, its reports, delete links, delete patient, index, audit
+    "delete_patient": 9 + 1,
+    # Review queue
+    # user, claim, search rows, audit entries, reports, patients
+    "claim_reports": 6 + 1,
+    "release_reports": 4 + 1,  # user, release, search rows, audit entries
+    # Reporting
+    "get_statistics": 2,  # user, counts
+    "get_audit_logs": 2,  # user, entries
+}
+
+
+@pytest.fixture(scope="function", autouse=True)
+def query_budgets():
+    """Fails the test if one of its requests executes more statements than its endpoint's budget."""
+    # Statements of each request, by request metrics (see `api/instrumentation.py`).
+    requests = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        metrics = current_metrics()
+        if is_transaction_control(statement):
+            return
+        if metrics is not None and metrics.scope and "endpoint" in metrics.scope:
+            requests.setdefault(id(metrics), (metrics, []))[1].append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        yield
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+
+    for metrics, statements in requests.values():
+        endpoint = metrics.scope["endpoint"].__name__
+        if endpoint not in QUERY_BUDGETS:
+            pytest.fail(f"{endpoint} has no query budget in QUERY_BUDGETS")
+        if len(statements) > QUERY_BUDGETS[endpoint]:
+            pytest.fail(
+                f"{endpoint} executed {len(statements)} statements, "
+                f"over its budget of {QUERY_BUDGETS[endpoint]}:\n\n"
+                + "\n\n".join(statements)
+            )
+
+
 @pytest.fixture(scope="function")
 def test_user(db_session: Session, test_run_id: str):
-    """Creates a test user with cleanup after test."""
+    """Creates a test user."""
     email = f"testuser-{test_run_id}@example.com"
     user = User(
         email=email,
@@ -45,18 +239,7 @@ def test_user(db_session: Session, test_run_id: str):
     db_session.add(user)
     db_session.commit()
     db_session.refresh(user)
-    yield user
-
-    # Cleanup cascade deletions for isolation
-    db_session.query(Report).filter(Report.created_by == user.id).delete()
-    db_session.query(Reporter).filter(Reporter.email.like(f"%{test_run_id}%")).delete()
-    db_session.query(Patient).filter(
-        Patient.medical_record_number.like(f"%{test_run_id}%")
-    ).delete()
-    db_session.query(Disease).delete()
-    db_session.query(AuditLog).filter(AuditLog.user_id == user.id).delete()
-    db_session.query(User).filter(User.id == user.id).delete()
-    db_session.commit()
+    return user
 
 
 @pytest.fixture(scope="function")
@@ -70,23 +253,11 @@ def signup_payload(test_run_id):
 
 
 @pytest.fixture(scope="function")
-def auth_headers(client, db_session, signup_payload, test_run_id):
+def auth_headers(client, signup_payload):
     client.post("/api/auth/signup", json=signup_payload)
     response = client.post(
         "/api/auth/login",
         json={"email": signup_payload["email"], "password": signup_payload["password"]},
     )
     token = response.json()["access_token"]
-
-    yield {"Authorization": f"Bearer {token}"}
-
-    # Cleanup block after test finishes
-    from api.models import User, AuditLog, Report
-
-    # Cleanup user
-    user = db_session.query(User).filter(User.email == signup_payload["email"]).first()
-    if user:
-        db_session.query(Report).filter(Report.created_by == user.id).delete()
-        db_session.query(AuditLog).filter(AuditLog.user_id == user.id).delete()
-        db_session.delete(user)
-        db_session.commit()
+    return {"Authorization": f"Bearer {token}"}
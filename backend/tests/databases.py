@@ -0,0 +1,139 @@
+"""
+Test Databases
+
+Under pytest-xdist (`pytest -n auto`), every worker runs its tests on its own database, so that workers
+never see, lock, or count each other's rows:
+
+- A template database, `<database>_template`, is migrated to the Alembic head, once: it is rebuilt only
+  when its revision is not the head any more.
+- Each worker's database, `<database>_<worker>` (e.g. `outbreak_gw0`), is a copy of the template made
+  by `CREATE DATABASE ... TEMPLATE`, which copies files rather than replaying the migrations.
+
+`<database>` is the database of `DATABASE_URL`, on whose server the others are created: its user must
+be allowed to create databases. Workers take turns, under an advisory lock, as a template cannot be
+copied while another session is connected to it. Without xdist, tests run on `DATABASE_URL` itself,
+which must be migrated as before.
+"""
+
+import os
+import subprocess
+import sys
+from typing import Optional
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import DBAPIError
+
+BACKEND_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Key of the advisory lock held while the template is built or copied.
+TEMPLATE_LOCK = 0x7E57DB
+
+
+def _server_url() -> URL:
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        pass
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        raise ValueError("DATABASE_URL environment variable is not set.")
+    return make_url(url)
+
+
+def _execute_autocommit(url: URL, *statements: str) -> None:
+    engine = create_engine(url, isolation_level="AUTOCOMMIT")
+    try:
+        with engine.connect() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+    finally:
+        engine.dispose()
+
+
+def _template_revision(url: URL) -> Optional[str]:
+    """Alembic revision of the template, or None if it does not exist or is not migrated."""
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            return connection.execute(
+                text("SELECT version_num FROM alembic_version")
+            ).scalar()
+    except DBAPIError:
+        return None
+    finally:
+        engine.dispose()
+
+
+def _build_template(admin: URL, template: URL) -> None:
+    _execute_autocommit(
+        admin,
+        f'DROP DATABASE IF EXISTS "{template.database}" WITH (FORCE)',
+        f'CREATE DATABASE "{template.database}"',
+    )
+    # In a separate process, as the migrations configure logging and read `DATABASE_URL`.
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIRECTORY,
+        env={
+            **os.environ,
+            "DATABASE_URL": template.render_as_string(hide_password=False),
+        },
+        check=True,
+    )
+
+
+def prepare_worker_database() -> None:
+    """Point `DATABASE_URL` at a fresh copy of the migrated template, in an xdist worker.
+
+    Does nothing outside xdist workers. Must run before the application engine is created, as it reads
+    `DATABASE_URL` then.
+    """
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if not worker:
+        return
+    url = _server_url()
+    admin = url.set(database="postgres")
+    template = url.set(database=f"{url.database}_template")
+    database = url.set(database=f"{url.database}_{worker}")
+    head = ScriptDirectory.from_config(
+        Config(os.path.join(BACKEND_DIRECTORY, "alembic.ini"))
+    ).get_current_head()
+
+    engine = create_engine(admin, isolation_level="AUTOCOMMIT")
+    try:
+        with engine.connect() as lock:
+            lock.execute(text("SELECT pg_advisory_lock(:key)"), {"key": TEMPLATE_LOCK})
+            try:
+                if _template_revision(template) != head:
+                    _build_template(admin, template)
+                _execute_autocommit(
+                    admin,
+                    f'DROP DATABASE IF EXISTS "{database.database}" WITH (FORCE)',
+                    f'CREATE DATABASE "{database.database}" '
+                    f'TEMPLATE "{template.database}"',
+                )
+            finally:
+                lock.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": TEMPLATE_LOCK}
+                )
+    finally:
+        engine.dispose()
+
+    os.environ["DATABASE_URL"] = database.render_as_string(hide_password=False)
+
+
+def drop_worker_database() -> None:
+    """Drop the database of this xdist worker, once its tests have run."""
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if not worker:
+        return
+    database = _server_url()
+    _execute_autocommit(
+        database.set(database="postgres"),
+        f'DROP DATABASE IF EXISTS "{database.database}" WITH (FORCE)',
+    )
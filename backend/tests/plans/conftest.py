@@ -0,0 +1,101 @@
+"""
+Query Plan Fixtures
+
+`plan_connection` seeds a large synthetic dataset in a transaction that is never committed, refreshes
+the planner statistics, and yields the connection: plans taken on it are those the endpoints' statements
+would get on a production-sized database, while the rest of the suite, on other connections, never sees
+the rows. The transaction is rolled back after the last plan test of the module.
+
+`ANALYZE` writes the row counts of `pg_class` in place, outside of the transaction, so the rollback
+leaves the seeded counts behind. Every table is analyzed again after it, or later plans, including those
+of the next run of these tests, would be estimated for 50,000 reports on nearly empty tables.
+
+`PLAN_TEST_REPORTS` sets the number of reports: 50,000 by default, enough for the planner to choose the
+plans it would in production (on smaller tables, it rightly prefers sequential scans). Other tables are
+sized from it.
+"""
+
+import os
+
+import pytest
+from sqlalchemy import Connection, text
+
+from api.database import get_engine
+from api.search_index import sync_report_search
+
+PLAN_TEST_REPORTS = int(os.getenv("PLAN_TEST_REPORTS", "50000"))
+
+SEED_STATEMENTS = (
+    "INSERT INTO users (email, hashed_password, full_name, is_active, role) "
+    "SELECT 'plan-test-' || g || '@example.com', 'not-a-hash', 'Plan Test ' || g, true, "
+    "(ARRAY['junior', 'senior'])[1 + g % 2]::userroleenum "
+    "FROM generate_series(1, 50) AS g",
+    # Reporters from a few hundred hospitals.
+    "INSERT INTO reporters (first_name, last_name, email, job_title, phone_number, hospital_name, "
+    "hospital_address) "
+    "SELECT 'Reporter', 'Plan ' || g, 'plan-test-' || g || '@example.com', 'Epidemiologist', "
+    "'+440000000000', 'Hospital ' || g % 300, g || ' Plan Street' "
+    "FROM generate_series(1, :reports / 40) AS g",
+    # Reports spread over two years, mostly approved, as in a long-running system.
+    "INSERT INTO reports (status, created_at, created_by, reporter_id) "
+    "SELECT (ARRAY['draft', 'submitted', 'under_review', 'approved', 'approved', 'approved', "
+    "'approved', 'approved'])[1 + g % 8]::reportstateenum, "
+    "now() - (g % 730) * interval '1 day', u.first_id + g % 50, r.first_id + g % (:reports / 40) "
+    "FROM generate_series(1, :reports) AS g, "
+    "(SELECT min(id) AS first_id FROM users WHERE email LIKE 'plan-test-%') AS u, "
+    "(SELECT min(id) AS first_id FROM reporters WHERE email LIKE 'plan-test-%') AS r",
+    "INSERT INTO diseases (disease_name, disease_category, date_detected, symptoms, severity_level, "
+    "lab_results, treatment_status, report_id) "
+    "SELECT (ARRAY['Influenza', 'Measles', 'Cholera', 'Malaria', 'Dengue'])[1 + id % 5], "
+    "(ARRAY['viral', 'viral', 'bacterial', 'parasitic', 'viral'])[1 + id % 5]::diseasecategoryenum, "
+    'created_at::date, \'["fever", "cough"]\'::json, '
+    "(ARRAY['low', 'medium', 'high', 'critical'])[1 + id % 4]::severitylevelenum, "
+    "'Sample ' || id || ' positive', 'ongoing'::treatmentstatusenum, id "
+    "FROM reports WHERE reporter_id IN (SELECT id FROM reporters WHERE email LIKE 'plan-test-%')",
+    "INSERT INTO patients (first_name, last_name, date_of_birth, gender, medical_record_number, "
+    "patient_address, emergency_contact) "
+    "SELECT 'Patient', 'Plan ' || g, date '1940-01-01' + g % 30000, "
+    "(ARRAY['male', 'female', 'other'])[1 + g % 3]::genderenum, 'plan-test-' || g, "
+    "g || ' Plan Road', 'Next of kin' "
+    "FROM generate_series(1, :reports * 2) AS g",
+    # Three patients per report.
+    "INSERT INTO patient_reports (patient_id, report_id) "
+    "SELECT p.first_id + (r.id * 7 + k) % (:reports * 2), r.id "
+    "FROM reports r, generate_series(0, 2) AS k, "
+    "(SELECT min(id) AS first_id FROM patients WHERE medical_record_number LIKE 'plan-test-%') AS p "
+    "WHERE r.reporter_id IN (SELECT id FROM reporters WHERE email LIKE 'plan-test-%')",
+    # Five audit entries per report.
+    "INSERT INTO audit_logs (timestamp, user_id, action, entity_type, entity_id, changes) "
+    "SELECT r.created_at + k * interval '1 hour', r.created_by, "
+    "(ARRAY['CREATE', 'UPDATE', 'UPDATE', 'UPDATE', 'UPDATE'])[1 + k], 'Report', r.id, NULL "
+    "FROM reports r, generate_series(0, 4) AS k "
+    "WHERE r.reporter_id IN (SELECT id FROM reporters WHERE email LIKE 'plan-test-%')",
+)
+
+
+def seed(connection: Connection, reports: int) -> None:
+    """Insert the synthetic dataset, and refresh the planner statistics of every table."""
+    for statement in SEED_STATEMENTS:
+        connection.execute(text(statement), {"reports": reports})
+        # The next statements select from this table: without fresh statistics, the planner takes it
+        # for the few rows the rest of the suite leaves, and joins it by nested loops.
+        connection.execute(text(f"ANALYZE {statement.split()[2]}"))
+    reporter_ids = connection.execute(
+        text("SELECT id FROM reporters WHERE email LIKE 'plan-test-%'")
+    ).scalars()
+    sync_report_search(connection, reporter_ids=reporter_ids)
+    connection.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope="module")
+def plan_connection():
+    """Connection to a database holding `PLAN_TEST_REPORTS` uncommitted synthetic reports."""
+    with get_engine().connect() as connection:
+        transaction = connection.begin()
+        try:
+            seed(connection, PLAN_TEST_REPORTS)
+            yield connection
+        finally:
+            transaction.rollback()
+            with connection.begin():
+                connection.execute(text("ANALYZE"))
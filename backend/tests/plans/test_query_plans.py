@@ -0,0 +1,214 @@
+# tests/plans/test_query_plans.py
+"""
+Query plan regression tests.
+
+Each case sends one request through the application, records the SQL statements it executes, and runs
+them through `EXPLAIN` on the seeded `plan_connection` (see `conftest.py`). The plans must:
+
+- not scan `reports`, `audit_logs`, `patient_reports` (or the other large tables) sequentially, unless
+  the case allows it: endpoints aggregating over a whole table read all of it whatever the plan;
+- stay under the case's estimated cost bound (in planner cost units).
+
+A model change dropping an index, or a query change defeating one, fails here before it reaches a
+production-sized database.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional
+
+import pytest
+from sqlalchemy import Connection, event
+
+from api.database import get_engine
+
+# Plans are PostgreSQL's, over the seeded plan database.
+pytestmark = pytest.mark.postgres
+
+# Tables seeded with tens of thousands of rows or more.
+LARGE_TABLES = frozenset(
+    {
+        "reports",
+        "audit_logs",
+        "patient_reports",
+        "patients",
+        "diseases",
+        "report_search",
+    }
+)
+
+# Lookups and pages of a few rows cost tens of units, so this leaves room for growth but not for a plan
+# reading a whole table. Cases that read many rows by design set their own bound.
+DEFAULT_MAX_COST = 500.0
+
+
+@dataclass(frozen=True)
+class PlanCase:
+    """A request, and the bounds on the plans of its statements.
+
+    Attributes:
+        name (str): Test ID.
+        method (str): HTTP method.
+        path (str): Request path, with its query string.
+        json (Any): Request body.
+        seq_scans (FrozenSet[str]): Large tables the request may scan sequentially.
+        max_cost (float): Upper bound on the estimated total cost of each statement.
+    """
+
+    name: str
+    method: str
+    path: str
+    json: Any = None
+    seq_scans: FrozenSet[str] = field(default_factory=frozenset)
+    max_cost: float = DEFAULT_MAX_COST
+
+
+CASES = [
+    PlanCase("list_reports", "GET", "/api/reports/?skip=0&limit=20"),
+    # Offset pagination walks the skipped rows of the index: cost grows with the page number.
+    PlanCase(
+        "list_reports_deep_page",
+        "GET",
+        "/api/reports/?skip=10000&limit=20",
+        max_cost=15000.0,
+    ),
+    PlanCase("get_report", "GET", "/api/reports/{report_id}"),
+    PlanCase(
+        "get_reports_batch", "POST", "/api/reports/batch", json={"ids": [1, 2, 3]}
+    ),
+    # A fifth of the reports match: all of them are ranked to find the best 20.
+    PlanCase(
+        "search_reports",
+        "GET",
+        "/api/reports/search?q=influenza&limit=20",
+        max_cost=5000.0,
+    ),
+    PlanCase(
+        "search_reports_filtered",
+        "GET",
+        "/api/reports/search?status=Submitted&hospital_name=Hospital%201&limit=20",
+    ),
+    PlanCase(
+        "search_report_summaries",
+        "GET",
+        "/api/reports/search/summary?q=influenza",
+        max_cost=5000.0,
+    ),
+    PlanCase(
+        "search_reports_faceted",
+        "GET",
+        "/api/reports/search/faceted?q=cholera",
+        max_cost=5000.0,
+    ),
+    PlanCase("get_audit_logs", "GET", "/api/audit-logs/?limit=20"),
+    PlanCase(
+        "get_audit_logs_by_date",
+        "GET",
+        "/api/audit-logs/?start_date=2024-01-01T00:00:00&end_date=2024-01-02T00:00:00",
+    ),
+    # Counts over every report, disease and patient.
+    PlanCase(
+        "get_statistics",
+        "GET",
+        "/api/statistics",
+        seq_scans=frozenset({"reports", "diseases", "patients", "patient_reports"}),
+        max_cost=15000.0,
+    ),
+    # The claimable reports (a quarter of them) are sorted to find the oldest.
+    PlanCase(
+        "claim_reports", "POST", "/api/review-queue/claim?limit=10", max_cost=3000.0
+    ),
+    PlanCase(
+        "transition_reports",
+        "POST",
+        "/api/reports/transitions",
+        json={"ids": [1, 2, 3], "status": "Submitted"},
+    ),
+]
+
+
+@pytest.fixture(scope="function")
+def recorded_statements():
+    """Records the statements, and their parameters, executed on the application engine."""
+    statements: List[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+
+
+@pytest.fixture(scope="function")
+def sample_report(client, auth_headers):
+    """A report with a reporter, a disease, and a patient, so that every loader query runs."""
+    report_id = client.post(
+        "/api/reports/", json={"status": "Draft"}, headers=auth_headers
+    ).json()["id"]
+    client.post(
+        f"/api/reports/{report_id}/reporter",
+        json={
+            "first_name": "Plan",
+            "last_name": "Test",
+            "email": f"plan-sample-{report_id}@example.com",
+            "job_title": "Doctor",
+            "phone_number": "+447911123456",
+            "hospital_name": "Hospital 1",
+            "hospital_address": "1 Plan Street",
+        },
+        headers=auth_headers,
+    )
+    return report_id
+
+
+def plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield the nodes of a JSON plan, depth first."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(
+    connection: Connection, statement: str, parameters: Any
+) -> Optional[Dict[str, Any]]:
+    """Return the root node of the estimated plan of a statement, None if it has none."""
+    if (
+        not statement.lstrip()
+        .upper()
+        .startswith(("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"))
+    ):
+        return None
+    with connection.begin_nested():
+        result = connection.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + statement, parameters
+        ).scalar_one()
+    return result[0]["Plan"]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+def test_query_plan(
+    case, plan_connection, client, auth_headers, sample_report, recorded_statements
+):
+    path = case.path.format(report_id=sample_report)
+    recorded_statements.clear()
+    response = client.request(case.method, path, json=case.json, headers=auth_headers)
+    assert response.status_code < 500
+    assert recorded_statements, f"{case.name} executed no statement"
+
+    for statement, parameters in recorded_statements:
+        plan = explain(plan_connection, statement, parameters)
+        if plan is None:
+            continue
+        scanned = {
+            node["Relation Name"]
+            for node in plan_nodes(plan)
+            if node["Node Type"] == "Seq Scan"
+            and node["Relation Name"] in LARGE_TABLES - case.seq_scans
+        }
+        assert not scanned, f"Sequential scan of {sorted(scanned)} in:\n{statement}"
+        assert (
+            plan["Total Cost"] <= case.max_cost
+        ), f"Estimated cost {plan['Total Cost']} above {case.max_cost} for:\n{statement}"
@@ -0,0 +1,247 @@
+import multiprocessing
+from datetime import datetime, timezone
+
+from prometheus_client import REGISTRY
+
+from api import cache as cache_module
+from api.cache import (
+    Cache,
+    CacheBackend,
+    CachedReport,
+    LocalCacheBackend,
+    LRUCache,
+    SharedCacheBackend,
+    SharedStore,
+)
+from api.enums import ReportStateEnum
+
+
+def make_cache(max_entries=3, max_size=100) -> LRUCache[bytes]:
+    return LRUCache(max_entries=max_entries, max_size=max_size, size=len)
+
+
+def test_evicts_least_recently_used_entry():
+    cache = make_cache()
+    for key in "abc":
+        cache.set(key, b"x")
+    cache.get("a")
+    cache.set("d", b"x")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == [b"x", b"x", b"x"]
+    assert len(cache) == 3
+
+
+def test_evicts_to_stay_within_max_size():
+    cache = make_cache(max_entries=10, max_size=10)
+    cache.set("a", b"x" * 4)
+    cache.set("b", b"x" * 4)
+    cache.set("c", b"x" * 4)
+
+    assert cache.get("a") is None
+    assert cache.total_size == 8
+
+
+def test_replacing_an_entry_updates_total_size():
+    cache = make_cache()
+    cache.set("a", b"x" * 10)
+    cache.set("a", b"x" * 3)
+
+    assert cache.total_size == 3
+    assert len(cache) == 1
+
+
+def test_oversized_value_is_not_stored():
+    cache = make_cache(max_size=5)
+    cache.set("a", b"x")
+
+    assert cache.set("b", b"x" * 6) is False
+    assert cache.get("b") is None
+    assert cache.get("a") == b"x"
+
+
+def test_invalidate_and_clear():
+    cache = make_cache()
+    cache.set("a", b"x")
+    cache.set("b", b"yy")
+
+    cache.invalidate(["a", "missing"])
+    assert cache.get("a") is None
+    assert cache.total_size == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.total_size == 0
+
+
+def test_stale_generation_is_not_stored():
+    cache = make_cache()
+    generation = cache.generation
+    cache.invalidate(["a"])
+
+    assert cache.set("a", b"stale", generation) is False
+    assert cache.get("a") is None
+    assert cache.set("a", b"fresh", cache.generation) is True
+
+
+def test_cached_report_validators():
+    modified_at = datetime(2024, 3, 1, 12, 30, 15, tzinfo=timezone.utc)
+    draft = CachedReport(7, 3, modified_at, ReportStateEnum.draft, b"{}")
+    submitted = CachedReport(7, 4, modified_at, ReportStateEnum.submitted, b"{}")
+    approved = CachedReport(7, 5, modified_at, ReportStateEnum.approved, b"{}")
+
+    assert draft.etag == '"3"'
+    assert draft.headers["Last-Modified"] == "Fri, 01 Mar 2024 12:30:15 GMT"
+    assert not draft.is_read_only
+    assert not submitted.is_read_only
+    assert approved.is_read_only
+
+
+def test_only_broadcasting_caches_are_coherent(tmp_path):
+    backend = LocalCacheBackend(max_entries=10, max_size=100)
+    assert not Cache("test", backend, encode=bytes, decode=bytes).is_coherent
+    assert make_worker(SharedStore(str(tmp_path / "cache.sqlite3"))).is_coherent
+
+
+def make_worker(store: SharedStore, backend: CacheBackend = None) -> Cache[bytes]:
+    """A cache as built in one worker process, broadcasting through `store`."""
+    backend = backend or LocalCacheBackend(max_entries=10, max_size=100)
+    return Cache("test", backend, encode=bytes, decode=bytes, broadcast=store)
+
+
+def test_shared_store_commands(tmp_path):
+    store = SharedStore(str(tmp_path / "cache.sqlite3"))
+
+    assert store.get("a") is None
+    assert store.set("a", b"1") is True
+    assert store.get("a") == b"1"
+    assert store.delete("a", "missing") == 1
+    assert store.get("a") is None
+
+    first = store.publish("channel", "hello")
+    store.publish("other", "ignored")
+    assert store.messages("channel", 0) == [(first, "hello")]
+    assert store.messages("channel", first) == []
+    assert store.last_message_id() == first + 1
+
+
+def test_shared_store_watch(tmp_path):
+    store = SharedStore(str(tmp_path / "cache.sqlite3"))
+    seen = store.last_message_id()
+    store.publish("other", "unrelated")
+    assert store.set("a", b"1", watch=("channel", seen)) is True
+
+    store.publish("channel", "invalidated")
+    assert store.set("a", b"2", watch=("channel", seen)) is False
+    assert store.get("a") == b"1"
+
+
+def test_shared_store_reports_missed_messages(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "MESSAGE_HISTORY", 2)
+    store = SharedStore(str(tmp_path / "cache.sqlite3"))
+    for index in range(4):
+        store.publish("channel", str(index))
+
+    assert store.messages("channel", 0) is None
+    assert store.messages("channel", 2) == [(3, "2"), (4, "3")]
+
+
+def test_invalidations_are_broadcast_to_other_workers(tmp_path):
+    store = SharedStore(str(tmp_path / "cache.sqlite3"))
+    first, second = make_worker(store), make_worker(store)
+    for worker in (first, second):
+        worker.set("a", b"1")
+        worker.set("b", b"2")
+
+    first.invalidate(["a"])
+    assert second.get("a") is None
+    assert second.get("b") == b"2"
+    assert second.stats.remote_invalidations == 1
+    assert first.stats.remote_invalidations == 0
+
+    second.clear()
+    assert first.get("b") is None
+
+
+def test_broadcast_invalidation_rejects_stale_writes(tmp_path):
+    store = SharedStore(str(tmp_path / "cache.sqlite3"))
+    reader, writer = make_worker(store), make_worker(store)
+    generation = reader.generation
+
+    writer.invalidate(["a"])
+
+    assert reader.set("a", b"stale", generation) is False
+    assert reader.get("a") is None
+
+
+def test_shared_backend(tmp_path):
+    store = SharedStore(str(tmp_path / "cache.sqlite3"))
+    backend = SharedCacheBackend(store, "test:", max_entries=2, max_size=100)
+    first, second = make_worker(store, backend), make_worker(store, backend)
+
+    first.set("a", b"1")
+    assert second.get("a") == b"1"
+
+    first.set("b", b"2")
+    first.set("c", b"3")
+    assert second.get("a") is None
+    assert store.get("test:c") == b"3"
+
+    second.invalidate(["c"])
+    assert first.get("c") is None
+
+
+def test_invalidation_reaches_forked_worker(tmp_path):
+    store = SharedStore(str(tmp_path / "cache.sqlite3"))
+    worker = make_worker(store)
+    worker.set("a", b"1")
+
+    process = multiprocessing.get_context("fork").Process(
+        target=worker.invalidate, args=(["a"],)
+    )
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+    assert worker.get("a") is None
+
+
+def test_cache_stats():
+    cache = Cache("test", LocalCacheBackend(10, 100), encode=bytes, decode=bytes)
+    cache.get("a")
+    cache.set("a", b"1")
+    cache.get("a")
+    cache.invalidate(["a"])
+
+    stats = cache.stats.as_dict()
+    assert (stats["hits"], stats["misses"], stats["sets"]) == (1, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+    assert stats["invalidations"] == 1
+    assert stats["calls"] == {"get": 2, "set": 1, "invalidate": 1}
+
+
+def test_cache_metrics():
+    cache = Cache("metrics", LocalCacheBackend(10, 100), encode=bytes, decode=bytes)
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, {"cache": "metrics", **labels})
+
+    cache.get("a")
+    cache.set("a", b"12")
+    cache.get("a")
+    assert sample("cache_reads_total", result="hit") == 1
+    assert sample("cache_reads_total", result="miss") == 1
+    assert sample("cache_writes_total", result="stored") == 1
+    assert sample("cache_operation_seconds_count", operation="get") == 2
+    assert (sample("cache_entries"), sample("cache_size_bytes")) == (1, 2)
+
+    cache.invalidate(["a"])
+    assert sample("cache_invalidations_total", origin="local") == 1
+    assert (sample("cache_entries"), sample("cache_size_bytes")) == (0, 0)
+
+
+def test_cached_report_encoding():
+    modified_at = datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    entry = CachedReport(7, 3, modified_at, ReportStateEnum.submitted, b'{"a":\n1}')
+
+    assert CachedReport.decode(entry.encode()) == entry
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+
+import pytest
+from starlette.requests import Request
+
+from fastapi import HTTPException
+
+from api.conditional import (
+    check_if_match,
+    collection_etag,
+    is_not_modified,
+    validator_headers,
+    version_etag,
+)
+
+MODIFIED = datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def make_request(headers: dict) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_validator_headers():
+    headers = validator_headers(version_etag(3), MODIFIED)
+    assert headers == {
+        "ETag": '"3"',
+        "Cache-Control": "no-cache",
+        "Last-Modified": "Fri, 01 Mar 2024 12:30:15 GMT",
+    }
+    # Naive times, as read from SQLite, are in UTC.
+    naive = validator_headers(version_etag(3), MODIFIED.replace(tzinfo=None))
+    assert naive["Last-Modified"] == "Fri, 01 Mar 2024 12:30:15 GMT"
+
+
+def test_version_etag_of_partial_representation():
+    assert version_etag(3, "1a2b") == '"3-1a2b"'
+    with pytest.raises(HTTPException):
+        check_if_match(make_request({"If-Match": version_etag(3, "1a2b")}), 3, "Report")
+
+
+def test_collection_etag_depends_on_ids_versions_and_order():
+    etag = collection_etag([(1, 1), (2, 1)])
+    assert etag == collection_etag([(1, 1), (2, 1)])
+    assert etag != collection_etag([(1, 1), (2, 2)])
+    assert etag != collection_etag([(1, 1)])
+    assert etag != collection_etag([(2, 1), (1, 1)])
+
+
+def test_collection_etag_depends_on_variant():
+    etag = collection_etag([(1, 1)])
+    assert etag != collection_etag([(1, 1)], "1a2b")
+    assert collection_etag([(1, 1)], "1a2b") != collection_etag([(1, 1)], "3c4d")
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, False),
+        ({"If-None-Match": '"3"'}, True),
+        ({"If-None-Match": 'W/"3"'}, True),
+        ({"If-None-Match": '"2", "3"'}, True),
+        ({"If-None-Match": "*"}, True),
+        ({"If-None-Match": '"2"'}, False),
+        ({"If-Modified-Since": "Fri, 01 Mar 2024 12:30:15 GMT"}, True),
+        ({"If-Modified-Since": "Fri, 01 Mar 2024 12:30:14 GMT"}, False),
+        ({"If-Modified-Since": "not a date"}, False),
+        (
+            {
+                "If-None-Match": '"2"',
+                "If-Modified-Since": "Fri, 01 Mar 2024 12:30:15 GMT",
+            },
+            False,
+        ),
+    ],
+)
+def test_is_not_modified(headers, expected):
+    request = make_request(headers)
+    assert is_not_modified(request, version_etag(3), MODIFIED) is expected
+
+
+@pytest.mark.parametrize(
+    "headers, version, expected",
+    [
+        ({}, 3, None),
+        ({}, None, None),
+        ({"If-Match": '"3"'}, 3, None),
+        ({"If-Match": '"2", "3"'}, 3, None),
+        ({"If-Match": "*"}, 3, None),
+        ({"If-Match": '"2"'}, 3, "Report was modified by another request"),
+        ({"If-Match": "3"}, 3, "Report was modified by another request"),
+        # Compared strongly: a weak tag never matches.
+        ({"If-Match": 'W/"3"'}, 3, "Report was modified by another request"),
+        ({"If-Match": "*"}, None, "Report does not exist"),
+    ],
+)
+def test_check_if_match(headers, version, expected):
+    request = make_request(headers)
+    if expected is None:
+        check_if_match(request, version, "Report")
+        return
+    with pytest.raises(HTTPException) as error:
+        check_if_match(request, version, "Report")
+    assert error.value.status_code == 409
+    assert error.value.detail.startswith(expected)
@@ -1,6 +1,17 @@
 import pytest
 from importlib import reload
 
+import api.database
+
+
+@pytest.fixture(autouse=True)
+def restore_database_module():
+    """Restores the engine and session factory replaced by reloading `api.database`."""
+    state = dict(vars(api.database))
+    yield
+    vars(api.database).clear()
+    vars(api.database).update(state)
+
 
 # ---------------------------
 # Test Environment Variable Loading and Session Creation
@@ -15,21 +26,51 @@ def test_env_loading(monkeypatch):
 
     reload(db)
 
-    assert db.DATABASE_URL == "sqlite:///:memory:"
-    assert db.engine is not None
+    assert db.get_engine().url.database == ":memory:"
+    assert db.engine is db.get_engine()
     assert db.SessionLocal is not None
 
 
 def test_missing_database_url(monkeypatch):
-    """Test that ValueError is raised if DATABASE_URL is not set."""
+    """Test that ValueError is raised on first use of the engine if DATABASE_URL is not set."""
     monkeypatch.delenv("DATABASE_URL", raising=False)
 
+    import api.database as db
+
+    # Importing the application does not need a database.
+    reload(db)
+
     with pytest.raises(
         ValueError, match="DATABASE_URL environment variable is not set."
     ):
-        import api.database as db
+        db.get_engine()
 
-        reload(db)
+
+def test_engine_created_once_by_concurrent_calls(monkeypatch):
+    """Test that threads calling get_engine before the engine exists share one engine."""
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    import api.database as db
+
+    reload(db)
+    created = []
+    create_database_engine = db.create_database_engine
+
+    def slow_create_database_engine(url):
+        time.sleep(0.05)
+        created.append(url)
+        return create_database_engine(url)
+
+    monkeypatch.setattr(db, "create_database_engine", slow_create_database_engine)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        engines = list(executor.map(lambda _: db.get_engine(), range(4)))
+
+    assert len(created) == 1
+    assert all(engine is engines[0] for engine in engines)
 
 
 def test_session_lifecycle(monkeypatch):
@@ -64,6 +105,6 @@ def test_env_warning_on_missing_dotenv(monkeypatch):
         import api.database as db
 
         reload(db)
-        assert db.DATABASE_URL == "sqlite:///:memory:"
+        assert db.get_engine().url.database == ":memory:"
     finally:
         builtins.__import__ = original_import
@@ -0,0 +1,88 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import JSON, create_engine, literal, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import CompileError
+
+from api.dialects import age_in_years, date_trunc, json_contains
+
+
+@pytest.fixture(
+    scope="function",
+    params=["sqlite", pytest.param("postgresql", marks=pytest.mark.postgres)],
+)
+def dialect_connection(request):
+    """A connection to an in-memory SQLite database, then to the test PostgreSQL database."""
+    if request.param == "postgresql":
+        yield request.getfixturevalue("connection")
+        return
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "born, on, expected",
+    [
+        (date(1990, 6, 15), date(2024, 6, 14), 33),
+        (date(1990, 6, 15), date(2024, 6, 15), 34),
+        (date(1990, 6, 15), date(2024, 12, 31), 34),
+        (date(2000, 2, 29), date(2023, 2, 28), 22),
+        (date(2000, 2, 29), date(2023, 3, 1), 23),
+        (date(2024, 1, 1), date(2024, 1, 1), 0),
+    ],
+)
+def test_age_in_years(dialect_connection, born, on, expected):
+    age = dialect_connection.execute(select(age_in_years(born, on))).scalar_one()
+    assert age == expected
+
+
+@pytest.mark.parametrize(
+    "unit, value, expected",
+    [
+        ("year", datetime(2024, 3, 14, 15, 42, 7), datetime(2024, 1, 1)),
+        ("month", datetime(2024, 3, 14, 15, 42, 7), datetime(2024, 3, 1)),
+        # 14 March 2024 is a Thursday, weeks start on Monday.
+        ("week", datetime(2024, 3, 14, 15, 42, 7), datetime(2024, 3, 11)),
+        ("week", datetime(2024, 3, 11, 9, 0, 0), datetime(2024, 3, 11)),
+        ("week", datetime(2024, 3, 17, 23, 59, 59), datetime(2024, 3, 11)),
+        ("day", datetime(2024, 3, 14, 15, 42, 7), datetime(2024, 3, 14)),
+        ("hour", datetime(2024, 3, 14, 15, 42, 7), datetime(2024, 3, 14, 15)),
+        ("minute", datetime(2024, 3, 14, 15, 42, 7), datetime(2024, 3, 14, 15, 42)),
+    ],
+)
+def test_date_trunc(dialect_connection, unit, value, expected):
+    truncated = dialect_connection.execute(select(date_trunc(unit, value))).scalar_one()
+    assert truncated == expected
+
+
+def test_date_trunc_unsupported_unit():
+    with pytest.raises(ValueError, match="Unsupported unit 'quarter'"):
+        date_trunc("quarter", datetime(2024, 3, 14))
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (["fever"], True),
+        (["cough", "fever"], True),
+        ([], True),
+        (["rash"], False),
+        (["fever", "rash"], False),
+    ],
+)
+def test_json_contains(dialect_connection, values, expected):
+    symptoms = literal(["fever", "cough", "fatigue"], JSON)
+    contained = dialect_connection.execute(
+        select(json_contains(symptoms, values))
+    ).scalar_one()
+    assert bool(contained) is expected
+
+
+def test_unsupported_dialect():
+    with pytest.raises(CompileError, match="age_in_years is not supported on mysql"):
+        select(age_in_years(date(1990, 1, 1), date(2024, 1, 1))).compile(
+            dialect=mysql.dialect()
+        )
@@ -0,0 +1,172 @@
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from api.database import Base
+from api.enums import (
+    DiseaseCategoryEnum,
+    GenderEnum,
+    SeverityLevelEnum,
+    TreatmentStatusEnum,
+)
+from api.models import Disease, Patient, Report, Reporter, User
+from api.queries import (
+    FULL_REPORT,
+    LOADER_STRATEGIES,
+    LoaderPolicy,
+    ReportFieldset,
+    list_reports,
+)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="module")
+def session(engine):
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    user = User(email="loader@example.com", hashed_password="x")
+    reporter = Reporter(
+        first_name="A",
+        last_name="B",
+        email="loader-reporter@example.com",
+        job_title="Doc",
+        phone_number="+1111111",
+        hospital_name="Test",
+        hospital_address="Addr",
+    )
+    for index in range(3):
+        session.add(
+            Report(
+                creator=user,
+                reporter=reporter,
+                disease=Disease(
+                    disease_name=f"Disease {index}",
+                    disease_category=DiseaseCategoryEnum.viral,
+                    date_detected=date(2024, 1, 1),
+                    symptoms=["cough"],
+                    severity_level=SeverityLevelEnum.low,
+                    treatment_status=TreatmentStatusEnum.none,
+                ),
+                patients=[
+                    Patient(
+                        first_name="P",
+                        last_name=f"{index}-{number}",
+                        date_of_birth=date(1990, 1, 1),
+                        gender=GenderEnum.other,
+                        medical_record_number=f"MRN-{index}-{number}",
+                        patient_address="Addr",
+                    )
+                    for number in range(index + 1)
+                ],
+            )
+        )
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_default_policy():
+    policy = LoaderPolicy()
+    assert policy.scalar == "joined"
+    assert policy.collection == "selectin"
+
+
+def test_unknown_strategy_rejected():
+    with pytest.raises(ValueError, match="Unknown loader strategy 'lazy'"):
+        LoaderPolicy(collection="lazy")
+
+
+def test_policy_from_env(monkeypatch):
+    monkeypatch.setenv("REPORT_COLLECTION_LOADER", "subquery")
+    monkeypatch.delenv("REPORT_SCALAR_LOADER", raising=False)
+    assert LoaderPolicy.from_env() == LoaderPolicy(
+        scalar="joined", collection="subquery"
+    )
+
+
+@pytest.mark.parametrize("collection", sorted(LOADER_STRATEGIES))
+def test_policies_load_the_same_page(engine, session, collection):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    session.expunge_all()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        reports = list_reports(session, 1, 2, LoaderPolicy(collection=collection))
+        loaded = [
+            (
+                report.id,
+                report.reporter.email,
+                report.disease.disease_name,
+                sorted(patient.last_name for patient in report.patients),
+            )
+            for report in reports
+        ]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert loaded == [
+        (2, "loader-reporter@example.com", "Disease 1", ["1-0", "1-1"]),
+        (3, "loader-reporter@example.com", "Disease 2", ["2-0", "2-1", "2-2"]),
+    ]
+    assert len(statements) == (1 if collection == "joined" else 2)
+
+
+@pytest.mark.parametrize(
+    "fields, include, expected",
+    [
+        (None, None, FULL_REPORT),
+        (
+            "status, created_at",
+            None,
+            ReportFieldset(("id", "status", "created_at"), ()),
+        ),
+        (
+            "created_at,id",
+            "disease",
+            ReportFieldset(("id", "created_at"), ("disease",)),
+        ),
+        (None, "patients,reporter", ReportFieldset(include=("reporter", "patients"))),
+        (None, "", ReportFieldset(include=())),
+    ],
+)
+def test_fieldset_parse(fields, include, expected):
+    assert ReportFieldset.parse(fields, include) == expected
+
+
+def test_fieldset_parse_rejects_unknown_names():
+    with pytest.raises(ValueError, match="Unknown field 'creator'"):
+        ReportFieldset.parse("id,creator", None)
+    with pytest.raises(ValueError, match="Unknown relationship 'creator'"):
+        ReportFieldset.parse(None, "creator")
+
+
+def test_fieldset_loads_only_requested_columns(engine, session):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    session.expunge_all()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        reports = list_reports(
+            session, 0, 2, fieldset=ReportFieldset.parse("status", None)
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert [report.id for report in reports] == [1, 2]
+    assert len(statements) == 1
+    assert "reports.status" in statements[0]
+    assert "created_at" not in statements[0]
+    assert "reporters" not in statements[0]
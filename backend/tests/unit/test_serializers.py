@@ -0,0 +1,85 @@
+import json
+from datetime import date, datetime, timezone
+
+from api import models, schemas
+from api.enums import (
+    DiseaseCategoryEnum,
+    GenderEnum,
+    ReportStateEnum,
+    SeverityLevelEnum,
+    TreatmentStatusEnum,
+)
+from api.serializers import FastJSONResponse, dump_report, dump_reports
+
+NOW = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_report(report_id: int) -> models.Report:
+    """A transient report with a reporter, a disease, and a patient."""
+    report = models.Report(
+        id=report_id,
+        status=ReportStateEnum.submitted,
+        created_at=NOW,
+        updated_at=None,
+        version=1,
+        created_by=1,
+    )
+    report.reporter = models.Reporter(
+        id=1,
+        first_name="Alice",
+        last_name="Doe",
+        email="alice.doe@example.com",
+        job_title="Epidemiologist",
+        phone_number="+1234567890",
+        hospital_name="City Hospital",
+        hospital_address="123 Health St, Metropolis",
+        registration_date=NOW,
+    )
+    report.disease = models.Disease(
+        id=report_id,
+        disease_name="Influenza",
+        disease_category=DiseaseCategoryEnum.viral,
+        date_detected=date(2024, 2, 1),
+        symptoms=["fever"],
+        severity_level=SeverityLevelEnum.high,
+        treatment_status=TreatmentStatusEnum.ongoing,
+        version=1,
+    )
+    report.patients = [
+        models.Patient(
+            id=report_id,
+            first_name="John",
+            last_name="Doe",
+            date_of_birth=date(1990, 1, 1),
+            gender=GenderEnum.male,
+            medical_record_number=f"MRN-{report_id}",
+            patient_address="456 Health Ave",
+        )
+    ]
+    return report
+
+
+def test_dump_reports_matches_model_dump():
+    reports = [make_report(1), make_report(2)]
+
+    expected = [
+        schemas.Report.model_validate(report).model_dump(mode="json")
+        for report in reports
+    ]
+    assert json.loads(dump_reports(reports)) == expected
+    assert json.loads(dump_report(reports[0])) == expected[0]
+    assert json.loads(dump_reports([])) == []
+
+
+def test_fast_json_response_renders_bytes_and_model_types():
+    assert FastJSONResponse(b'{"a":1}').body == b'{"a":1}'
+    assert FastJSONResponse({"at": NOW, "name": "é"}).body == (
+        '{"at":"2024-03-01T12:00:00Z","name":"é"}'.encode()
+    )
+    assert FastJSONResponse({"a": 1}).headers["content-type"] == "application/json"
+
+
+def test_response_emails_keep_email_format():
+    stored = schemas.Reporter.model_json_schema()["properties"]["email"]
+    validated = schemas.ReporterCreate.model_json_schema()["properties"]["email"]
+    assert stored == validated
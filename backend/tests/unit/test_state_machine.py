@@ -0,0 +1,69 @@
+import pytest
+
+from api.enums import ReportStateEnum, UserRoleEnum
+from api.models import User
+from api.state_machine import (
+    allowed_sources,
+    can_transition,
+    check_transition,
+    transition_reports,
+)
+
+
+def test_allowed_sources():
+    assert allowed_sources(ReportStateEnum.approved, UserRoleEnum.senior) == {
+        ReportStateEnum.submitted,
+        ReportStateEnum.under_review,
+    }
+    assert allowed_sources(ReportStateEnum.submitted, UserRoleEnum.junior) == {
+        ReportStateEnum.draft
+    }
+    assert allowed_sources(ReportStateEnum.approved, UserRoleEnum.junior) == set()
+
+
+@pytest.mark.parametrize(
+    "source, target, role, expected",
+    [
+        (ReportStateEnum.draft, ReportStateEnum.submitted, UserRoleEnum.junior, True),
+        (ReportStateEnum.draft, ReportStateEnum.approved, UserRoleEnum.senior, False),
+        (
+            ReportStateEnum.under_review,
+            ReportStateEnum.draft,
+            UserRoleEnum.senior,
+            True,
+        ),
+        (
+            ReportStateEnum.under_review,
+            ReportStateEnum.draft,
+            UserRoleEnum.junior,
+            False,
+        ),
+        (ReportStateEnum.approved, ReportStateEnum.draft, UserRoleEnum.senior, False),
+    ],
+)
+def test_can_transition(source, target, role, expected):
+    assert can_transition(source, target, role) is expected
+
+
+def test_check_transition():
+    check_transition(
+        ReportStateEnum.draft, ReportStateEnum.submitted, UserRoleEnum.junior
+    )
+
+    with pytest.raises(ValueError, match="cannot move from 'Draft' to 'Approved'"):
+        check_transition(
+            ReportStateEnum.draft, ReportStateEnum.approved, UserRoleEnum.senior
+        )
+    with pytest.raises(
+        PermissionError, match="may not move reports from 'Under Review' to 'Draft'"
+    ):
+        check_transition(
+            ReportStateEnum.under_review, ReportStateEnum.draft, UserRoleEnum.junior
+        )
+
+
+def test_transition_requires_role(db_session):
+    junior = User(id=0, role=UserRoleEnum.junior)
+
+    with pytest.raises(PermissionError, match="may not move reports to 'Approved'"):
+        transition_reports(db_session, [1], ReportStateEnum.approved, junior)
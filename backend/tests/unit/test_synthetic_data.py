@@ -0,0 +1,70 @@
+# tests/unit/test_synthetic_data.py
+
+from datetime import date
+
+from benchmarks.synthetic_data import (
+    CHUNK_SIZE,
+    DatasetSpec,
+    Plan,
+    generate_reports,
+    make_outbreaks,
+)
+
+SPEC = DatasetSpec(
+    users=10,
+    reporters=20,
+    hospitals=5,
+    patients=100,
+    reports=CHUNK_SIZE + 100,
+    end_date=date(2025, 1, 1),
+)
+
+
+def make_plan(spec: DatasetSpec = SPEC) -> Plan:
+    first_ids = dict.fromkeys(
+        ["users", "reporters", "patients", "reports", "diseases"], 1
+    )
+    return Plan(spec, first_ids, "not-a-hash", make_outbreaks(spec))
+
+
+def test_chunks_are_deterministic():
+    """Test that a chunk only depends on the seed and its number."""
+    plan = make_plan()
+    assert generate_reports(plan, 1) == generate_reports(make_plan(), 1)
+    assert generate_reports(plan, 0) != generate_reports(plan, 1)
+
+    reseeded = make_plan(DatasetSpec(**{**SPEC.__dict__, "seed": 1}))
+    assert generate_reports(plan, 1) != generate_reports(reseeded, 1)
+
+
+def test_reports_reference_generated_rows():
+    """Test that the last, partial chunk links reports to existing users, reporters, and patients."""
+    tables = generate_reports(make_plan(), 1)
+    assert len(tables["reports"]) == len(tables["diseases"]) == 100
+
+    report_ids = {report[0] for report in tables["reports"]}
+    assert report_ids == set(range(CHUNK_SIZE + 1, CHUNK_SIZE + 101))
+    for _, status, _, _, created_by, reporter_id in tables["reports"]:
+        assert 1 <= created_by <= SPEC.users
+        assert 1 <= reporter_id <= SPEC.reporters
+    for patient_id, report_id in tables["patient_reports"]:
+        assert 1 <= patient_id <= SPEC.patients
+        assert report_id in report_ids
+    assert {entry[4] for entry in tables["audit_logs"]} == report_ids
+
+
+def test_sizes_scale_with_reports():
+    """Test that the referenced tables follow the number of reports, unless their size is given."""
+    assert DatasetSpec.scaled(DatasetSpec().reports) == DatasetSpec()
+
+    spec = DatasetSpec.scaled(20_000)
+    assert (spec.users, spec.reporters, spec.hospitals, spec.patients) == (
+        20,
+        400,
+        10,
+        40_000,
+    )
+
+    spec = DatasetSpec.scaled(100, patients=5, hospitals=3, seed=7)
+    assert (spec.users, spec.reporters, spec.hospitals, spec.patients) == (1, 3, 3, 5)
+    assert spec.seed == 7